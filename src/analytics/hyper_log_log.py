@@ -0,0 +1,67 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the HyperLogLog sketch used to approximately count distinct values in constant memory
+
+import math
+
+from hashlib import blake2b
+
+
+class HyperLogLog:
+    """
+    This class is a HyperLogLog sketch. It uses 2 ** precision one byte registers, the standard error is about
+    1.04 / sqrt(2 ** precision).
+    """
+
+    def __init__(self, precision: int = 12) -> None:
+        """
+        Initialization method for hyper log log class.
+
+        Args:
+            precision: number of bits of the hash used to pick the register
+        """
+
+        self.precision = precision
+        self.register_count = 1 << precision
+        self.registers = bytearray(self.register_count)
+
+        # bias correction constant for the number of registers
+        self.alpha = 0.7213 / (1 + 1.079 / self.register_count)
+
+    def add(self, value: str) -> None:
+        """
+        Add a value to the sketch.
+
+        Args:
+            value: value to be added
+
+        Returns:
+            None
+        """
+
+        hashed = int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+        # first bits of the hash pick the register, the rest is used to count the leading zeros
+        register_id = hashed >> (64 - self.precision)
+        remaining_bits = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining_bits.bit_length() + 1
+
+        if rank > self.registers[register_id]:
+            self.registers[register_id] = rank
+
+    def count(self) -> float:
+        """
+        Estimate the number of distinct values added to the sketch.
+
+        Returns:
+            estimated count
+        """
+
+        estimate = self.alpha * self.register_count ** 2 / sum(2.0 ** -rank for rank in self.registers)
+
+        # use linear counting for small cardinalities
+        empty_registers = self.registers.count(0)
+        if estimate <= 2.5 * self.register_count and empty_registers:
+            return self.register_count * math.log(self.register_count / empty_registers)
+
+        return estimate
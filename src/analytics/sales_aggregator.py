@@ -0,0 +1,231 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the sales aggregator. It is fed by every generated bill and keeps running totals, so
+# the sales figures don't have to be parsed back from the printed receipts
+
+import heapq
+import threading
+
+from src.analytics.hyper_log_log import HyperLogLog
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM
+
+"""
+Positions of the running totals of an entity
+"""
+QUANTITY = 0
+GROSS = 1
+DISCOUNT = 2
+NET = 3
+
+TOTAL_FIELDS = {
+    'quantity': QUANTITY,
+    'gross': GROSS,
+    'discount': DISCOUNT,
+    'net': NET
+}
+
+
+class SalesAggregator:
+    """
+    This class keeps the running sales totals per item, sub category and category. Its memory depends only on the
+    size of the catalog, not on the number of bills processed. Totals are keyed by the entity skus. Quantities are
+    kept per standard unit, since a sub category or a category may sell items in different units.
+    """
+
+    def __init__(self, sku_tables: dict, precision: int = 12) -> None:
+        """
+        Initialization method for sales aggregator class.
+
+        Args:
+            sku_tables: sku tables of the store the bills are generated by
+            precision: precision of the sketch counting the distinct customers
+        """
+
+        self.sku_tables = sku_tables
+
+        # this mapping consists of entity types and the entity skus within them mapped to their running totals of
+        # [standard unit mapped to quantity, gross, discount, net]
+        self.totals = {
+            CATEGORY: {},
+            SUB_CATEGORY: {},
+            ITEM: {}
+        }
+
+        self.bill_count = 0
+        self.overall_totals = [{}, 0.0, 0.0, 0.0]
+        self.customers = HyperLogLog(precision=precision)
+
+        # bills may be fed from several billing threads
+        self.lock = threading.Lock()
+
+    def add_bill(self, bill: dict) -> None:
+        """
+        Add a generated bill to the running totals. This can be registered directly as a bill listener of the store
+        manager.
+
+        Args:
+            bill: generated bill
+
+        Returns:
+            None
+        """
+
+        # spread the promotion discounts over the lines they consumed, in proportion to the line costs
+        promotion_discounts = [0.0] * len(bill['lines'])
+
+        for applied_promotion in bill['promotions']:
+            consumed_cost = sum(bill['lines'][index]['new_cost'] for index in applied_promotion['lines'])
+
+            for index in applied_promotion['lines']:
+                if consumed_cost:
+                    promotion_discounts[index] += (applied_promotion['discount'] * bill['lines'][index]['new_cost'] /
+                                                   consumed_cost)
+
+        # spread the coupon discount over all the lines, in proportion to what is left to be paid for them
+        if bill.get('coupon'):
+            remaining_costs = [line['new_cost'] - promotion_discount
+                               for line, promotion_discount in zip(bill['lines'], promotion_discounts)]
+            remaining_cost = sum(remaining_costs)
+
+            for index, line_cost in enumerate(remaining_costs):
+                if remaining_cost:
+                    promotion_discounts[index] += bill['coupon']['discount'] * line_cost / remaining_cost
+
+        with self.lock:
+            self.bill_count += 1
+
+            if bill.get('customer_id') is not None:
+                self.customers.add(str(bill['customer_id']))
+
+            for line, promotion_discount in zip(bill['lines'], promotion_discounts):
+                item_obj = line['item']
+                line_totals = (line['original_cost'], line['original_cost'] - line['new_cost'] + promotion_discount,
+                               line['new_cost'] - promotion_discount)
+
+                for entity_type, entity_sku in ((ITEM, item_obj.sku),
+                                                (SUB_CATEGORY, item_obj.sub_category.sku),
+                                                (CATEGORY, item_obj.sub_category.category.sku)):
+                    running_totals = self.totals[entity_type].get(entity_sku)
+
+                    if running_totals is None:
+                        running_totals = self.totals[entity_type][entity_sku] = [{}, 0.0, 0.0, 0.0]
+
+                    self._add_line_totals(running_totals=running_totals, line=line, line_totals=line_totals)
+
+                self._add_line_totals(running_totals=self.overall_totals, line=line, line_totals=line_totals)
+
+    @staticmethod
+    def _add_line_totals(running_totals: list, line: dict, line_totals: tuple) -> None:
+        """
+        Add the totals of a bill line to running totals.
+
+        Args:
+            running_totals: running totals to be updated
+            line: bill line
+            line_totals: gross, discount and net of the line
+
+        Returns:
+            None
+        """
+
+        quantities = running_totals[QUANTITY]
+        quantities[line['unit']] = quantities.get(line['unit'], 0.0) + line['quantity']
+
+        for position, value in enumerate(line_totals, start=GROSS):
+            running_totals[position] += value
+
+    def get_totals(self, entity_type: str, entity_name: str) -> dict:
+        """
+        Returns the running totals of an entity.
+
+        Args:
+            entity_type: entity type
+            entity_name: entity name
+
+        Returns:
+            quantity per standard unit, gross, discount and net totals
+        """
+
+        entity_sku = self.sku_tables[entity_type].get_sku(entity_name)
+
+        with self.lock:
+            return self._copy_totals(running_totals=self.totals[entity_type].get(entity_sku, [{}, 0.0, 0.0, 0.0]))
+
+    def get_overall_totals(self) -> dict:
+        """
+        Returns the running totals over all the bills.
+
+        Returns:
+            bill count, quantity per standard unit, gross, discount and net totals
+        """
+
+        with self.lock:
+            overall_totals = self._copy_totals(running_totals=self.overall_totals)
+            overall_totals['bills'] = self.bill_count
+
+        return overall_totals
+
+    @staticmethod
+    def _copy_totals(running_totals: list) -> dict:
+        """
+        Copy running totals into a mapping of the total names to their values.
+
+        Args:
+            running_totals: running totals
+
+        Returns:
+            quantity per standard unit, gross, discount and net totals
+        """
+
+        totals = {field: running_totals[position] for field, position in TOTAL_FIELDS.items()}
+        totals['quantity'] = dict(totals['quantity'])
+
+        return totals
+
+    def top_sellers(self, count: int, entity_type: str = ITEM, by: str = 'net', unit: str = None) -> list:
+        """
+        Returns the top sellers of an entity type, selected with a heap bounded to the requested count.
+
+        Args:
+            count: number of top sellers to be returned
+            entity_type: entity type
+            by: total to rank the sellers by, one of quantity, gross, discount or net
+            unit: standard unit the quantities are compared in when ranking by quantity. Items are sold in a single
+                unit and are ranked by their own one if not given
+
+        Returns:
+            list of (entity name, total) in descending order
+        """
+
+        position = TOTAL_FIELDS[by]
+
+        if position == QUANTITY and unit is None and entity_type != ITEM:
+            raise ValueError(f"Quantities of {entity_type} are kept per unit, a unit is needed to rank by quantity")
+
+        def total(running_totals: list) -> float:
+            if position != QUANTITY:
+                return running_totals[position]
+
+            quantities = running_totals[QUANTITY]
+
+            return quantities.get(unit, 0.0) if unit else sum(quantities.values())
+
+        with self.lock:
+            top_entries = [(entity_sku, total(running_totals=running_totals)) for entity_sku, running_totals in
+                           heapq.nlargest(count, self.totals[entity_type].items(),
+                                          key=lambda val: total(running_totals=val[1]))]
+
+        sku_table = self.sku_tables[entity_type]
+
+        return [(sku_table.get_name(entity_sku), entity_total) for entity_sku, entity_total in top_entries]
+
+    def distinct_customers(self) -> int:
+        """
+        Returns the approximate number of distinct customers.
+
+        Returns:
+            estimated count
+        """
+
+        with self.lock:
+            return round(self.customers.count())
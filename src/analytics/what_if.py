@@ -0,0 +1,348 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the what-if repricing simulation. Historical basket lines are kept column wise and
+# collapsed into distinct (sku, quantity) pairs with their counts, the baseline is priced once, and every scenario
+# only reprices the pairs of the items its discount changes reach through the category hierarchy
+
+from array import array
+from traceback import format_exc
+from typing import Any, Iterator
+
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM
+from src.journal.bill_journal import BillJournalReader
+from src.models.category import Category
+from src.models.entity import Entity
+from src.models.item import Item
+from src.models.sub_category import SubCategory
+
+
+class BasketSet:
+    """
+    This class holds historical basket lines as columns of distinct (item sku, standardized quantity) pairs and the
+    number of lines each pair stands for.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialization method for basket set class.
+        """
+
+        self.skus = array('i')
+        self.quantities = array('d')
+        self.counts = array('I')
+
+        # (sku, quantity) mapped to its position in the columns
+        self.pair_positions = {}
+        self.line_count = 0
+
+    def add_line(self, sku: int, quantity: float) -> None:
+        """
+        Add a basket line.
+
+        Args:
+            sku: item sku
+            quantity: quantity in standard units
+
+        Returns:
+            None
+        """
+
+        position = self.pair_positions.get((sku, quantity))
+
+        if position is None:
+            position = self.pair_positions[(sku, quantity)] = len(self.skus)
+            self.skus.append(sku)
+            self.quantities.append(quantity)
+            self.counts.append(0)
+
+        self.counts[position] += 1
+        self.line_count += 1
+
+    @classmethod
+    def from_processed_baskets(cls, baskets: Iterator) -> 'BasketSet':
+        """
+        Build the basket set from processed baskets.
+
+        Args:
+            baskets: processed baskets
+
+        Returns:
+            basket set
+        """
+
+        basket_set = cls()
+
+        for processed_data in baskets:
+            for data in processed_data:
+                basket_set.add_line(sku=data['item'].sku, quantity=data['quantity'])
+
+        return basket_set
+
+    @classmethod
+    def from_journal(cls, path: str, store: Any) -> 'BasketSet':
+        """
+        Build the basket set from the bills recorded in a bill journal. Lines of items no longer in the store are
+        ignored.
+
+        Args:
+            path: path of the bill journal
+            store: store manager whose skus are used
+
+        Returns:
+            basket set
+        """
+
+        basket_set = cls()
+        item_data_map = store.store_data[ITEM]
+
+        for _, record in BillJournalReader(path=path):
+            for line in record['lines']:
+                # look the item up rather than its sku, so that lazily processed items get their sku
+                item_obj = item_data_map.get(line['item'])
+
+                if item_obj is not None:
+                    basket_set.add_line(sku=item_obj.sku, quantity=line['quantity'])
+
+        return basket_set
+
+    def positions_by_sku(self) -> dict:
+        """
+        Group the positions of the pairs by item sku.
+
+        Returns:
+            mapping of item sku to the positions of its pairs
+        """
+
+        grouped_positions = {}
+
+        for position, sku in enumerate(self.skus):
+            grouped_positions.setdefault(sku, []).append(position)
+
+        return grouped_positions
+
+
+class WhatIfSimulator:
+    """
+    This class reprices a basket set under a list of scenarios, each scenario being a list of proposed discount changes
+    of (entity type, entity name, discount string).
+    """
+
+    def __init__(self, store: Any, basket_set: BasketSet) -> None:
+        """
+        Initialization method for what if simulator class. The baseline is priced against the store's current catalog.
+
+        Args:
+            store: store manager
+            basket_set: historical basket lines
+        """
+
+        self.store_data = store.store_data
+        self.sku_tables = store.sku_tables
+        self.basket_set = basket_set
+        self.positions = basket_set.positions_by_sku()
+
+        # children of every category and sub category, restricted to the items present in the basket set
+        self.children = {
+            CATEGORY: {},
+            SUB_CATEGORY: {}
+        }
+
+        for sku in self.positions:
+            sub_category_sku = self.sku_tables[ITEM].get_parent_sku(sku)
+            category_sku = self.sku_tables[SUB_CATEGORY].get_parent_sku(sub_category_sku)
+
+            self.children[SUB_CATEGORY].setdefault(sub_category_sku, []).append(sku)
+            self.children[CATEGORY].setdefault(category_sku, set()).add(sub_category_sku)
+
+        # price every pair once under the current catalog
+        self.original_costs = array('d', bytes(8 * len(basket_set.skus)))
+        self.new_costs = array('d', bytes(8 * len(basket_set.skus)))
+
+        for sku, positions in self.positions.items():
+            pricing_kernel = self._item(sku=sku).pricing_kernel
+
+            for position in positions:
+                original_cost, _, new_cost = pricing_kernel(basket_set.quantities[position])
+                self.original_costs[position] = original_cost * basket_set.counts[position]
+                self.new_costs[position] = new_cost * basket_set.counts[position]
+
+        self.baseline_original_cost = sum(self.original_costs)
+        self.baseline_new_cost = sum(self.new_costs)
+
+    def simulate(self, scenarios: list) -> list:
+        """
+        Reprice the basket set under every scenario.
+
+        Args:
+            scenarios: list of (scenario name, list of (entity type, entity name, discount string))
+
+        Returns:
+            list of totals for each scenario
+        """
+
+        results = []
+
+        for scenario_name, changes in scenarios:
+            new_cost_delta = self._reprice(changes=changes)
+            total_new_cost = self.baseline_new_cost + new_cost_delta
+
+            results.append(
+                    {
+                        'scenario': scenario_name,
+                        'total_original_cost': self.baseline_original_cost,
+                        'total_new_cost': total_new_cost,
+                        'savings': self.baseline_original_cost - total_new_cost,
+                        'savings_delta': -new_cost_delta,
+                        'revenue_delta': new_cost_delta
+                    }
+            )
+
+        return results
+
+    def _reprice(self, changes: list) -> float:
+        """
+        Reprice the pairs of the items reached by the changes.
+
+        Args:
+            changes: list of (entity type, entity name, discount string)
+
+        Returns:
+            change of the total new cost compared to the baseline
+        """
+
+        # discount strings overridden by the scenario, keyed by (entity type, sku)
+        overrides = {}
+        affected_skus = set()
+
+        for entity_type, entity_name, discount_str in changes:
+            try:
+                sku = self.sku_tables[entity_type].get_sku(entity_name)
+                is_valid = sku is not None and Entity.validate_discount(discount_str)
+
+            except Exception as e:
+                print(f"Discount change {entity_type} {entity_name} {discount_str} is invalid. Ignoring this change. "
+                      f"Exception: {e}\nTraceback: {format_exc()}")
+                continue
+
+            if not is_valid:
+                print(f"Discount change {entity_type} {entity_name} {discount_str} is invalid. Ignoring this change.")
+                continue
+
+            overrides[(entity_type, sku)] = discount_str
+            affected_skus.update(self._descendant_items(entity_type=entity_type, sku=sku))
+
+        new_cost_delta = 0.0
+        entities = {}
+
+        for sku in affected_skus:
+            try:
+                pricing_kernel = self._item(sku=sku, overrides=overrides, entities=entities).pricing_kernel
+
+            except Exception as e:
+                print(f"Item {self.sku_tables[ITEM].get_name(sku)} could not be repriced. Exception: {e}\nTraceback: "
+                      f"{format_exc()}")
+                continue
+
+            for position in self.positions[sku]:
+                _, _, new_cost = pricing_kernel(self.basket_set.quantities[position])
+                new_cost_delta += new_cost * self.basket_set.counts[position] - self.new_costs[position]
+
+        return new_cost_delta
+
+    def _descendant_items(self, entity_type: str, sku: int) -> list:
+        """
+        Find the items of the basket set under an entity.
+
+        Args:
+            entity_type: entity type
+            sku: entity sku
+
+        Returns:
+            list of item skus
+        """
+
+        if entity_type == ITEM:
+            return [sku] if sku in self.positions else []
+
+        if entity_type == SUB_CATEGORY:
+            return self.children[SUB_CATEGORY].get(sku, [])
+
+        return [item_sku for sub_category_sku in self.children[CATEGORY].get(sku, ())
+                for item_sku in self.children[SUB_CATEGORY][sub_category_sku]]
+
+    def _item(self, sku: int, overrides: dict = None, entities: dict = None) -> Item:
+        """
+        Return the item of a sku, rebuilt with the scenario's discount strings if it or its parents are overridden.
+
+        Args:
+            sku: item sku
+            overrides: discount strings overridden by the scenario
+            entities: entities already rebuilt for the scenario
+
+        Returns:
+            item object
+        """
+
+        item_obj = self.store_data[ITEM][self.sku_tables[ITEM].get_name(sku)]
+
+        if not overrides:
+            return item_obj
+
+        sub_category_obj = item_obj.sub_category
+        category_obj = sub_category_obj.category
+
+        category_key = (CATEGORY, category_obj.sku)
+        sub_category_key = (SUB_CATEGORY, sub_category_obj.sku)
+        item_key = (ITEM, sku)
+
+        if category_key in overrides and category_key not in entities:
+            entities[category_key] = Category(category_obj.name, overrides[category_key])
+        category_obj = entities.get(category_key, category_obj)
+
+        if (sub_category_key in overrides or category_key in overrides) and sub_category_key not in entities:
+            entities[sub_category_key] = SubCategory(category_obj, sub_category_obj.name,
+                                                     overrides.get(sub_category_key, sub_category_obj.discount_str))
+        sub_category_obj = entities.get(sub_category_key, sub_category_obj)
+
+        return Item(sub_category_obj, item_obj.name, item_obj.price_str,
+                    overrides.get(item_key, item_obj.discount_str))
+
+
+def parse_scenarios(data: str) -> list:
+    """
+    Parse the proposed discount changes and check for basic validations. Each line is 'scenario name, entity type,
+    entity name, discount string' and the lines of a scenario are grouped together.
+
+    Args:
+        data: the data to be parsed
+
+    Returns:
+        list of (scenario name, list of (entity type, entity name, discount string))
+    """
+
+    scenarios = {}
+
+    for line_data in data.split('\n'):
+        # ignore empty lines
+        if not line_data:
+            continue
+
+        try:
+            scenario_name, entity_type, entity_name, discount_str = [(val.strip()).lower()
+                                                                      for val in line_data.split(',')]
+
+            if entity_type not in (CATEGORY, SUB_CATEGORY, ITEM):
+                print(f"Entity type {entity_type} not found entities. Ignoring the current input line.")
+                continue
+
+            if not Entity.validate_discount(discount_str):
+                print(f"Discount {discount_str} is invalid. Ignoring the current input line.")
+                continue
+
+            scenarios.setdefault(scenario_name, []).append((entity_type, entity_name, discount_str))
+
+        except Exception as e:
+            print(f"Line data {line_data} is invalid. Ignoring this line. Exception: {e}\nTraceback: "
+                  f"{format_exc()}")
+
+    return list(scenarios.items())
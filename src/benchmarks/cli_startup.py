@@ -0,0 +1,200 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the CLI startup benchmark. It checks the import time of the modules the CLI loads
+# before billing against their budgets, checks that the heavy modules are only loaded by the options using them, and
+# compares the per basket latency of the resident mode with one process per basket
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.benchmarks.shared_catalog_workers import build_manager_data
+
+"""
+Import time budget in ms of every module imported by the CLI before it bills a basket in text format
+"""
+IMPORT_TIME_BUDGETS_MS = {
+    'src.cli': 30,
+    'src.renderers.text_renderer': 30
+}
+
+"""
+Modules which must not be imported before an option needing them is used
+"""
+LAZY_MODULES = (
+    'multiprocessing',
+    'hashlib',
+    'json',
+    'sqlite3',
+    'src.store_manager.catalog_dry_run',
+    'src.store_manager.coupon_engine',
+    'src.store_manager.sharded_store',
+    'src.journal.bill_journal'
+)
+
+"""
+Root directory of the repository, the CLI is run from there
+"""
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure_imports(modules: tuple) -> tuple:
+    """
+    Import the modules in a fresh interpreter with -X importtime.
+
+    Args:
+        modules: modules to be imported
+
+    Returns:
+        cumulative import time in ms of every given module, names of all the imported modules
+    """
+
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {', '.join(modules)}"], cwd=ROOT_DIR,
+                            capture_output=True, text=True, check=True)
+
+    import_times = {}
+    imported_modules = set()
+
+    # lines look like 'import time:  self [us] | cumulative | <indented module name>'
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, module_name = line[len('import time:'):].split('|')
+        imported_modules.add(module_name.strip())
+
+        if module_name.strip() in modules:
+            import_times[module_name.strip()] = int(cumulative) / 1000
+
+    return import_times, imported_modules
+
+
+def measure_resident(manager_file: str, baskets: list) -> list:
+    """
+    Bill the baskets one at a time through a resident CLI process.
+
+    Args:
+        manager_file: manager input file
+        baskets: customer inputs
+
+    Returns:
+        latency in seconds of every basket
+    """
+
+    process = subprocess.Popen([sys.executable, '-m', 'src.cli', '--resident', '--format', 'json', '--manager-input',
+                                manager_file], cwd=ROOT_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True, bufsize=1)
+
+    latencies = []
+
+    try:
+        # the first basket also waits for the catalog to be loaded, it is not timed
+        process.stdin.write(baskets[0] + '\n')
+        process.stdin.flush()
+        process.stdout.readline()
+
+        for basket in baskets:
+            start = time.perf_counter()
+            process.stdin.write(basket + '\n')
+            process.stdin.flush()
+            process.stdout.readline()
+            latencies.append(time.perf_counter() - start)
+
+    finally:
+        process.stdin.close()
+        process.wait()
+
+    return latencies
+
+
+def measure_one_shot(manager_file: str, baskets: list) -> list:
+    """
+    Bill every basket with a new CLI process.
+
+    Args:
+        manager_file: manager input file
+        baskets: customer inputs
+
+    Returns:
+        latency in seconds of every basket
+    """
+
+    latencies = []
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt') as customer_file:
+        for basket in baskets:
+            customer_file.seek(0)
+            customer_file.truncate()
+            customer_file.write(basket)
+            customer_file.flush()
+
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-m', 'src.cli', '--format', 'json', '--manager-input', manager_file,
+                            '--customer-input', customer_file.name], cwd=ROOT_DIR, capture_output=True, check=True)
+            latencies.append(time.perf_counter() - start)
+
+    return latencies
+
+
+def main(cli_args: argparse.Namespace) -> None:
+    """
+    Run the benchmark, exiting with status 1 if a budget is exceeded or a lazy module is imported at startup.
+
+    Args:
+        cli_args: parsed command line arguments
+
+    Returns:
+        None
+    """
+
+    # keep the best of several runs, the first one also pays for writing the bytecode
+    import_times = {}
+    imported_modules = set()
+
+    for _ in range(cli_args.runs):
+        run_import_times, imported_modules = measure_imports(modules=tuple(IMPORT_TIME_BUDGETS_MS))
+
+        for module_name, import_time in run_import_times.items():
+            import_times[module_name] = min(import_time, import_times.get(module_name, import_time))
+
+    within_budget = True
+
+    print(f"{'module':<32} {'import (ms)':>12} {'budget (ms)':>12}")
+
+    for module_name, budget in IMPORT_TIME_BUDGETS_MS.items():
+        within_budget &= import_times[module_name] <= budget
+        print(f"{module_name:<32} {import_times[module_name]:>12.1f} {budget:>12}")
+
+    eager_modules = [module_name for module_name in LAZY_MODULES if module_name in imported_modules]
+    print(f"Lazy modules imported at startup: {', '.join(eager_modules) or 'none'}")
+
+    baskets = [', '.join(f'item {(basket_id * 7 + index) % cli_args.items} 2kg' for index in range(8))
+               for basket_id in range(cli_args.baskets)]
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt') as manager_file:
+        manager_file.write(build_manager_data(item_count=cli_args.items))
+        manager_file.flush()
+
+        resident_latencies = sorted(measure_resident(manager_file=manager_file.name, baskets=baskets))
+        one_shot_latencies = sorted(measure_one_shot(manager_file=manager_file.name, baskets=baskets[:10]))
+
+    print(f"{'mode':>10} {'baskets':>8} {'avg (ms)':>10} {'p99 (ms)':>10}")
+
+    for mode, latencies in (('resident', resident_latencies), ('one shot', one_shot_latencies)):
+        print(f"{mode:>10} {len(latencies):>8} {sum(latencies) / len(latencies) * 1000:>10.3f} "
+              f"{latencies[int(len(latencies) * 0.99)] * 1000:>10.3f}")
+
+    if not within_budget or eager_modules:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='CLI startup benchmark')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--baskets', type=int, default=1000)
+
+    main(cli_args=parser.parse_args())
@@ -0,0 +1,207 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the inventory contention benchmark. It bills random baskets from several threads at
+# once against a single store manager, with a single global lock and with striped locks. Under the GIL the threads
+# never bill in parallel, so the throughput can not show the effect of striping. The benchmark measures the locks
+# directly instead: the share of acquisitions which had to wait, the time spent waiting and the time the locks are held
+
+import argparse
+import io
+import random
+import sys
+import threading
+import time
+
+from contextlib import redirect_stdout
+from typing import Any
+
+from src.constants import ITEM
+from src.store_manager.inventory import Inventory
+from src.store_manager.store_manager_runner import StoreManager
+
+
+class TimedLock:
+    """
+    This class wraps a lock and measures how it is used. The counters are only updated while the lock is held, so
+    they need no lock of their own.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialization method for timed lock class.
+        """
+
+        self.lock = threading.Lock()
+        self.acquisitions = 0
+        # acquisitions which found the lock held by another thread
+        self.contended = 0
+        self.wait_time = 0.0
+        self.hold_time = 0.0
+        self.acquired_at = 0.0
+
+    def acquire(self) -> bool:
+        start = time.perf_counter()
+
+        if not self.lock.acquire(blocking=False):
+            self.lock.acquire()
+            self.contended += 1
+
+        self.acquired_at = time.perf_counter()
+        self.acquisitions += 1
+        self.wait_time += self.acquired_at - start
+
+        return True
+
+    def release(self) -> None:
+        self.hold_time += time.perf_counter() - self.acquired_at
+        self.lock.release()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *args: Any) -> None:
+        self.release()
+
+
+def lock_stats(locks: list) -> dict:
+    """
+    Sum up the counters of the timed locks.
+
+    Args:
+        locks: timed locks
+
+    Returns:
+        share of contended acquisitions in %, average wait and hold time per acquisition in us
+    """
+
+    acquisitions = sum(lock.acquisitions for lock in locks) or 1
+
+    return {
+        'contended': sum(lock.contended for lock in locks) / acquisitions * 100,
+        'wait': sum(lock.wait_time for lock in locks) / acquisitions * 1e6,
+        'hold': sum(lock.hold_time for lock in locks) / acquisitions * 1e6
+    }
+
+
+def build_store(item_count: int, stripe_count: int) -> StoreManager:
+    """
+    Build a store with the given number of items, each one having enough stock for the whole benchmark.
+
+    Args:
+        item_count: number of items in the store
+        stripe_count: number of locks the inventory is striped across
+
+    Returns:
+        store manager
+    """
+
+    store = StoreManager()
+    store.inventory = Inventory(stripe_count=stripe_count)
+
+    manager_lines = ['Category, Grocery, 5%', 'Sub_Category, Grocery, Staples, 10%']
+    manager_lines.extend(f'Item, Staples, item {index}, {index % 90 + 10}/kg, {index % 20}%'
+                         for index in range(item_count))
+    store.process_manager_data(data='\n'.join(manager_lines))
+
+    for item_name in store.store_data[ITEM]:
+        store.inventory.set_stock(item_name=item_name, quantity=float('inf'))
+
+    return store
+
+
+def run_checkouts(store: StoreManager, baskets: list, thread_count: int) -> float:
+    """
+    Bill all the baskets, split across the given number of threads.
+
+    Args:
+        store: store manager
+        baskets: processed baskets to be billed
+        thread_count: number of concurrent checkouts
+
+    Returns:
+        throughput in bills per second
+    """
+
+    def checkout(thread_baskets: list) -> None:
+        for processed_data in thread_baskets:
+            store.calculate_bill(processed_data=processed_data, reserve_stock=True)
+
+    threads = [threading.Thread(target=checkout, args=(baskets[index::thread_count],))
+               for index in range(thread_count)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return len(baskets) / (time.perf_counter() - start)
+
+
+def run(item_count: int, basket_count: int, basket_size: int, thread_counts: list, stripe_count: int) -> None:
+    """
+    Run the benchmark and print the throughput and the lock usage for each concurrency level.
+
+    Args:
+        item_count: number of items in the store
+        basket_count: number of baskets billed for each concurrency level
+        basket_size: number of lines in each basket
+        thread_counts: concurrency levels to be benchmarked
+        stripe_count: number of locks the inventory is striped across
+
+    Returns:
+        None
+    """
+
+    randomizer = random.Random(7)
+
+    gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"GIL enabled: {'yes, the throughput does not scale with the threads' if gil_enabled else 'no'}")
+
+    columns = ('bills/s', 'contended %', 'wait (us)', 'hold (us)')
+    print(f"{'':>8} " + ' '.join(f"{label:>{len(columns) * 12 - 1}}"
+                                 for label in ('global lock', f'{stripe_count} stripes')))
+    print(f"{'threads':>8} " + ' '.join(f"{column:>11}" for column in columns * 2))
+
+    for thread_count in thread_counts:
+        results = []
+
+        for stripes in (1, stripe_count):
+            store = build_store(item_count=item_count, stripe_count=stripes)
+            item_names = list(store.store_data[ITEM])
+            customer_inputs = [', '.join(f'{randomizer.choice(item_names)} {randomizer.randint(1, 5)}kg'
+                                         for _ in range(basket_size))
+                               for _ in range(basket_count)]
+
+            with redirect_stdout(io.StringIO()):
+                baskets = [store.process_customer_input(customer_data=customer_input)
+                           for customer_input in customer_inputs]
+
+            # only the checkouts are measured, the locks taken while setting the stock are not counted
+            store.inventory.stripes = [TimedLock() for _ in range(stripes)]
+
+            throughput = run_checkouts(store=store, baskets=baskets, thread_count=thread_count)
+            stats = lock_stats(locks=store.inventory.stripes)
+            results.extend((f'{throughput:.0f}', f"{stats['contended']:.2f}", f"{stats['wait']:.2f}",
+                            f"{stats['hold']:.2f}"))
+
+        print(f"{thread_count:>8} " + ' '.join(f"{result:>11}" for result in results))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Inventory contention benchmark')
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--baskets', type=int, default=20000)
+    parser.add_argument('--basket-size', type=int, default=8)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--stripes', type=int, default=64)
+    parser.add_argument('--switch-interval', type=float,
+                        help='thread switch interval in seconds, a small one preempts the threads more often while '
+                             'they hold a lock')
+    cli_args = parser.parse_args()
+
+    if cli_args.switch_interval:
+        sys.setswitchinterval(cli_args.switch_interval)
+
+    run(item_count=cli_args.items, basket_count=cli_args.baskets, basket_size=cli_args.basket_size,
+        thread_counts=cli_args.threads, stripe_count=cli_args.stripes)
@@ -0,0 +1,437 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the checkout load harness. It replays recorded or synthetic basket streams against an
+# in-process store manager at a target rate with several concurrent clients, optionally reloading the catalog at the
+# same time, and reports the offered and achieved throughput and the latency percentiles for every interval of the run
+
+import argparse
+import itertools
+import math
+import os
+import random
+import threading
+import time
+
+from contextlib import redirect_stdout
+from typing import Any, Iterator
+
+from src.constants import ITEM
+from src.exceptions.exceptions import CustomerInputProcessingError, BillGenerationError
+from src.store_manager.store_manager_runner import StoreManager
+from src.utilities import read_file, iter_file_lines
+
+"""
+Share of the offered throughput below which the achieved throughput is flagged, leaving room for the jitter of the
+intervals
+"""
+SHORTFALL_TOLERANCE = 0.05
+
+
+class LatencyHistogram:
+    """
+    This class is a log bucketed latency histogram. Every bucket is (1 + precision) times wider than the previous one,
+    so percentiles are accurate within the precision whatever the latency range.
+    """
+
+    def __init__(self, precision: float = 0.01) -> None:
+        """
+        Initialization method for latency histogram class.
+
+        Args:
+            precision: relative width of the buckets
+        """
+
+        self.log_base = math.log(1 + precision)
+        self.buckets = {}
+        self.count = 0
+        self.max_latency = 0.0
+
+    def record(self, latency: float) -> None:
+        """
+        Record a latency.
+
+        Args:
+            latency: latency in seconds
+
+        Returns:
+            None
+        """
+
+        bucket_id = int(math.log(max(latency, 1e-9) * 1e9) / self.log_base)
+        self.buckets[bucket_id] = self.buckets.get(bucket_id, 0) + 1
+        self.count += 1
+        self.max_latency = max(self.max_latency, latency)
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """
+        Add the latencies recorded by another histogram.
+
+        Args:
+            other: histogram to be merged
+
+        Returns:
+            None
+        """
+
+        for bucket_id, count in other.buckets.items():
+            self.buckets[bucket_id] = self.buckets.get(bucket_id, 0) + count
+
+        self.count += other.count
+        self.max_latency = max(self.max_latency, other.max_latency)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Return the latency below which the given percent of the recorded latencies fall.
+
+        Args:
+            percent: percent between 0 and 100
+
+        Returns:
+            latency in seconds
+        """
+
+        if not self.count:
+            return 0.0
+
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+
+        for bucket_id in sorted(self.buckets):
+            seen += self.buckets[bucket_id]
+
+            if seen >= rank:
+                # upper bound of the bucket, capped by the max latency seen
+                return min(math.exp((bucket_id + 1) * self.log_base) / 1e9, self.max_latency)
+
+        return self.max_latency
+
+
+def synthetic_baskets(store: StoreManager, basket_size: int, error_rate: float, seed: int = 7) -> Iterator:
+    """
+    Generate an endless stream of customer inputs for the items of the store. A share of the lines are the error
+    cases handled while processing the customer input: unknown items, bad units and missing quantities.
+
+    Args:
+        store: store manager
+        basket_size: number of lines in each basket
+        error_rate: share of the lines which are invalid
+        seed: seed of the random generator
+
+    Returns:
+        iterator over customer inputs
+    """
+
+    randomizer = random.Random(seed)
+    items = [store.store_data[ITEM][item_name] for item_name in store.store_data[ITEM]]
+
+    def valid_line() -> str:
+        item_obj = randomizer.choice(items)
+        return f'{item_obj.name} {randomizer.randint(1, 5)}{item_obj.unit}'
+
+    invalid_lines = (
+        lambda: f'unknown item {randomizer.randint(1, 1000)} 1kg',
+        lambda: f'{randomizer.choice(items).name} 2xyz',
+        lambda: f'{randomizer.choice(items).name}',
+        lambda: f'{randomizer.choice(items).name} kg',
+    )
+
+    while True:
+        yield ', '.join(randomizer.choice(invalid_lines)() if randomizer.random() < error_rate else valid_line()
+                        for _ in range(basket_size))
+
+
+def recorded_baskets(file: str) -> Iterator:
+    """
+    Replay the baskets recorded in a file, one basket per line, over and over.
+
+    Args:
+        file: file containing the recorded baskets
+
+    Returns:
+        iterator over customer inputs
+    """
+
+    while True:
+        for line_data in iter_file_lines(file=file):
+            if line_data.strip():
+                yield line_data
+
+
+class LoadHarness:
+    """
+    This class drives the load. Every client sends baskets on a fixed schedule (open loop), and the latency of a basket
+    is measured from the time it was scheduled, so that the time spent waiting behind slow baskets is included.
+    """
+
+    def __init__(self, store: StoreManager, baskets: Iterator, client_count: int, target_rate: float,
+                 duration: float, interval: float = 1.0, catalog_data: str = None,
+                 catalog_update_period: float = None) -> None:
+        """
+        Initialization method for load harness class.
+
+        Args:
+            store: store manager the load is driven against
+            baskets: customer inputs to be sent
+            client_count: number of concurrent clients
+            target_rate: total baskets per second sent by all the clients
+            duration: seconds the load is driven for
+            interval: seconds covered by each reported interval
+            catalog_data: manager data reloaded while the load is running
+            catalog_update_period: seconds between two catalog reloads
+        """
+
+        self.store = store
+        self.baskets = baskets
+        self.client_count = client_count
+        self.target_rate = target_rate
+        self.duration = duration
+        self.interval = interval
+        self.catalog_data = catalog_data
+        self.catalog_update_period = catalog_update_period
+
+        # the basket stream is shared by the clients
+        self.baskets_lock = threading.Lock()
+
+        # per client mapping of interval number to [histogram, completed bills, rejected baskets, sent baskets]. Sent
+        # baskets are counted in the interval they were scheduled in, the others in the interval they finished in
+        self.client_results = [{} for _ in range(client_count)]
+        self.client_last_finished = [0.0] * client_count
+        self.start = None
+        self.catalog_updates = 0
+        self.stopped = threading.Event()
+
+    def run(self) -> list:
+        """
+        Drive the load and collect the results.
+
+        Returns:
+            list of results for each interval
+        """
+
+        start = self.start = time.perf_counter() + 0.05
+        clients = [threading.Thread(target=self._run_client, args=(client_id, start))
+                   for client_id in range(self.client_count)]
+        updater = threading.Thread(target=self._run_catalog_updates)
+
+        # errors are reported by the store manager on stdout, keep them out of the report
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            if self.catalog_data and self.catalog_update_period:
+                updater.start()
+
+            for client in clients:
+                client.start()
+
+            for client in clients:
+                client.join()
+
+            self.stopped.set()
+
+            if updater.is_alive():
+                updater.join()
+
+        return self._merge_results()
+
+    def _run_client(self, client_id: int, start: float) -> None:
+        """
+        Send baskets on the client's schedule until the end of the run.
+
+        Args:
+            client_id: id of the client
+            start: start of the run
+
+        Returns:
+            None
+        """
+
+        period = self.client_count / self.target_rate
+        results = self.client_results[client_id]
+
+        for sequence in itertools.count():
+            # spread the clients evenly within a period
+            scheduled = start + (sequence + client_id / self.client_count) * period
+            if scheduled - start >= self.duration:
+                break
+
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self.baskets_lock:
+                customer_data = next(self.baskets)
+
+            try:
+                processed_data = self.store.process_customer_input(customer_data=customer_data)
+                self.store.calculate_bill(processed_data=processed_data)
+                outcome = 1
+
+            except (CustomerInputProcessingError, BillGenerationError):
+                outcome = 2
+
+            finished = self.client_last_finished[client_id] = time.perf_counter()
+
+            self._interval_results(results=results, elapsed=scheduled - start)[3] += 1
+
+            interval_results = self._interval_results(results=results, elapsed=finished - start)
+            interval_results[0].record(latency=finished - scheduled)
+            interval_results[outcome] += 1
+
+    def _interval_results(self, results: dict, elapsed: float) -> list:
+        """
+        Find the results of the interval a time of the run falls in.
+
+        Args:
+            results: per interval results of a client
+            elapsed: seconds since the start of the run
+
+        Returns:
+            [histogram, completed bills, rejected baskets, sent baskets] of the interval
+        """
+
+        interval_id = int(elapsed / self.interval)
+        interval_results = results.get(interval_id)
+
+        if interval_results is None:
+            interval_results = results[interval_id] = [LatencyHistogram(), 0, 0, 0]
+
+        return interval_results
+
+    def _run_catalog_updates(self) -> None:
+        """
+        Reload the catalog periodically until the clients are done.
+
+        Returns:
+            None
+        """
+
+        while not self.stopped.wait(timeout=self.catalog_update_period):
+            self.store.process_manager_data(data=self.catalog_data)
+            self.catalog_updates += 1
+
+    def _merge_results(self) -> list:
+        """
+        Merge the results of all the clients interval by interval.
+
+        Returns:
+            list of results for each interval
+        """
+
+        merged = {}
+
+        for results in self.client_results:
+            for interval_id, (histogram, completed, rejected, sent) in results.items():
+                interval_results = merged.setdefault(interval_id, [LatencyHistogram(), 0, 0, 0])
+                interval_results[0].merge(histogram)
+                interval_results[1] += completed
+                interval_results[2] += rejected
+                interval_results[3] += sent
+
+        return [
+            {
+                'interval': interval_id,
+                'offered': sent / self.interval,
+                'throughput': (completed + rejected) / self.interval,
+                'below_offered': (completed + rejected) < sent * (1 - SHORTFALL_TOLERANCE),
+                'completed': completed,
+                'rejected': rejected,
+                'p50': histogram.percentile(50),
+                'p95': histogram.percentile(95),
+                'p99': histogram.percentile(99),
+                'max': histogram.max_latency
+            }
+            for interval_id, (histogram, completed, rejected, sent) in sorted(merged.items())
+        ]
+
+    def summarize(self, results: list) -> dict:
+        """
+        Compare the throughput achieved over the whole run with the offered one. The run lasts until the last basket
+        has finished, so a store which can not keep up achieves less than it was offered.
+
+        Args:
+            results: results of each interval
+
+        Returns:
+            offered and achieved throughput, and whether the achieved one fell below the offered one
+        """
+
+        sent = sum(result['offered'] for result in results) * self.interval
+        finished = sum(result['completed'] + result['rejected'] for result in results)
+        run_time = max(max(self.client_last_finished) - self.start, self.duration)
+
+        offered, achieved = sent / self.duration, finished / run_time
+
+        return {
+            'offered': offered,
+            'achieved': achieved,
+            'below_offered': achieved < offered * (1 - SHORTFALL_TOLERANCE)
+        }
+
+
+def print_report(results: list, interval: float) -> None:
+    """
+    Print the results of each interval.
+
+    Args:
+        results: results of each interval
+        interval: seconds covered by each interval
+
+    Returns:
+        None
+    """
+
+    print(f"{'time (s)':>9} {'offered/s':>10} {'achieved/s':>11} {'rejected':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} "
+          f"{'p99 (ms)':>9} {'max (ms)':>9}")
+
+    for result in results:
+        print(f"{result['interval'] * interval:>9.1f} {result['offered']:>10.0f} {result['throughput']:>11.0f} "
+              f"{result['rejected']:>9} {result['p50'] * 1000:>9.3f} {result['p95'] * 1000:>9.3f} "
+              f"{result['p99'] * 1000:>9.3f} {result['max'] * 1000:>9.3f}" +
+              (' below offered' if result['below_offered'] else ''))
+
+
+def main(cli_args: Any) -> None:
+    """
+    Build the store from the manager input and drive the load described by the command line arguments.
+
+    Args:
+        cli_args: parsed command line arguments
+
+    Returns:
+        None
+    """
+
+    store = StoreManager()
+    manager_data = read_file(file=cli_args.manager_input)
+    store.process_manager_data(data=manager_data)
+
+    if cli_args.baskets:
+        baskets = recorded_baskets(file=cli_args.baskets)
+    else:
+        baskets = synthetic_baskets(store=store, basket_size=cli_args.basket_size, error_rate=cli_args.error_rate)
+
+    harness = LoadHarness(store=store, baskets=baskets, client_count=cli_args.clients, target_rate=cli_args.rate,
+                          duration=cli_args.duration, interval=cli_args.interval,
+                          catalog_data=manager_data if cli_args.catalog_update_period else None,
+                          catalog_update_period=cli_args.catalog_update_period)
+
+    results = harness.run()
+    summary = harness.summarize(results=results)
+
+    print_report(results=results, interval=cli_args.interval)
+    print(f"offered {summary['offered']:.0f} baskets/s, achieved {summary['achieved']:.0f} baskets/s" +
+          (" - the store could not keep up with the offered load" if summary['below_offered'] else ''))
+    print(f"catalog updates during the run: {harness.catalog_updates}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Checkout load harness')
+    parser.add_argument('--manager-input', default='manager_input.txt')
+    parser.add_argument('--baskets', help='file of recorded baskets, one per line; synthetic baskets if not given')
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=2000, help='total baskets per second')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--interval', type=float, default=1)
+    parser.add_argument('--basket-size', type=int, default=8)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--catalog-update-period', type=float, help='seconds between catalog reloads')
+
+    main(cli_args=parser.parse_args())
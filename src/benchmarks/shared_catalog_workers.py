@@ -0,0 +1,145 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the shared catalog benchmark. It starts several worker processes which either attach
+# to a shared memory catalog or parse the manager input themselves, bill a few baskets, and report how long they took
+# to be ready and how much private memory they use
+
+import argparse
+import io
+import multiprocessing
+import random
+import time
+
+from contextlib import redirect_stdout
+
+from src.store_manager.shared_catalog import SharedCatalog, SharedStoreManager
+from src.store_manager.store_manager_runner import StoreManager
+
+
+def private_memory_kb() -> int:
+    """
+    Returns the private resident memory of the current process (Linux only).
+
+    Returns:
+        private resident memory in kB
+    """
+
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1])
+
+    return 0
+
+
+def build_manager_data(item_count: int) -> str:
+    """
+    Build manager data with the given number of items.
+
+    Args:
+        item_count: number of items
+
+    Returns:
+        manager data
+    """
+
+    manager_lines = [f'Category, Category {index}, {index % 10}%' for index in range(10)]
+    manager_lines.extend(f'Sub_Category, Category {index % 10}, Sub Category {index}, {index % 15}%'
+                         for index in range(100))
+    manager_lines.extend(f'Item, Sub Category {index % 100}, Item {index}, {index % 90 + 10}/kg, {index % 20}%'
+                         for index in range(item_count))
+
+    return '\n'.join(manager_lines)
+
+
+def run_worker(mode: str, source: str, item_count: int, basket_count: int, results: multiprocessing.Queue) -> None:
+    """
+    Get the catalog ready in the given mode and bill random baskets.
+
+    Args:
+        mode: 'shared' to attach to the shared catalog, 'parse' to parse the manager data
+        source: name of the shared memory region, or the manager data
+        item_count: number of items in the catalog
+        basket_count: number of baskets to be billed
+        results: queue the results are reported to
+
+    Returns:
+        None
+    """
+
+    start = time.perf_counter()
+
+    if mode == 'shared':
+        store = SharedStoreManager(shm_name=source)
+    else:
+        store = StoreManager()
+        store.process_manager_data(data=source)
+
+    ready = time.perf_counter() - start
+
+    randomizer = random.Random()
+    with redirect_stdout(io.StringIO()):
+        for _ in range(basket_count):
+            customer_data = ', '.join(f'item {randomizer.randrange(item_count)} 2kg' for _ in range(8))
+            store.calculate_bill(processed_data=store.process_customer_input(customer_data=customer_data))
+
+    results.put((ready, private_memory_kb()))
+
+    if mode == 'shared':
+        store.shared_catalog.close()
+
+
+def run(item_count: int, worker_count: int, basket_count: int) -> None:
+    """
+    Run the benchmark in both modes and print the results.
+
+    Args:
+        item_count: number of items in the catalog
+        worker_count: number of worker processes
+        basket_count: number of baskets billed by each worker
+
+    Returns:
+        None
+    """
+
+    manager_data = build_manager_data(item_count=item_count)
+
+    with redirect_stdout(io.StringIO()):
+        store = StoreManager()
+        store.process_manager_data(data=manager_data)
+
+    catalog = SharedCatalog.create(store=store)
+    context = multiprocessing.get_context('spawn')
+
+    print(f"{'mode':>8} {'workers':>8} {'avg ready (ms)':>15} {'private memory per worker (MB)':>31}")
+
+    try:
+        for mode, source in (('parse', manager_data), ('shared', catalog.name)):
+            results = context.Queue()
+            workers = [context.Process(target=run_worker, args=(mode, source, item_count, basket_count, results))
+                       for _ in range(worker_count)]
+
+            for worker in workers:
+                worker.start()
+
+            worker_results = [results.get() for _ in workers]
+
+            for worker in workers:
+                worker.join()
+
+            avg_ready = sum(ready for ready, _ in worker_results) / worker_count
+            avg_memory = sum(memory for _, memory in worker_results) / worker_count
+            print(f"{mode:>8} {worker_count:>8} {avg_ready * 1000:>15.1f} {avg_memory / 1024:>31.1f}")
+
+    finally:
+        catalog.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Shared catalog benchmark')
+    parser.add_argument('--items', type=int, default=200000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--baskets', type=int, default=1000)
+    cli_args = parser.parse_args()
+
+    run(item_count=cli_args.items, worker_count=cli_args.workers, basket_count=cli_args.baskets)
@@ -0,0 +1,219 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the command line interface of the store. Only the modules needed by the chosen options
+# are imported, and the resident mode keeps the catalog loaded and bills the baskets read from stdin, one per line
+
+import argparse
+import importlib
+import sys
+
+from contextlib import redirect_stdout
+from functools import partial
+from typing import Any, TextIO
+
+from src.exceptions.exceptions import BillGenerationError, CustomerInputProcessingError, EmptyCustomerInput, \
+    EmptyManagerInput, UnsupportedOperationError
+
+"""
+Renderer module of every output format, imported only when the format is used
+"""
+renderer_modules = {
+    'text': 'src.renderers.text_renderer',
+    'json': 'src.renderers.json_renderer'
+}
+
+
+def load_store(cli_args: argparse.Namespace) -> Any:
+    """
+    Build the store and load the catalog, promotions, coupons and stock levels given on the command line.
+
+    Args:
+        cli_args: parsed command line arguments
+
+    Returns:
+        loaded store manager
+    """
+
+    from src.utilities import read_file
+
+    manager_data = read_file(file=cli_args.manager_input)
+
+    if not manager_data:
+        raise EmptyManagerInput
+
+    if cli_args.shards:
+        from src.store_manager.sharded_store import ShardedStoreManager
+
+        store = ShardedStoreManager(shard_count=cli_args.shards)
+
+    else:
+        from src.store_manager.store_manager_runner import StoreManager
+
+        store = StoreManager()
+
+    try:
+        # process and store the initialization data for all the provided entities
+        store.process_manager_data(data=manager_data, lazy=cli_args.lazy)
+
+        if cli_args.promotion_input:
+            store.process_promotion_data(data=read_file(file=cli_args.promotion_input))
+
+        if cli_args.coupon_input:
+            store.process_coupon_data(data=read_file(file=cli_args.coupon_input))
+
+        if cli_args.stock_input:
+            store.process_stock_data(data=read_file(file=cli_args.stock_input))
+
+    except BaseException:
+        close_store(store=store)
+        raise
+
+    return store
+
+
+def close_store(store: Any) -> None:
+    """
+    Stop the worker processes of the store, if it has any.
+
+    Args:
+        store: store manager
+
+    Returns:
+        None
+    """
+
+    if hasattr(store, 'close'):
+        store.close()
+
+
+def serve(store: Any, renderer: Any, input_stream: TextIO, output: TextIO, coupon_code: str = None) -> None:
+    """
+    Bill the baskets read from the input stream, one per line, until the stream is closed. Every basket gets exactly
+    one rendered bill or error, written as soon as it is produced, so that a script can send a basket and read its
+    bill back. A basket without any valid item gets an error. The coupon code is presented with the first bill only,
+    as it can only be redeemed once.
+
+    Args:
+        store: loaded store manager
+        renderer: renderer module
+        input_stream: stream the baskets are read from
+        output: stream the bills are written to
+        coupon_code: coupon code presented with the first bill, if any
+
+    Returns:
+        None
+    """
+
+    # readline() instead of iterating the stream, so that a basket is billed as soon as its line is received
+    for basket in iter(input_stream.readline, ''):
+        basket = basket.strip()
+
+        # ignore empty lines
+        if not basket:
+            continue
+
+        try:
+            processed_data = store.process_customer_input(customer_data=basket)
+
+            # the invalid items have already been reported on stderr
+            if not processed_data:
+                renderer.render_error(basket=basket, stream=output)
+            else:
+                store.generate_bill(processed_data=processed_data, coupon_code=coupon_code)
+                coupon_code = None
+
+        except (CustomerInputProcessingError, BillGenerationError):
+            # the error has already been reported on stderr
+            renderer.render_error(basket=basket, stream=output)
+
+        output.flush()
+
+
+def main(cli_args: argparse.Namespace) -> None:
+    """
+    Run the command given on the command line. The store's messages are written to stderr, stdout only carries the
+    rendered bills or catalog diff.
+
+    Args:
+        cli_args: parsed command line arguments
+
+    Returns:
+        None
+    """
+
+    output = sys.stdout
+    renderer = importlib.import_module(renderer_modules[cli_args.format])
+
+    with redirect_stdout(sys.stderr):
+        store = load_store(cli_args=cli_args)
+        journal = None
+
+        try:
+            if cli_args.dry_run:
+                diff = store.dry_run_manager_data(file=cli_args.dry_run, worker_count=cli_args.workers)
+                renderer.render_catalog_diff(diff=diff, stream=output)
+                return
+
+            store.bill_renderer = partial(renderer.render_bill, stream=output)
+
+            if cli_args.journal:
+                from src.journal.bill_journal import BillJournal
+
+                journal = BillJournal(path=cli_args.journal)
+                store.add_bill_listener(journal.append)
+
+            if cli_args.resident:
+                serve(store=store, renderer=renderer, input_stream=sys.stdin, output=output,
+                      coupon_code=cli_args.coupon_code)
+                return
+
+            if cli_args.stream:
+                # bills are rendered as soon as their basket has been read
+                for _ in store.stream_bills(file=cli_args.customer_input, coupon_code=cli_args.coupon_code,
+                                            error_renderer=partial(renderer.render_error, stream=output)):
+                    pass
+
+                return
+
+            from src.utilities import read_file
+
+            customer_data = read_file(file=cli_args.customer_input)
+
+            if not customer_data:
+                raise EmptyCustomerInput
+
+            processed_data = store.process_customer_input(customer_data=customer_data)
+            store.generate_bill(processed_data=processed_data, coupon_code=cli_args.coupon_code)
+
+        except UnsupportedOperationError:
+            # the store has already reported why the operation is not supported
+            sys.exit(1)
+
+        finally:
+            # the journal is closed only once all the bills have been fsynced
+            if journal:
+                journal.close()
+
+            close_store(store=store)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Store billing')
+    parser.add_argument('--manager-input', default='manager_input.txt')
+    parser.add_argument('--customer-input', default='customer_input.txt')
+    parser.add_argument('--promotion-input', help='basket level promotions, none if not given')
+    parser.add_argument('--coupon-input', help='coupon campaigns, none if not given')
+    parser.add_argument('--stock-input', help='stock levels, items are not tracked if not given')
+    parser.add_argument('--coupon-code', help='coupon code presented with the customer input')
+    parser.add_argument('--journal', help='bill journal the generated bills are appended to')
+    parser.add_argument('--format', choices=sorted(renderer_modules), default='text')
+    parser.add_argument('--lazy', action='store_true', help='build the item objects on first use')
+    parser.add_argument('--shards', type=int, default=0, help='partition the catalog across worker processes')
+    parser.add_argument('--stream', action='store_true', help='bill every line of the customer input separately')
+    parser.add_argument('--resident', action='store_true',
+                        help='keep the catalog loaded and bill the baskets read from stdin, one per line')
+    parser.add_argument('--dry-run', metavar='CANDIDATE_INPUT',
+                        help='validate a candidate manager input and diff it against the loaded catalog')
+    parser.add_argument('--workers', type=int, help='validation processes of the dry run')
+
+    main(cli_args=parser.parse_args())
@@ -22,3 +22,9 @@ units_mapping = {
         'std_equivalent_unit': 'lt'
     }
 }
+
+"""
+Promotion types
+"""
+BUNDLE = "bundle"
+THRESHOLD = "threshold"
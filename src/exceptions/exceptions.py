@@ -25,3 +25,15 @@ class InvalidDiscountString(Exception):
 
 class BillGenerationError(Exception):
     """ Raise when there is some error while generating the bill. """
+
+
+class JournalCorruptedError(Exception):
+    """ Raise when a record of the bill journal fails its checksum. """
+
+
+class ShardStartError(Exception):
+    """ Raise when a shard worker process could not be started. """
+
+
+class UnsupportedOperationError(Exception):
+    """ Raise when an operation is not supported by the store. """
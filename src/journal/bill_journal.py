@@ -0,0 +1,441 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the append-only bill journal. Bills are batched and written with a single fsync per
+# batch (group commit), and read back sequentially or by bill id through an offset index
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+from typing import Any, Iterator
+
+from src.exceptions.exceptions import JournalCorruptedError
+
+"""
+Record header: payload length, crc32 of bill id and payload, bill id length. The bill id follows the header so that
+the offset index can be built without decoding the payloads
+"""
+RECORD_HEADER = struct.Struct('<IIB')
+
+
+def bill_to_record(bill: dict) -> dict:
+    """
+    Convert a generated bill into a journal record.
+
+    Args:
+        bill: generated bill
+
+    Returns:
+        record containing only plain values
+    """
+
+    return {
+        'bill_id': bill['bill_id'],
+        'timestamp': time.time(),
+        'catalog_version': bill['catalog_version'],
+        'customer_id': bill.get('customer_id'),
+        'lines': [
+            {
+                'item': line['item'].name,
+                'quantity': line['quantity'],
+                'unit': line['unit'],
+                'discount_strategy': type(line['item'].discount_strategy).__name__,
+                'discount_str': line['item'].discount_str,
+                'original_cost': line['original_cost'],
+                'new_cost': line['new_cost']
+            }
+            for line in bill['lines']
+        ],
+        'promotions': [
+            {
+                'promotion': applied_promotion['promotion'].description,
+                'lines': applied_promotion['lines'],
+                'discount': applied_promotion['discount']
+            }
+            for applied_promotion in bill['promotions']
+        ],
+        'coupon': {
+            'campaign': bill['coupon']['campaign'].name,
+            'code': bill['coupon']['code'],
+            'discount': bill['coupon']['discount']
+        } if bill.get('coupon') else None,
+        'total_original_cost': bill['total_original_cost'],
+        'total_new_cost': bill['total_new_cost']
+    }
+
+
+def encode_record(record: dict) -> bytes:
+    """
+    Encode a journal record with its length prefixed and checksummed header.
+
+    Args:
+        record: journal record
+
+    Returns:
+        encoded record
+    """
+
+    bill_id = record['bill_id'].encode()
+    payload = json.dumps(record, separators=(',', ':')).encode()
+
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload, zlib.crc32(bill_id)), len(bill_id)) + bill_id + \
+        payload
+
+
+class BillJournal:
+    """
+    This class appends bills to the journal. A background thread writes the pending records as one batch and fsyncs
+    once per batch, a batch is written as soon as it is full or its oldest record has waited for max_latency seconds.
+    """
+
+    def __init__(self, path: str, max_batch_size: int = 512, max_latency: float = 0.005) -> None:
+        """
+        Initialization method for bill journal class.
+
+        Args:
+            path: path of the journal file
+            max_batch_size: max number of records written with one fsync
+            max_latency: max seconds a record waits before its batch is written
+        """
+
+        self.path = path
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+
+        # drop a partially written record left at the end of the journal by a crash, so that the records appended
+        # from now on are not written after it
+        if os.path.exists(path):
+            valid_length = BillJournalReader(path=path).valid_length()
+            torn_length = os.path.getsize(path) - valid_length
+
+            if torn_length:
+                print(f"Bill journal {path} ends with {torn_length} bytes of a partially written record. Truncating "
+                      f"them.")
+                os.truncate(path, valid_length)
+
+        self.file = open(path, 'ab')
+
+        # records waiting to be written, and the sequence numbers of the appended and durable records
+        self.pending_records = []
+        self.appended_count = 0
+        self.durable_count = 0
+        self.oldest_pending_time = None
+        self.error = None
+        self.closed = False
+
+        self.condition = threading.Condition()
+        self.writer = threading.Thread(target=self._run_writer, name='bill-journal-writer', daemon=True)
+        self.writer.start()
+
+    def __enter__(self) -> 'BillJournal':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def append(self, bill: dict, wait: bool = False) -> None:
+        """
+        Append a generated bill to the journal. This can be registered directly as a bill listener of the store
+        manager.
+
+        Args:
+            bill: generated bill
+            wait: if True, block until the bill has been fsynced
+
+        Returns:
+            None
+        """
+
+        self.append_record(record=bill_to_record(bill=bill), wait=wait)
+
+    def append_record(self, record: dict, wait: bool = False) -> None:
+        """
+        Append a journal record.
+
+        Args:
+            record: journal record
+            wait: if True, block until the record has been fsynced
+
+        Returns:
+            None
+        """
+
+        encoded_record = encode_record(record=record)
+
+        with self.condition:
+            if self.closed:
+                raise ValueError("Bill journal is closed")
+
+            self.pending_records.append(encoded_record)
+            self.appended_count += 1
+            sequence = self.appended_count
+
+            # the writer waits without a timeout while nothing is pending, wake it up to start the batch's deadline
+            if len(self.pending_records) == 1:
+                self.oldest_pending_time = time.monotonic()
+                self.condition.notify_all()
+
+            if len(self.pending_records) >= self.max_batch_size:
+                self.condition.notify_all()
+
+            if wait:
+                self.condition.notify_all()
+                self.condition.wait_for(lambda: self.durable_count >= sequence or self.error)
+
+                if self.error:
+                    raise self.error
+
+    def flush(self) -> None:
+        """
+        Block until all the appended records have been fsynced.
+
+        Returns:
+            None
+        """
+
+        with self.condition:
+            sequence = self.appended_count
+            self.condition.notify_all()
+            self.condition.wait_for(lambda: self.durable_count >= sequence or self.error)
+
+            if self.error:
+                raise self.error
+
+    def close(self) -> None:
+        """
+        Write the pending records and close the journal.
+
+        Returns:
+            None
+        """
+
+        with self.condition:
+            if self.closed:
+                return
+
+            self.closed = True
+            self.condition.notify_all()
+
+        self.writer.join()
+        self.file.close()
+
+    def _run_writer(self) -> None:
+        """
+        Write the pending records in batches until the journal is closed.
+
+        Returns:
+            None
+        """
+
+        while True:
+            with self.condition:
+                # wait until the batch is full, the oldest record is due or the journal is closed
+                while not self.closed:
+                    if len(self.pending_records) >= self.max_batch_size:
+                        break
+
+                    if self.pending_records:
+                        time_left = self.oldest_pending_time + self.max_latency - time.monotonic()
+                        if time_left <= 0:
+                            break
+
+                        self.condition.wait(timeout=time_left)
+                    else:
+                        self.condition.wait()
+
+                if not self.pending_records and self.closed:
+                    return
+
+                batch = self.pending_records[:self.max_batch_size]
+                del self.pending_records[:self.max_batch_size]
+
+                # the records left over keep the deadline of the batch, they have waited at least as long as its oldest
+                # record and are written right after it
+
+            try:
+                # write the whole batch and make it durable with a single fsync
+                self.file.write(b''.join(batch))
+                self.file.flush()
+                os.fsync(self.file.fileno())
+
+            except Exception as e:
+                with self.condition:
+                    self.error = e
+                    self.condition.notify_all()
+                return
+
+            with self.condition:
+                self.durable_count += len(batch)
+                self.condition.notify_all()
+
+
+class BillJournalReader:
+    """
+    This class reads the bill journal sequentially, or looks up records by bill id through an offset index.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20) -> None:
+        """
+        Initialization method for bill journal reader class.
+
+        Args:
+            path: path of the journal file
+            buffer_size: size of the read buffer
+        """
+
+        self.path = path
+        self.buffer_size = buffer_size
+        self.index = None
+
+    def __iter__(self) -> Iterator:
+        """
+        Iterate over all the records of the journal.
+
+        Returns:
+            iterator over (offset, record)
+        """
+
+        for offset, bill_id, payload in self._iter_raw_records(decode_payload=True):
+            yield offset, json.loads(payload)
+
+    def build_index(self) -> dict:
+        """
+        Build the offset index of the journal without decoding the payloads.
+
+        Returns:
+            mapping of bill id to record offset
+        """
+
+        self.index = {bill_id: offset for offset, bill_id, _ in self._iter_raw_records(decode_payload=False)}
+
+        return self.index
+
+    def read_at(self, offset: int) -> dict:
+        """
+        Read the record at the given offset.
+
+        Args:
+            offset: record offset
+
+        Returns:
+            journal record
+        """
+
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            _, _, payload = self._read_record(f=f, offset=offset, decode_payload=True)
+
+        return json.loads(payload)
+
+    def find(self, bill_id: str) -> Any:
+        """
+        Look up a record by its bill id.
+
+        Args:
+            bill_id: bill id
+
+        Returns:
+            journal record if found, else None
+        """
+
+        if self.index is None:
+            self.build_index()
+
+        offset = self.index.get(bill_id)
+
+        return None if offset is None else self.read_at(offset=offset)
+
+    def valid_length(self) -> int:
+        """
+        Find the end of the last complete record whose checksum matches, scanning the journal from the start.
+
+        Returns:
+            length of the valid part of the journal
+        """
+
+        with open(self.path, 'rb', buffering=self.buffer_size) as f:
+            file_size = os.fstat(f.fileno()).st_size
+            offset = 0
+
+            while True:
+                try:
+                    record = self._read_record(f=f, offset=offset, decode_payload=True, file_size=file_size)
+
+                except (JournalCorruptedError, UnicodeDecodeError):
+                    return offset
+
+                if record is None:
+                    return offset
+
+                offset = f.tell()
+
+    def _iter_raw_records(self, decode_payload: bool) -> Iterator:
+        """
+        Iterate over the raw records of the journal. A partially written record at the end of the journal (E.g: after
+        a crash) is ignored.
+
+        Args:
+            decode_payload: if False, the payloads are skipped without being read or checked
+
+        Returns:
+            iterator over (offset, bill id, payload)
+        """
+
+        with open(self.path, 'rb', buffering=self.buffer_size) as f:
+            file_size = os.fstat(f.fileno()).st_size
+            offset = 0
+
+            while True:
+                record = self._read_record(f=f, offset=offset, decode_payload=decode_payload, file_size=file_size)
+
+                if record is None:
+                    return
+
+                yield record
+                offset = f.tell()
+
+    @staticmethod
+    def _read_record(f: Any, offset: int, decode_payload: bool, file_size: int = None) -> Any:
+        """
+        Read the record starting at the current position of the file.
+
+        Args:
+            f: journal file
+            offset: current position of the file
+            decode_payload: if False, the payload is skipped without being read or checked
+            file_size: size of the journal file, required when the payload is skipped. If given, a payload length
+                going past the end of the file is found without reading the payload
+
+        Returns:
+            (offset, bill id, payload) if a complete record is found, else None
+        """
+
+        header = f.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return None
+
+        payload_length, checksum, bill_id_length = RECORD_HEADER.unpack(header)
+
+        bill_id = f.read(bill_id_length)
+        if len(bill_id) < bill_id_length:
+            return None
+
+        # make sure the payload was completely written before reading or skipping it
+        if file_size is not None and f.tell() + payload_length > file_size:
+            return None
+
+        if not decode_payload:
+            f.seek(payload_length, os.SEEK_CUR)
+            return offset, bill_id.decode(), None
+
+        payload = f.read(payload_length)
+        if len(payload) < payload_length:
+            return None
+
+        if zlib.crc32(payload, zlib.crc32(bill_id)) != checksum:
+            raise JournalCorruptedError(f"Checksum mismatch for the record at offset {offset}")
+
+        return offset, bill_id.decode(), payload
@@ -22,8 +22,12 @@ class Category(Entity):
         """
 
         self.name = name
+        self.discount_str = discount_str
         self.discount_strategy = Entity.factory_for_discount(discount_str)(discount_str)
 
+        # dense integer sku, assigned when the entity is stored
+        self.sku = None
+
     @staticmethod
     def validate_args(*args: Any) -> bool:
         """
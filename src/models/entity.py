@@ -65,6 +65,16 @@ class Entity:
         # find the discount class to be used and then validate the string
         return Entity.factory_for_discount(discount_str).validate(discount_str)
 
+    def get_parent(self) -> Any:
+        """
+        Returns the parent entity of the current entity.
+
+        Returns:
+            parent entity, None if the entity doesn't have a parent
+        """
+
+        return None
+
     @abstractmethod
     def get_max_discount(self) -> None:
         """
@@ -2,10 +2,13 @@
 #
 #   Purpose: This file contains entity class for item
 
+from array import array
+from bisect import bisect_left
 from typing import Any
 
 from src.models.entity import Entity
 from src.models.discount import DiscountStrategy
+from src.models.pricing_kernel import build_pricing_kernel
 from src.models.sub_category import SubCategory
 from src.enums import StandardUnits
 from src.constants import units_mapping
@@ -20,14 +23,36 @@ class Item(Entity):
         Args:
             sub_category: item's sub-category name
             name: item's name
-            price_str: item's price str
+            price_str: item's price str, optionally followed by volume tiers, E.g: '40/kg;10kg=36;100kg=32'
             discount_str: items's discount string
         """
 
         self.sub_category = sub_category
         self.name = name
-        self.price_per_unit, self.unit = self._extract_price_and_unit(price_str=price_str)
+        self.price_str = price_str
+        self.discount_str = discount_str
+        self.price_per_unit, self.unit = self._extract_price_and_unit(price_str=price_str.split(';')[0])
+
+        # volume tiers: the whole quantity is priced at tier_rates[i] once it is above tier_thresholds[i - 1]
+        self.tier_thresholds, self.tier_rates = self._extract_tiers(price_str=price_str,
+                                                                   price_per_unit=self.price_per_unit)
         self.discount_strategy = Entity.factory_for_discount(discount_str)(discount_str)
+        self.pricing_kernel = None
+        self.compile_pricing_kernel()
+
+        # dense integer sku, assigned when the entity is stored
+        self.sku = None
+
+    def compile_pricing_kernel(self) -> None:
+        """
+        Build the pricing kernel for current item. Call this again whenever the item's discount or its parents'
+        discounts change, the store rebuilds the items under a redefined parent before publishing a reload.
+
+        Returns:
+            None
+        """
+
+        self.pricing_kernel = build_pricing_kernel(item=self)
 
     @staticmethod
     def validate_args(*args: Any) -> bool:
@@ -46,7 +71,7 @@ class Item(Entity):
     @staticmethod
     def validate_price(price_str: str) -> bool:
         """
-        Validates the price string for item.
+        Validates the price string for item, including its volume tiers if any.
 
         Args:
             price_str: string to be validated
@@ -55,6 +80,11 @@ class Item(Entity):
             True, if valid, else False
         """
 
+        # validate the base price and the tiers separately
+        if ';' in price_str:
+            price_str, *tier_strs = price_str.split(';')
+            return Item.validate_price(price_str) and Item.validate_tiers(tier_strs=tier_strs, price_str=price_str)
+
         # if no digit is found, return false
         if not extract_required_data(data_str=price_str, req_type=r'\d+'):
             return False
@@ -73,6 +103,65 @@ class Item(Entity):
 
         return True
 
+    @staticmethod
+    def validate_tiers(tier_strs: list, price_str: str) -> bool:
+        """
+        Validates the volume tiers of an item, E.g: ['10kg=36', '100kg=32']. Every tier must be in a unit convertible
+        to the price's unit and the thresholds must be increasing.
+
+        Args:
+            tier_strs: tier strings to be validated
+            price_str: base price string of the item
+
+        Returns:
+            True, if valid, else False
+        """
+
+        price_unit = price_str[price_str.index('/') + 1:]
+        price_std_unit = units_mapping[price_unit]['std_equivalent_unit'] if price_unit in units_mapping else price_unit
+
+        previous_threshold = 0.0
+
+        for tier_str in tier_strs:
+            if tier_str.count('=') != 1:
+                print(f"Please specify the tier {tier_str} as <quantity>=<price>")
+                return False
+
+            threshold_str, rate_str = tier_str.split('=')
+
+            if not extract_required_data(data_str=threshold_str, req_type=r'\d+') or \
+                    not extract_required_data(data_str=rate_str, req_type=r'\d+'):
+                return False
+
+            # tier unit must be convertible to the price's unit
+            threshold_unit = extract_required_data(data_str=threshold_str, req_type=r'[a-zA-Z]+')
+            threshold_std_unit = (units_mapping[threshold_unit]['std_equivalent_unit']
+                                  if threshold_unit in units_mapping else threshold_unit)
+
+            if not StandardUnits.has_value(threshold_std_unit) or threshold_std_unit != price_std_unit:
+                print(f"Please add a valid unit for the tier {tier_str}")
+                return False
+
+            threshold = Item._to_std_quantity(quantity_str=threshold_str)
+
+            if threshold <= previous_threshold:
+                print(f"Tier thresholds must be increasing, found {tier_str}")
+                return False
+
+            previous_threshold = threshold
+
+        return True
+
+    def get_parent(self) -> Any:
+        """
+        Returns the parent entity of the current entity.
+
+        Returns:
+            parent entity, None if the entity doesn't have a parent
+        """
+
+        return self.sub_category
+
     def get_max_discount(self) -> int:
         """
         This will return the max discount between current entity and its parent class.
@@ -84,7 +173,8 @@ class Item(Entity):
         # return max discount between current entity and its parent class
         return max(self.discount_strategy.discount, self.sub_category.get_max_discount())
 
-    def _extract_price_and_unit(self, price_str: str) -> tuple:
+    @staticmethod
+    def _extract_price_and_unit(price_str: str) -> tuple:
         """
         Extract item price per unit from the price string.
 
@@ -111,6 +201,71 @@ class Item(Entity):
 
         return price, unit
 
+    @staticmethod
+    def _extract_tiers(price_str: str, price_per_unit: float) -> tuple:
+        """
+        Extract the volume tiers from the price string.
+
+        Args:
+            price_str: price string
+            price_per_unit: base price per standard unit
+
+        Returns:
+            sorted tier thresholds in standard units, rate for each tier per standard unit starting with the base price
+        """
+
+        tier_thresholds = array('d')
+        tier_rates = array('d', [price_per_unit])
+
+        # rates are given per the price's unit, convert them the same way as the base price
+        base_price_str = price_str.split(';')[0]
+        price_unit = base_price_str[base_price_str.index('/') + 1:]
+        rate_factor = units_mapping[price_unit]['std_equivalent_val'] if price_unit in units_mapping else 1
+
+        for tier_str in price_str.split(';')[1:]:
+            threshold_str, rate_str = tier_str.split('=')
+
+            tier_thresholds.append(Item._to_std_quantity(quantity_str=threshold_str))
+            tier_rates.append(float(extract_required_data(data_str=rate_str,
+                                                          req_type=r'[+-]?([0-9]+([.][0-9]*)?|[.][0-9]+)')[0]) /
+                              rate_factor)
+
+        return tier_thresholds, tier_rates
+
+    @staticmethod
+    def _to_std_quantity(quantity_str: str) -> float:
+        """
+        Convert a quantity string to standard units, E.g: '500gm' to 0.5.
+
+        Args:
+            quantity_str: quantity string
+
+        Returns:
+            quantity in standard units
+        """
+
+        quantity = float(extract_required_data(data_str=quantity_str,
+                                               req_type=r'[+-]?([0-9]+([.][0-9]*)?|[.][0-9]+)')[0])
+        unit = extract_required_data(data_str=quantity_str, req_type=r'[a-zA-Z]+')
+
+        if unit in units_mapping:
+            quantity *= units_mapping[unit]['std_equivalent_val']
+
+        return quantity
+
+    def get_unit_price(self, quantity: float) -> float:
+        """
+        Find the price per unit for a quantity of current item, by binary search over the volume tiers.
+
+        Args:
+            quantity: quantity of current item in standard units
+
+        Returns:
+            price per standard unit
+        """
+
+        return self.tier_rates[bisect_left(self.tier_thresholds, quantity)]
+
     def get_discount(self, *args: Any) -> DiscountStrategy:
         """
         Return discount for the current item
@@ -133,4 +288,4 @@ class Item(Entity):
             total price
         """
 
-        return self.price_per_unit * quantity
+        return self.get_unit_price(quantity=quantity) * quantity
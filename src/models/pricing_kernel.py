@@ -0,0 +1,101 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the pricing kernel registry. A pricing kernel is a callable precompiled once per item
+# which takes a standardized quantity and returns (original cost, discount, new cost)
+
+from bisect import bisect_left
+from typing import Any, Callable
+
+from src.models.item_wise_discount import ItemWiseDiscountStrategy
+from src.models.percentage_wise_discount import PercentageWiseDiscountStrategy
+
+# mapping of discount strategy classes to the factories building the pricing kernels for them
+kernel_factories = {}
+
+
+def register_kernel_factory(strategy_cls: type, factory: Callable) -> None:
+    """
+    Register a pricing kernel factory for a discount strategy class. The factory takes an item and returns its kernel.
+
+    Args:
+        strategy_cls: discount strategy class
+        factory: kernel factory for the discount strategy class
+
+    Returns:
+        None
+    """
+
+    kernel_factories[strategy_cls] = factory
+
+
+def build_pricing_kernel(item: Any) -> Callable:
+    """
+    Build the pricing kernel for an item using the factory registered for its discount strategy.
+
+    Args:
+        item: item for which the kernel is to be built
+
+    Returns:
+        pricing kernel for the item
+    """
+
+    # look up the factory for the strategy class and then its base classes
+    for strategy_cls in type(item.discount_strategy).__mro__:
+        if strategy_cls in kernel_factories:
+            return kernel_factories[strategy_cls](item)
+
+    raise TypeError(f"No pricing kernel registered for {type(item.discount_strategy).__name__}")
+
+
+def percentage_wise_kernel_factory(item: Any) -> Callable:
+    """
+    Build the pricing kernel for an item with percentage wise discount. The max discount between the item and its
+    parents is resolved once here instead of on every bill line.
+
+    Args:
+        item: item for which the kernel is to be built
+
+    Returns:
+        pricing kernel for the item
+    """
+
+    tier_thresholds, tier_rates = item.tier_thresholds, item.tier_rates
+    max_discount = item.get_max_discount()
+
+    def kernel(quantity: float) -> tuple:
+        # the whole quantity is priced at the rate of the tier it falls in
+        original_cost = round(tier_rates[bisect_left(tier_thresholds, quantity)] * quantity, 2)
+        discount = (original_cost * max_discount) / 100
+
+        return original_cost, discount, round(original_cost - discount, 2)
+
+    return kernel
+
+
+def item_wise_kernel_factory(item: Any) -> Callable:
+    """
+    Build the pricing kernel for an item with item wise discount.
+
+    Args:
+        item: item for which the kernel is to be built
+
+    Returns:
+        pricing kernel for the item
+    """
+
+    tier_thresholds, tier_rates = item.tier_thresholds, item.tier_rates
+    get_discount = item.discount_strategy.get_discount
+
+    def kernel(quantity: float) -> tuple:
+        # the whole quantity, free items included, is priced at the rate of the tier it falls in
+        price_per_unit = tier_rates[bisect_left(tier_thresholds, quantity)]
+        original_cost = round(price_per_unit * quantity, 2)
+        discount = get_discount(quantity, price_per_unit)
+
+        return original_cost, discount, round(original_cost - discount, 2)
+
+    return kernel
+
+
+register_kernel_factory(PercentageWiseDiscountStrategy, percentage_wise_kernel_factory)
+register_kernel_factory(ItemWiseDiscountStrategy, item_wise_kernel_factory)
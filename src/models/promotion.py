@@ -0,0 +1,245 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the basket level promotion classes. Unlike discount strategies, which are attached to
+# a single entity, a promotion looks at several lines of a bill together
+
+from abc import abstractmethod
+from typing import Any
+
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM
+from src.models.percentage_wise_discount import PercentageWiseDiscountStrategy
+
+
+class Promotion:
+    """
+    This is a base class for all basket level promotions. All the promotion classes will inherit this class.
+    """
+
+    @staticmethod
+    def validate_args(*args: Any) -> bool:
+        """
+        Validates args for the promotion.
+
+        Returns:
+            True, if valid, else False
+        """
+
+        pass
+
+    @abstractmethod
+    def resolve_skus(self, sku_tables: dict) -> None:
+        """
+        Resolve the names of the entities this promotion depends on to their skus, the bills are matched by sku.
+
+        Args:
+            sku_tables: sku tables of the store, by entity type
+
+        Returns:
+            None
+        """
+
+        pass
+
+    @abstractmethod
+    def index_keys(self) -> list:
+        """
+        Returns the (entity type, entity sku) pairs this promotion depends on. The promotion engine uses them to
+        evaluate only the promotions touched by a basket.
+
+        Returns:
+            list of (entity type, entity sku) pairs
+        """
+
+        pass
+
+    @abstractmethod
+    def evaluate(self, bill_lines: list, line_groups: dict) -> Any:
+        """
+        Checks if the promotion applies to the given bill lines.
+
+        Args:
+            bill_lines: priced bill lines
+            line_groups: mapping of entity type to entity sku and the indices of the bill lines under it
+
+        Returns:
+            (indices of the consumed lines, discount) if applicable, else None
+        """
+
+        pass
+
+
+class BundlePromotion(Promotion):
+    """
+    This is the bundle promotion class. E.g: buy bread + butter, get 10% off both.
+    """
+
+    def __init__(self, items_str: str, discount_str: str) -> None:
+        """
+        Initialization method for bundle promotion class.
+
+        Args:
+            items_str: names of the items in the bundle separated by '|'
+            discount_str: discount string containing the discount in percentage
+        """
+
+        self.item_names = tuple(sorted({name.strip() for name in items_str.split('|')}))
+        self.item_skus = ()
+        self.discount_strategy = PercentageWiseDiscountStrategy(discount_str)
+        self.description = f"{' + '.join(self.item_names)} -> {self.discount_strategy.discount}% off"
+
+    @staticmethod
+    def validate_args(*args: Any) -> bool:
+        """
+        Validates args for bundle promotion.
+
+        Args:
+            *args: args to be validated
+
+        Returns:
+            True, if valid, else False
+        """
+
+        if len(args) != 2 or '%' not in args[1]:
+            return False
+
+        # a bundle needs at least two distinct items
+        item_names = {name.strip() for name in args[0].split('|') if name.strip()}
+
+        return len(item_names) > 1 and PercentageWiseDiscountStrategy.validate(args[1])
+
+    def resolve_skus(self, sku_tables: dict) -> None:
+        """
+        Resolve the names of the items of the bundle to their skus.
+
+        Args:
+            sku_tables: sku tables of the store, by entity type
+
+        Returns:
+            None
+        """
+
+        self.item_skus = tuple(sku_tables[ITEM].reserve_sku(name=name) for name in self.item_names)
+
+    def index_keys(self) -> list:
+        """
+        Returns the (entity type, entity sku) pairs this promotion depends on.
+
+        Returns:
+            list of (entity type, entity sku) pairs
+        """
+
+        return [(ITEM, sku) for sku in self.item_skus]
+
+    def evaluate(self, bill_lines: list, line_groups: dict) -> Any:
+        """
+        Checks if all the items of the bundle are present in the bill.
+
+        Args:
+            bill_lines: priced bill lines
+            line_groups: mapping of entity type to entity sku and the indices of the bill lines under it
+
+        Returns:
+            (indices of the consumed lines, discount) if applicable, else None
+        """
+
+        line_indices = []
+
+        for sku in self.item_skus:
+            # if any item of the bundle is missing, the promotion doesn't apply
+            if sku not in line_groups[ITEM]:
+                return None
+
+            line_indices.extend(line_groups[ITEM][sku])
+
+        cost = sum(bill_lines[index]['new_cost'] for index in line_indices)
+
+        return line_indices, self.discount_strategy.get_discount(cost, self.discount_strategy.discount)
+
+
+class SpendThresholdPromotion(Promotion):
+    """
+    This is the spend threshold promotion class. E.g: spend Rs 500 in Dairy, get 5% off.
+    """
+
+    def __init__(self, entity_type: str, entity_name: str, min_spend_str: str, discount_str: str) -> None:
+        """
+        Initialization method for spend threshold promotion class.
+
+        Args:
+            entity_type: type of the entity the spend is counted on
+            entity_name: name of the entity the spend is counted on
+            min_spend_str: minimum spend required to avail the promotion
+            discount_str: discount string containing the discount in percentage
+        """
+
+        self.entity_type = entity_type
+        self.entity_name = entity_name
+        self.entity_sku = None
+        self.min_spend = float(min_spend_str)
+        self.discount_strategy = PercentageWiseDiscountStrategy(discount_str)
+        self.description = f"spend Rs {self.min_spend} on {entity_name} -> {self.discount_strategy.discount}% off"
+
+    @staticmethod
+    def validate_args(*args: Any) -> bool:
+        """
+        Validates args for spend threshold promotion.
+
+        Args:
+            *args: args to be validated
+
+        Returns:
+            True, if valid, else False
+        """
+
+        if len(args) != 4 or args[0] not in (CATEGORY, SUB_CATEGORY, ITEM) or '%' not in args[3]:
+            return False
+
+        try:
+            min_spend = float(args[2])
+        except ValueError:
+            return False
+
+        return min_spend >= 0 and PercentageWiseDiscountStrategy.validate(args[3])
+
+    def resolve_skus(self, sku_tables: dict) -> None:
+        """
+        Resolve the name of the entity the spend is counted on to its sku.
+
+        Args:
+            sku_tables: sku tables of the store, by entity type
+
+        Returns:
+            None
+        """
+
+        self.entity_sku = sku_tables[self.entity_type].reserve_sku(name=self.entity_name)
+
+    def index_keys(self) -> list:
+        """
+        Returns the (entity type, entity sku) pairs this promotion depends on.
+
+        Returns:
+            list of (entity type, entity sku) pairs
+        """
+
+        return [(self.entity_type, self.entity_sku)]
+
+    def evaluate(self, bill_lines: list, line_groups: dict) -> Any:
+        """
+        Checks if the spend on the entity reaches the threshold.
+
+        Args:
+            bill_lines: priced bill lines
+            line_groups: mapping of entity type to entity sku and the indices of the bill lines under it
+
+        Returns:
+            (indices of the consumed lines, discount) if applicable, else None
+        """
+
+        line_indices = line_groups[self.entity_type].get(self.entity_sku, [])
+        cost = sum(bill_lines[index]['new_cost'] for index in line_indices)
+
+        if not line_indices or cost < self.min_spend:
+            return None
+
+        return list(line_indices), self.discount_strategy.get_discount(cost, self.discount_strategy.discount)
@@ -0,0 +1,147 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the sku table. Every entity name of an entity type is interned to a dense integer sku,
+# names are kept in a compact string table and parent links as an array of parent skus
+
+import threading
+
+from array import array
+from typing import Any
+
+# parent sku of the entities which don't have a parent
+NO_PARENT = -1
+
+
+class SkuTable:
+    """
+    This class interns the names of one entity type. Skus are assigned in insertion order starting from 0 and are
+    never reused, so they stay valid across catalog versions.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialization method for sku table class.
+        """
+
+        # string table: utf-8 encoded names back to back, the name of a sku spans offsets[sku]:offsets[sku + 1]
+        self.arena = bytearray()
+        self.offsets = array('I', [0])
+
+        # sku of the parent entity for each sku, it reflects the latest catalog version
+        self.parent_skus = array('i')
+
+        # name to sku hash
+        self.sku_map = {}
+
+        # interning is done by reloads and by lazy materialization, which may run at the same time
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.parent_skus)
+
+    def intern(self, name: str, parent_sku: int = NO_PARENT) -> int:
+        """
+        Return the sku of the name, assigning the next sku if the name is new.
+
+        Args:
+            name: entity name
+            parent_sku: sku of the entity's parent
+
+        Returns:
+            sku of the name
+        """
+
+        sku = self.sku_map.get(name)
+
+        if sku is None:
+            with self.lock:
+                sku = self.sku_map.get(name)
+
+                if sku is None:
+                    sku = len(self.parent_skus)
+                    self.arena += name.encode()
+                    self.offsets.append(len(self.arena))
+                    self.parent_skus.append(parent_sku)
+
+                    # publish the sku only once its name and parent are in place
+                    self.sku_map[name] = sku
+
+                    return sku
+
+        self.parent_skus[sku] = parent_sku
+
+        return sku
+
+    def reserve_sku(self, name: str) -> int:
+        """
+        Return the sku of the name without changing its parent, assigning the next sku if the name is new. Used by the
+        entities referring to a name which may not be in the catalog yet, E.g: promotions. The entity gets the
+        reserved sku once it is added.
+
+        Args:
+            name: entity name
+
+        Returns:
+            sku of the name
+        """
+
+        sku = self.sku_map.get(name)
+
+        return self.intern(name=name) if sku is None else sku
+
+    def get_sku(self, name: str) -> Any:
+        """
+        Return the sku of the name.
+
+        Args:
+            name: entity name
+
+        Returns:
+            sku if found, else None
+        """
+
+        return self.sku_map.get(name)
+
+    def get_name(self, sku: int) -> str:
+        """
+        Return the name of the sku from the string table.
+
+        Args:
+            sku: entity sku
+
+        Returns:
+            entity name
+        """
+
+        return self.arena[self.offsets[sku]:self.offsets[sku + 1]].decode()
+
+    def get_parent_sku(self, sku: int) -> int:
+        """
+        Return the sku of the entity's parent.
+
+        Args:
+            sku: entity sku
+
+        Returns:
+            parent sku, NO_PARENT if the entity doesn't have a parent
+        """
+
+        return self.parent_skus[sku]
+
+
+def assign_sku(sku_table: SkuTable, entity_obj: Any) -> None:
+    """
+    Intern the entity's name and set its sku. The entity's parent must already have its sku.
+
+    Args:
+        sku_table: sku table of the entity's type
+        entity_obj: entity object
+
+    Returns:
+        None
+    """
+
+    parent_obj = entity_obj.get_parent()
+    parent_sku = NO_PARENT if parent_obj is None else parent_obj.sku
+
+    entity_obj.sku = sku_table.intern(name=entity_obj.name, parent_sku=parent_sku)
@@ -25,8 +25,12 @@ class SubCategory(Entity):
 
         self.category = category
         self.name = name
+        self.discount_str = discount_str
         self.discount_strategy = Entity.factory_for_discount(discount_str)(discount_str)
 
+        # dense integer sku, assigned when the entity is stored
+        self.sku = None
+
     @staticmethod
     def validate_args(*args: Any) -> bool:
         """
@@ -41,6 +45,16 @@ class SubCategory(Entity):
 
         return len(args) == 3 and Entity.validate_discount(args[2])
 
+    def get_parent(self) -> Any:
+        """
+        Returns the parent entity of the current entity.
+
+        Returns:
+            parent entity, None if the entity doesn't have a parent
+        """
+
+        return self.category
+
     def get_max_discount(self) -> int:
         """
         This will return the max discount between current entity and its parent class.
@@ -0,0 +1,55 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the JSON renderer, writing every bill or catalog diff as a single line of JSON so that
+# the output can be read line by line from shell scripts
+
+import json
+
+from typing import TextIO
+
+from src.journal.bill_journal import bill_to_record
+
+
+def render_bill(bill: dict, stream: TextIO) -> None:
+    """
+    Render a bill as a line of JSON, in the same shape as the bill journal records.
+
+    Args:
+        bill: generated bill
+        stream: stream the bill is written to
+
+    Returns:
+        None
+    """
+
+    stream.write(json.dumps(bill_to_record(bill=bill), separators=(',', ':')) + '\n')
+
+
+def render_catalog_diff(diff: dict, stream: TextIO) -> None:
+    """
+    Render the result of a catalog dry run as a line of JSON.
+
+    Args:
+        diff: result of the dry run
+        stream: stream the diff is written to
+
+    Returns:
+        None
+    """
+
+    stream.write(json.dumps(diff, separators=(',', ':')) + '\n')
+
+
+def render_error(basket: str, stream: TextIO) -> None:
+    """
+    Render the failure of a basket as a line of JSON.
+
+    Args:
+        basket: customer input of the basket
+        stream: stream the failure is written to
+
+    Returns:
+        None
+    """
+
+    stream.write(json.dumps({'basket': basket, 'error': 'Bill could not be generated'}, separators=(',', ':')) + '\n')
@@ -0,0 +1,58 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the text renderer, printing the bills and the catalog diffs the same way as the store
+
+from contextlib import redirect_stdout
+from typing import TextIO
+
+from src.store_manager.store_manager_runner import StoreManager
+
+
+def render_bill(bill: dict, stream: TextIO) -> None:
+    """
+    Render a bill as text.
+
+    Args:
+        bill: generated bill
+        stream: stream the bill is written to
+
+    Returns:
+        None
+    """
+
+    with redirect_stdout(stream):
+        StoreManager.print_bill(bill=bill)
+
+
+def render_catalog_diff(diff: dict, stream: TextIO) -> None:
+    """
+    Render the result of a catalog dry run as text.
+
+    Args:
+        diff: result of the dry run
+        stream: stream the diff is written to
+
+    Returns:
+        None
+    """
+
+    # the dry run module pulls in multiprocessing, load it only when a diff is rendered
+    from src.store_manager.catalog_dry_run import print_catalog_diff
+
+    with redirect_stdout(stream):
+        print_catalog_diff(diff=diff)
+
+
+def render_error(basket: str, stream: TextIO) -> None:
+    """
+    Render the failure of a basket as text.
+
+    Args:
+        basket: customer input of the basket
+        stream: stream the failure is written to
+
+    Returns:
+        None
+    """
+
+    print(f"Bill could not be generated for the basket {basket}", file=stream)
@@ -0,0 +1,93 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the compact basket encoding. A processed basket is encoded as the catalog version,
+# the item skus and the standardized quantities, so that it is cheap to pass between processes. The encoding is only a
+# wire format, the decoded basket is billed by item objects like any other processed basket
+
+import struct
+
+from array import array
+from typing import Any
+
+from src.constants import ITEM
+from src.exceptions.exceptions import CustomerInputProcessingError
+from src.store_manager.catalog_snapshot import ProcessedBasket
+
+"""
+Basket header: catalog version, number of lines
+"""
+BASKET_HEADER = struct.Struct('<qI')
+
+
+def encode_basket(processed_data: list, catalog_version: int = -1) -> bytes:
+    """
+    Encode the processed lines of a basket.
+
+    Args:
+        processed_data: processed lines of the basket
+        catalog_version: version of the catalog the lines were resolved against
+
+    Returns:
+        encoded basket
+    """
+
+    catalog = getattr(processed_data, 'catalog', None)
+    if catalog is not None:
+        catalog_version = catalog.version
+
+    skus = array('i', (data['item'].sku for data in processed_data))
+    quantities = array('d', (data['quantity'] for data in processed_data))
+
+    return BASKET_HEADER.pack(catalog_version, len(skus)) + skus.tobytes() + quantities.tobytes()
+
+
+def decode_basket(data: bytes, store: Any) -> ProcessedBasket:
+    """
+    Decode an encoded basket and resolve its skus against the catalog version it was encoded with, so that its
+    quantities are read in the units of that version. A basket without a version is resolved against the store's
+    current catalog, a basket whose version is no longer alive is rejected.
+
+    Args:
+        data: encoded basket
+        store: store manager
+
+    Returns:
+        processed basket
+    """
+
+    catalog_version, line_count = BASKET_HEADER.unpack_from(data)
+
+    catalog = store.catalog
+
+    if catalog_version not in (-1, catalog.version):
+        catalog = store.live_catalogs.get(catalog_version)
+
+        if catalog is None:
+            print(f"Basket was encoded against catalog version {catalog_version} which is no longer available. "
+                  f"Current catalog version is {store.catalog.version}.")
+            raise CustomerInputProcessingError
+
+    skus = array('i')
+    skus.frombytes(data[BASKET_HEADER.size:BASKET_HEADER.size + line_count * skus.itemsize])
+
+    quantities = array('d')
+    quantities.frombytes(data[BASKET_HEADER.size + line_count * skus.itemsize:])
+
+    processed_data = []
+
+    for sku, quantity in zip(skus, quantities):
+        item_obj = store.get_entity_by_sku(entity_type=ITEM, sku=sku, store_data=catalog.store_data)
+
+        if item_obj is None:
+            print(f"Item sku {sku} was not found in catalog version {catalog.version}.")
+            raise CustomerInputProcessingError
+
+        processed_data.append(
+                {
+                    'item': item_obj,
+                    'quantity': quantity,
+                    'unit': item_obj.unit
+                }
+        )
+
+    return ProcessedBasket(lines=processed_data, catalog=catalog)
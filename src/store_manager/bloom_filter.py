@@ -0,0 +1,104 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the bloom filter. It answers 'definitely absent' or 'possibly present' for a key in
+# constant time, using a fixed size bit array sized from the expected number of keys
+
+from array import array
+from typing import Iterator
+
+"""
+Bloom filter layout: a key sets 2 bits for each of the LOOKUP_COUNT slices of LOOKUP_BITS bits at the bottom of its
+hash, all within the single 64 bit word picked by the bits above WORD_ID_SHIFT
+"""
+LOOKUP_BITS = 12
+LOOKUP_COUNT = 3
+WORD_ID_SHIFT = 36
+
+# bits set by every possible slice of a hash
+bit_masks = array('Q', ((1 << (hash_slice & 63)) | (1 << (hash_slice >> 6)) for hash_slice in range(1 << LOOKUP_BITS)))
+
+
+class BloomFilter:
+    """
+    This class is a register blocked bloom filter over 64 bit key hashes. All the bits of a key are in the same 64 bit
+    word, so adding or checking a key touches a single word. At the default 12 bits per key about 1% of the absent keys
+    are reported as possibly present.
+    """
+
+    def __init__(self, capacity: int, bits_per_key: int = 12) -> None:
+        """
+        Initialization method for bloom filter class.
+
+        Args:
+            capacity: expected number of keys
+            bits_per_key: bits of the filter for every expected key
+        """
+
+        self.word_count = max(capacity * bits_per_key // 64, 1)
+        self.words = array('Q', bytes(8 * self.word_count))
+
+    def add(self, key_hash: int) -> None:
+        """
+        Add a key.
+
+        Args:
+            key_hash: 64 bit hash of the key
+
+        Returns:
+            None
+        """
+
+        self.words[(key_hash >> WORD_ID_SHIFT) % self.word_count] |= self._mask(key_hash=key_hash)
+
+    def add_all(self, key_hashes: Iterator) -> None:
+        """
+        Add many keys.
+
+        Args:
+            key_hashes: 64 bit hashes of the keys
+
+        Returns:
+            None
+        """
+
+        words, word_count = self.words, self.word_count
+
+        # same as add, inlined since loading a campaign adds millions of keys
+        for key_hash in key_hashes:
+            words[(key_hash >> WORD_ID_SHIFT) % word_count] |= (bit_masks[key_hash & 0xFFF] |
+                                                                bit_masks[(key_hash >> 12) & 0xFFF] |
+                                                                bit_masks[(key_hash >> 24) & 0xFFF])
+
+    def might_contain(self, key_hash: int) -> bool:
+        """
+        Check whether a key may have been added.
+
+        Args:
+            key_hash: 64 bit hash of the key
+
+        Returns:
+            False if the key was definitely not added, else True
+        """
+
+        mask = self._mask(key_hash=key_hash)
+
+        return self.words[(key_hash >> WORD_ID_SHIFT) % self.word_count] & mask == mask
+
+    @staticmethod
+    def _mask(key_hash: int) -> int:
+        """
+        Return the bits of a key within its word.
+
+        Args:
+            key_hash: 64 bit hash of the key
+
+        Returns:
+            mask of the bits
+        """
+
+        mask = 0
+
+        for lookup_id in range(LOOKUP_COUNT):
+            mask |= bit_masks[(key_hash >> (lookup_id * LOOKUP_BITS)) & ((1 << LOOKUP_BITS) - 1)]
+
+        return mask
@@ -0,0 +1,207 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the cart session. A self-checkout session is built one scan at a time, and every scan
+# reprices only the item it touches, keeping the running totals up to date
+
+from typing import Any
+
+from src.constants import ITEM
+from src.models.item import Item
+from src.store_manager.catalog_snapshot import ProcessedBasket
+
+
+class CartSession:
+    """
+    This class keeps the aggregated quantity and the priced line of every item of a cart. The running totals are kept
+    in paise, so adding and removing lines never accumulates rounding errors and the totals always equal the sum of
+    the lines. Basket level promotions and coupons are only applied at checkout.
+    """
+
+    def __init__(self, store: Any) -> None:
+        """
+        Initialization method for cart session class. The session is priced against the catalog version current when
+        it starts, even if the catalog is reloaded meanwhile.
+
+        Args:
+            store: store manager
+        """
+
+        self.store = store
+        self.catalog = store.catalog
+
+        # item name mapped to its priced line, in the order the items were first scanned
+        self.lines = {}
+
+        # running totals in paise
+        self.total_original_paise = 0
+        self.total_new_paise = 0
+
+    def add_item(self, item_data: str) -> Any:
+        """
+        Add a quantity of an item to the cart, E.g: 'Amul Milk 2lt'.
+
+        Args:
+            item_data: item name followed by the quantity to be added
+
+        Returns:
+            updated line of the item if the input is valid, else None
+        """
+
+        processed_item = self._process_item(item_data=item_data)
+        if not processed_item:
+            return None
+
+        line = self.lines.get(processed_item['item'].name)
+        quantity = processed_item['quantity'] + (line['quantity'] if line else 0.0)
+
+        return self._update_line(item_obj=processed_item['item'], quantity=quantity, unit=processed_item['unit'])
+
+    def remove_item(self, item_data: str) -> Any:
+        """
+        Remove an item from the cart, E.g: 'Amul Milk' to remove it completely or 'Amul Milk 500ml' to remove only a
+        quantity of it.
+
+        Args:
+            item_data: item name, optionally followed by the quantity to be removed
+
+        Returns:
+            updated line of the item if some quantity is left, else None
+        """
+
+        item_name = (item_data.strip()).lower()
+
+        # if only the name is given, remove all the quantity of the item
+        if item_name in self.lines:
+            return self._update_line(item_obj=self.lines[item_name]['item'], quantity=0.0)
+
+        processed_item = self._process_item(item_data=item_data)
+        if not processed_item:
+            return None
+
+        line = self.lines.get(processed_item['item'].name)
+        if not line:
+            print(f"Sorry, the item {processed_item['item'].name} is not in the cart")
+            return None
+
+        return self._update_line(item_obj=line['item'],
+                                 quantity=max(line['quantity'] - processed_item['quantity'], 0.0))
+
+    def set_quantity(self, item_data: str) -> Any:
+        """
+        Change the quantity of an item in the cart, E.g: 'Amul Milk 3lt'.
+
+        Args:
+            item_data: item name followed by the new quantity
+
+        Returns:
+            updated line of the item if the input is valid, else None
+        """
+
+        processed_item = self._process_item(item_data=item_data)
+        if not processed_item:
+            return None
+
+        return self._update_line(item_obj=processed_item['item'], quantity=processed_item['quantity'],
+                                 unit=processed_item['unit'])
+
+    def get_totals(self) -> dict:
+        """
+        Return the running totals of the cart, without the basket level promotions and coupons.
+
+        Returns:
+            total original cost and total cost after the item discounts
+        """
+
+        return {
+            'total_original_cost': self.total_original_paise / 100,
+            'total_new_cost': self.total_new_paise / 100
+        }
+
+    def get_basket(self) -> ProcessedBasket:
+        """
+        Return the aggregated lines of the cart as a processed basket.
+
+        Returns:
+            processed basket resolved against the session's catalog version
+        """
+
+        processed_data = [
+            {
+                'item': line['item'],
+                'quantity': line['quantity'],
+                'unit': line['unit']
+            }
+            for line in self.lines.values()
+        ]
+
+        return ProcessedBasket(lines=processed_data, catalog=self.catalog)
+
+    def checkout(self, customer_id: Any = None, coupon_code: str = None) -> dict:
+        """
+        Generate the full bill of the cart, applying the promotions, the coupon and the stock reservation.
+
+        Args:
+            customer_id: id of the customer the bill is generated for, if known
+            coupon_code: coupon code presented by the customer, if any
+
+        Returns:
+            the generated bill
+        """
+
+        return self.store.generate_bill(processed_data=self.get_basket(), customer_id=customer_id,
+                                        coupon_code=coupon_code)
+
+    def _process_item(self, item_data: str) -> Any:
+        """
+        Process and validate a single scan against the session's catalog version.
+
+        Args:
+            item_data: item name followed by a quantity
+
+        Returns:
+            item data with the quantity in standard units if valid, else None
+        """
+
+        return self.store._process_single_item(item_data=(item_data.strip()).lower(),
+                                               item_data_map=self.catalog.store_data[ITEM])
+
+    def _update_line(self, item_obj: Item, quantity: float, unit: str = None) -> Any:
+        """
+        Reprice the line of an item for its new quantity and update the running totals.
+
+        Args:
+            item_obj: item object
+            quantity: new aggregated quantity in standard units, 0 to remove the line
+            unit: standard unit of the quantity
+
+        Returns:
+            updated line of the item, None if the line has been removed
+        """
+
+        # take the old line out of the totals
+        line = self.lines.get(item_obj.name)
+        if line:
+            self.total_original_paise -= line['original_paise']
+            self.total_new_paise -= line['new_paise']
+
+        if quantity <= 0:
+            self.lines.pop(item_obj.name, None)
+            return None
+
+        original_cost, _, new_cost = item_obj.pricing_kernel(quantity)
+
+        # the line is updated in place, so the item keeps its position in the cart
+        line = self.lines[item_obj.name] = {
+            'item': item_obj,
+            'quantity': quantity,
+            'unit': unit or item_obj.unit,
+            'original_cost': original_cost,
+            'new_cost': new_cost,
+            'original_paise': round(original_cost * 100),
+            'new_paise': round(new_cost * 100)
+        }
+
+        self.total_original_paise += line['original_paise']
+        self.total_new_paise += line['new_paise']
+
+        return line
@@ -0,0 +1,495 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the catalog dry run. A candidate manager input is validated in parallel chunks with the
+# entities' own validation rules, without building any entity object, and is then diffed against the live catalog
+
+import io
+import multiprocessing
+import os
+
+from collections import deque
+from contextlib import redirect_stdout
+from functools import lru_cache
+from typing import Any, Iterator
+
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM
+from src.models.item import Item
+from src.store_manager.lazy_catalog import LazyItemMapping
+
+"""
+Number of manager input lines validated by a worker at a time
+"""
+VALIDATION_CHUNK_SIZE = 1 << 14
+
+"""
+Number of chunks queued for every worker, so that only a few chunks of the file are in memory at a time
+"""
+CHUNKS_PER_WORKER = 2
+
+
+def validate_line(line_data: str, entities: dict, output: io.StringIO) -> tuple:
+    """
+    Validate a single manager input line the same way the store does, except for the parent check which depends on
+    the previous lines.
+
+    Args:
+        line_data: manager input line
+        entities: mapping of entity types to their classes
+        output: buffer the validation hints are printed to
+
+    Returns:
+        entity type, cleaned args (None if the line can not be parsed) and the reason it is invalid (None if valid)
+    """
+
+    entity_type, *args = line_data.split(',')
+    entity_type = (entity_type.strip()).lower()
+
+    # the store reads the parent name before checking the entity type
+    if not args:
+        return entity_type, None, "Parent entity name not found"
+
+    if entity_type not in entities:
+        return entity_type, None, f"Entity type {entity_type} not found entities"
+
+    args = tuple((val.strip()).lower() for val in args)
+
+    try:
+        if entities[entity_type].validate_args(*args):
+            return entity_type, args, None
+
+        reason = output.getvalue().strip() or f"Invalid {entity_type} arguments"
+
+    except Exception as e:
+        reason = str(e) or type(e).__name__
+
+    # the validation rules print their hints, keep them as the reason of the line
+    output.seek(0)
+    output.truncate()
+
+    return entity_type, args, reason
+
+
+def validate_chunk(lines: list, entities: dict) -> list:
+    """
+    Validate a chunk of manager input lines. Runs in the worker processes.
+
+    Args:
+        lines: manager input lines
+        entities: mapping of entity types to their classes
+
+    Returns:
+        validation result for every line, None for the empty lines
+    """
+
+    with redirect_stdout(io.StringIO()) as output:
+        return [validate_line(line_data=line_data, entities=entities, output=output) if line_data else None
+                for line_data in lines]
+
+
+@lru_cache(maxsize=1 << 12)
+def effective_discount(discount_strs: tuple) -> Any:
+    """
+    Find the discount an item actually gets: its item wise discount, or the max percentage discount between the item
+    and its parents. Catalogs use few distinct discounts, so the results are cached.
+
+    Args:
+        discount_strs: discount strings of the item, its sub category and its category
+
+    Returns:
+        effective discount string, None if a percentage discount is combined with an item wise parent discount, which
+        the store can not price
+    """
+
+    if '%' not in discount_strs[0]:
+        return discount_strs[0]
+
+    if not all('%' in discount_str for discount_str in discount_strs):
+        return None
+
+    return f"{max(int(discount_str.strip('%')) for discount_str in discount_strs)}%"
+
+
+def price_key(price_str: str) -> tuple:
+    """
+    Normalize an item price string, so that equal prices written in different units compare equal.
+
+    Args:
+        price_str: price string, E.g: '40/kg;10kg=36'
+
+    Returns:
+        price per standard unit, standard unit, tier thresholds and tier rates
+    """
+
+    price_per_unit, unit = Item._extract_price_and_unit(price_str=price_str.split(';')[0])
+    tier_thresholds, tier_rates = Item._extract_tiers(price_str=price_str, price_per_unit=price_per_unit)
+
+    return (round(price_per_unit, 6), unit, tuple(round(threshold, 6) for threshold in tier_thresholds),
+            tuple(round(rate, 6) for rate in tier_rates))
+
+
+class CatalogDryRun:
+    """
+    This class validates a candidate manager input as the complete catalog a fresh store would load, and reports what
+    would be rejected and what would change compared to the live catalog. Validation runs in worker processes, the
+    parent checks are then made in input order by a single merge over the validated chunks. The candidate is kept as
+    tuples of strings, no entity object is built.
+    """
+
+    def __init__(self, store: Any, worker_count: int = None, chunk_size: int = VALIDATION_CHUNK_SIZE) -> None:
+        """
+        Initialization method for catalog dry run class.
+
+        Args:
+            store: store manager whose live catalog the candidate is compared to
+            worker_count: number of validation processes, the lines are validated in this process if 1 or less.
+                Defaults to the number of CPUs
+            chunk_size: number of lines validated by a worker at a time
+        """
+
+        self.store = store
+        self.worker_count = (os.cpu_count() or 1) if worker_count is None else worker_count
+        self.chunk_size = chunk_size
+
+        # the live catalog is pinned, a reload while the dry run is in progress does not change the diff
+        self.catalog = store.catalog
+
+    def run(self, lines: Iterator) -> dict:
+        """
+        Validate the candidate manager input lines and diff them against the live catalog, in a single pass over the
+        lines.
+
+        Args:
+            lines: candidate manager input lines
+
+        Returns:
+            counts of the accepted and rejected lines, rejected lines with their reasons, and the added, removed,
+            price changes and effective discount changes entries
+        """
+
+        candidate, rejected = self._merge(validated_chunks=self._validate(lines=lines))
+
+        diff = self._diff(candidate=candidate)
+        diff['accepted'] = sum(len(entities) for entities in candidate.values())
+        diff['rejected'] = rejected
+
+        return diff
+
+    def _validate(self, lines: Iterator) -> Iterator:
+        """
+        Validate the lines chunk by chunk, in the worker processes if there is more than one.
+
+        Args:
+            lines: candidate manager input lines
+
+        Returns:
+            iterator over the chunks of lines with their validation results, in input order
+        """
+
+        chunks = self._iter_chunks(lines=lines)
+
+        if self.worker_count <= 1:
+            for chunk in chunks:
+                yield chunk, validate_chunk(lines=chunk, entities=self.store.entities)
+
+            return
+
+        context = multiprocessing.get_context('spawn')
+
+        with context.Pool(processes=self.worker_count) as pool:
+            pending = deque()
+
+            for chunk in chunks:
+                pending.append((chunk, pool.apply_async(validate_chunk, (chunk, self.store.entities))))
+
+                # keep a bounded number of chunks in flight, results are handed over in input order
+                if len(pending) >= self.worker_count * CHUNKS_PER_WORKER:
+                    chunk, result = pending.popleft()
+                    yield chunk, result.get()
+
+            while pending:
+                chunk, result = pending.popleft()
+                yield chunk, result.get()
+
+    def _iter_chunks(self, lines: Iterator) -> Iterator:
+        """
+        Group the lines into chunks.
+
+        Args:
+            lines: candidate manager input lines
+
+        Returns:
+            iterator over the chunks of lines
+        """
+
+        chunk = []
+
+        for line_data in lines:
+            chunk.append(line_data)
+
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    def _merge(self, validated_chunks: Iterator) -> tuple:
+        """
+        Check the parents of the validated lines in input order and build the candidate catalog. An entity is stored
+        as its args with the parent's record in place of the parent name, the same way the store keeps the parent
+        object. Like the store, the entities defined under a parent which is redefined later on are relinked to the
+        new parent once all the lines are merged.
+
+        Args:
+            validated_chunks: chunks of lines with their validation results, in input order
+
+        Returns:
+            candidate catalog, rejected lines
+        """
+
+        candidate = {
+            CATEGORY: {},
+            SUB_CATEGORY: {},
+            ITEM: {}
+        }
+        rejected = []
+        line_no = 0
+
+        # line number of every candidate item, to report the items removed when they are relinked
+        item_lines = {}
+
+        for chunk, results in validated_chunks:
+            for line_data, result in zip(chunk, results):
+                line_no += 1
+
+                # ignore empty lines
+                if not result:
+                    continue
+
+                entity_type, args, reason = result
+
+                # lines which could not be parsed or have an unknown entity type
+                if args is None:
+                    rejected.append({'line': line_no, 'line_data': line_data, 'reason': reason})
+                    continue
+
+                parent_type = self.store.parent_type_map[entity_type]
+
+                if parent_type and args[0] not in candidate[parent_type]:
+                    rejected.append({'line': line_no, 'line_data': line_data,
+                                     'reason': f"Parent entity {args[0]} not found in {parent_type}"})
+                    continue
+
+                if reason:
+                    rejected.append({'line': line_no, 'line_data': line_data, 'reason': reason})
+                    continue
+
+                if not parent_type:
+                    candidate[entity_type][args[0]] = args
+                    continue
+
+                record = (candidate[parent_type][args[0]],) + args[1:]
+
+                # the store fails to build a percentage discount item under an item wise discount parent
+                if entity_type == ITEM and effective_discount(discount_strs=self._record_discount_strs(record)) is None:
+                    rejected.append({'line': line_no, 'line_data': line_data,
+                                     'reason': f"Discount {record[3]} can not be combined with the item wise "
+                                               f"discount of its parents"})
+                    continue
+
+                candidate[entity_type][args[1]] = record
+
+                if entity_type == ITEM:
+                    item_lines[args[1]] = (line_no, line_data)
+
+        self._relink(candidate=candidate, item_lines=item_lines, rejected=rejected)
+
+        return candidate, rejected
+
+    @staticmethod
+    def _relink(candidate: dict, item_lines: dict, rejected: list) -> None:
+        """
+        Relink the candidate entities which still point to a redefined parent's old record, and reject the items whose
+        discount can not be combined with the new parent's discount, the same way the store does before publishing.
+
+        Args:
+            candidate: candidate catalog
+            item_lines: line number and line data of every candidate item
+            rejected: rejected lines the removed items are added to
+
+        Returns:
+            None
+        """
+
+        categories, sub_categories, items = candidate[CATEGORY], candidate[SUB_CATEGORY], candidate[ITEM]
+
+        for name, record in sub_categories.items():
+            if record[0] is not categories[record[0][0]]:
+                sub_categories[name] = (categories[record[0][0]],) + record[1:]
+
+        for name, record in list(items.items()):
+            sub_category = sub_categories[record[0][1]]
+
+            if record[0] is sub_category:
+                continue
+
+            items[name] = record = (sub_category,) + record[1:]
+
+            if effective_discount(discount_strs=CatalogDryRun._record_discount_strs(record)) is None:
+                line_no, line_data = item_lines[name]
+                rejected.append({'line': line_no, 'line_data': line_data,
+                                 'reason': f"Discount {record[3]} can not be combined with the item wise discount of "
+                                           f"its redefined parents"})
+                del items[name]
+
+        rejected.sort(key=lambda entry: entry['line'])
+
+    def _diff(self, candidate: dict) -> dict:
+        """
+        Compare the candidate catalog with the live catalog.
+
+        Args:
+            candidate: candidate catalog
+
+        Returns:
+            added, removed, price changes and effective discount changes entries
+        """
+
+        diff = {
+            'added': [],
+            'removed': [],
+            'price_changes': [],
+            'discount_changes': []
+        }
+
+        for entity_type in (CATEGORY, SUB_CATEGORY, ITEM):
+            live_entities = self._live_entities(entity_type=entity_type)
+
+            for name, record in candidate[entity_type].items():
+                if name not in live_entities:
+                    parent_name = record[0][1] if self.store.parent_type_map[entity_type] else None
+                    diff['added'].append({'entity_type': entity_type, 'name': name, 'parent': parent_name})
+
+                elif entity_type == ITEM:
+                    self._diff_item(name=name, record=record, live_items=live_entities, diff=diff)
+
+            for name in live_entities:
+                if name not in candidate[entity_type]:
+                    parent = self._live_fields(entities=live_entities, name=name)[0]
+                    diff['removed'].append({'entity_type': entity_type, 'name': name,
+                                            'parent': parent.name if parent else None})
+
+        return diff
+
+    def _diff_item(self, name: str, record: tuple, live_items: Any, diff: dict) -> None:
+        """
+        Compare the price and the effective discount of an item found in both the catalogs.
+
+        Args:
+            name: item name
+            record: candidate record of the item
+            live_items: live item mapping
+            diff: diff the changes are added to
+
+        Returns:
+            None
+        """
+
+        sub_category, price_str, discount_str = self._live_fields(entities=live_items, name=name)
+
+        if price_str != record[2] and price_key(price_str=price_str) != price_key(price_str=record[2]):
+            diff['price_changes'].append({'name': name, 'old_price': price_str, 'new_price': record[2]})
+
+        old_discount = effective_discount(discount_strs=(discount_str, sub_category.discount_str,
+                                                         sub_category.category.discount_str))
+        new_discount = effective_discount(discount_strs=self._record_discount_strs(record))
+
+        if old_discount != new_discount:
+            diff['discount_changes'].append({'name': name, 'old_discount': old_discount,
+                                             'new_discount': new_discount})
+
+    def _live_entities(self, entity_type: str) -> Any:
+        """
+        Return the live entity mapping of an entity type. Frozen mappings are copied, so that the lazily loaded items
+        can be read from their indexed records without being built.
+
+        Args:
+            entity_type: entity type
+
+        Returns:
+            name to entity mapping
+        """
+
+        entities = self.catalog.store_data[entity_type]
+
+        return entities.copy() if hasattr(entities, 'copy') else entities
+
+    @staticmethod
+    def _live_fields(entities: Any, name: str) -> tuple:
+        """
+        Read the parent and the strings of a live entity.
+
+        Args:
+            entities: live entity mapping
+            name: entity name
+
+        Returns:
+            parent entity (None for categories), then the price string for items, then the discount string
+        """
+
+        if isinstance(entities, LazyItemMapping) and name in entities.records:
+            sub_category, _, price_str, discount_str = entities.records[name]
+            return sub_category, price_str, discount_str
+
+        entity_obj = entities[name]
+
+        if isinstance(entity_obj, Item):
+            return entity_obj.sub_category, entity_obj.price_str, entity_obj.discount_str
+
+        return entity_obj.get_parent(), entity_obj.discount_str
+
+    @staticmethod
+    def _record_discount_strs(record: tuple) -> tuple:
+        """
+        Return the discount strings of a candidate item and its parents.
+
+        Args:
+            record: candidate record of the item
+
+        Returns:
+            discount strings of the item, its sub category and its category
+        """
+
+        sub_category = record[0]
+
+        return record[3], sub_category[2], sub_category[0][1]
+
+
+def print_catalog_diff(diff: dict) -> None:
+    """
+    Print the result of a catalog dry run.
+
+    Args:
+        diff: result of the dry run
+
+    Returns:
+        None
+    """
+
+    print(f"Accepted lines: {diff['accepted']}, rejected lines: {len(diff['rejected'])}")
+
+    for rejected_line in diff['rejected']:
+        print(f"  Line {rejected_line['line']} {rejected_line['line_data']} -> {rejected_line['reason']}")
+
+    for entry in diff['added']:
+        print(f"Added {entry['entity_type']} {entry['name']}" + (f" in {entry['parent']}" if entry['parent'] else ''))
+
+    for entry in diff['removed']:
+        print(f"Removed {entry['entity_type']} {entry['name']}" +
+              (f" from {entry['parent']}" if entry['parent'] else ''))
+
+    for entry in diff['price_changes']:
+        print(f"Price of {entry['name']}: {entry['old_price']} -> {entry['new_price']}")
+
+    for entry in diff['discount_changes']:
+        print(f"Discount of {entry['name']}: {entry['old_discount']} -> {entry['new_discount']}")
@@ -0,0 +1,180 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the immutable catalog snapshot. Billing reads from the current snapshot while a reload
+# builds the next version off to the side, which is then published with a single reference swap
+
+import weakref
+
+from types import MappingProxyType
+from typing import Any
+
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM
+
+
+class StagedStoreData(dict):
+    """
+    This class is the writable store data staged from a published version. Every entity type starts out as the
+    published version's read-only mapping and is only copied the first time it is written to, so a reload copies the
+    entity types it changes and shares the others with the published version.
+    """
+
+    def __init__(self, store_data: Any) -> None:
+        """
+        Initialization method for staged store data class.
+
+        Args:
+            store_data: read-only store data of the published version
+        """
+
+        super().__init__(store_data)
+
+        # entity types which have been copied and can be written to
+        self.written = set()
+
+    def writable(self, entity_type: str) -> Any:
+        """
+        Returns the writable mapping of an entity type, copying the published one on first use.
+
+        Args:
+            entity_type: entity type to be written to
+
+        Returns:
+            writable name to entity object mapping
+        """
+
+        if entity_type not in self.written:
+            # copy() so that mappings building their entities on first use are copied without building them
+            self[entity_type] = self[entity_type].copy()
+
+        return self[entity_type]
+
+    def __setitem__(self, entity_type: str, entities: Any) -> None:
+        super().__setitem__(entity_type, entities)
+        self.written.add(entity_type)
+
+
+class CatalogSnapshot:
+    """
+    This class holds one published version of the store data. A published snapshot is never mutated.
+
+    Custom store data backends (E.g: the SQLite catalog) implement stage(), freeze() and discard() themselves, and
+    release() if they hold resources which must be given back once the version is no longer referenced. Plain
+    mappings of entity type to name to entity object are staged copy on write per entity type and made read-only on
+    freeze.
+    """
+
+    __slots__ = ('version', 'store_data', '__weakref__')
+
+    def __init__(self, version: int, store_data: Any) -> None:
+        """
+        Initialization method for catalog snapshot class.
+
+        Args:
+            version: version of the catalog
+            store_data: store data of this version, it is frozen and must not be mutated afterwards
+        """
+
+        self.version = version
+        self.store_data = self._freeze(store_data=store_data)
+
+        # the store data may be part of a reference cycle, release it as soon as the snapshot itself is dropped
+        if hasattr(store_data, 'release'):
+            weakref.finalize(self, store_data.release)
+
+    @staticmethod
+    def empty_store_data() -> dict:
+        """
+        Returns empty store data.
+
+        Returns:
+            mapping of entity types to empty name to entity object mappings
+        """
+
+        return {
+            CATEGORY: {},
+            SUB_CATEGORY: {},
+            ITEM: {}
+        }
+
+    def stage(self) -> Any:
+        """
+        Build the writable store data of the next version, to be filled and then published.
+
+        Returns:
+            writable store data
+        """
+
+        if hasattr(self.store_data, 'stage'):
+            return self.store_data.stage()
+
+        return StagedStoreData(store_data=self.store_data)
+
+    def discard(self, store_data: Any) -> None:
+        """
+        Drop store data staged from this version which is not going to be published.
+
+        Args:
+            store_data: staged store data
+
+        Returns:
+            None
+        """
+
+        if hasattr(store_data, 'discard'):
+            store_data.discard()
+
+    @staticmethod
+    def writable(store_data: Any, entity_type: str) -> Any:
+        """
+        Returns the mapping of an entity type of staged store data, ready to be written to.
+
+        Args:
+            store_data: staged store data
+            entity_type: entity type to be written to
+
+        Returns:
+            writable name to entity object mapping
+        """
+
+        if hasattr(store_data, 'writable'):
+            return store_data.writable(entity_type=entity_type)
+
+        return store_data[entity_type]
+
+    @staticmethod
+    def _freeze(store_data: Any) -> Any:
+        """
+        Make the store data read-only. Entity types shared with the previous version are already read-only.
+
+        Args:
+            store_data: store data to be frozen
+
+        Returns:
+            read-only store data
+        """
+
+        if hasattr(store_data, 'freeze'):
+            store_data.freeze()
+            return store_data
+
+        return MappingProxyType({entity_type: entities if isinstance(entities, MappingProxyType)
+                                 else MappingProxyType(entities) for entity_type, entities in store_data.items()})
+
+
+class ProcessedBasket(list):
+    """
+    This class is the list of processed lines of a basket. It keeps a reference to the catalog snapshot the lines
+    were resolved against, so that the snapshot stays alive until the bill is generated.
+    """
+
+    def __init__(self, lines: list, catalog: CatalogSnapshot) -> None:
+        """
+        Initialization method for processed basket class.
+
+        Args:
+            lines: processed lines
+            catalog: catalog snapshot the lines were resolved against
+        """
+
+        super().__init__(lines)
+        self.catalog = catalog
@@ -0,0 +1,364 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the coupon engine. Every campaign keeps the sorted 64 bit fingerprints of its single
+# use codes behind a bloom filter, so invalid codes are rejected without a search, and tracks the redeemed codes in a
+# bitmap guarded by striped locks
+
+import hashlib
+import heapq
+import threading
+
+from array import array
+from bisect import bisect_left
+from traceback import format_exc
+from typing import Any, Iterator
+
+from src.models.percentage_wise_discount import PercentageWiseDiscountStrategy
+from src.store_manager.bloom_filter import BloomFilter
+from src.utilities import iter_file_lines
+
+"""
+Number of codes hashed and sorted at a time while loading a campaign
+"""
+LOAD_CHUNK_SIZE = 1 << 20
+
+
+def code_fingerprint(code: str) -> int:
+    """
+    Return the 64 bit fingerprint of a coupon code.
+
+    Args:
+        code: coupon code
+
+    Returns:
+        fingerprint of the code
+    """
+
+    return int.from_bytes(hashlib.blake2b(code.encode(), digest_size=8).digest(), 'little')
+
+
+class CouponCampaign:
+    """
+    This class is a campaign of single use coupon codes sharing the same percentage wise discount. Codes are stored as
+    fingerprints only, so a 10M codes campaign takes about 100MB whatever the length of the codes. Two different codes
+    share a fingerprint with a probability of about 3 in a million for such a campaign.
+    """
+
+    def __init__(self, name: str, discount_str: str, stripe_count: int = 64) -> None:
+        """
+        Initialization method for coupon campaign class.
+
+        Args:
+            name: campaign's name
+            discount_str: discount string of the coupons, E.g: '10%'
+            stripe_count: number of locks the redemption bitmap is spread across
+        """
+
+        self.name = name
+        self.discount_str = discount_str
+        self.discount_strategy = PercentageWiseDiscountStrategy(discount_str)
+
+        # sorted fingerprints of the codes, position in the array is the position of the code in the bitmap
+        self.fingerprints = array('Q')
+        self.bloom_filter = BloomFilter(capacity=0)
+
+        # one bit for every code, set once the code is redeemed
+        self.redeemed = bytearray()
+        self.stripe_count = stripe_count
+        self.stripes = [threading.Lock() for _ in range(stripe_count)]
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    @staticmethod
+    def validate_args(*args: Any) -> bool:
+        """
+        Validates args for coupon campaign.
+
+        Args:
+            *args: args to be validated
+
+        Returns:
+            True, if valid, else False
+        """
+
+        return len(args) == 3 and args[2].endswith('%') and PercentageWiseDiscountStrategy.validate(args[2])
+
+    def load_codes(self, codes: Iterator, chunk_size: int = LOAD_CHUNK_SIZE) -> None:
+        """
+        Load the codes of the campaign. The codes are hashed and sorted chunk by chunk and the sorted chunks are
+        merged, so only the fingerprints and one chunk of codes are kept in memory.
+
+        Args:
+            codes: codes of the campaign
+            chunk_size: number of codes hashed and sorted at a time
+
+        Returns:
+            None
+        """
+
+        sorted_chunks = []
+        chunk = []
+
+        for code in codes:
+            code = (code.strip()).lower()
+
+            # ignore empty lines
+            if not code:
+                continue
+
+            chunk.append(code_fingerprint(code=code))
+
+            if len(chunk) >= chunk_size:
+                chunk.sort()
+                sorted_chunks.append(array('Q', chunk))
+                chunk = []
+
+        if chunk:
+            chunk.sort()
+            sorted_chunks.append(array('Q', chunk))
+
+        # merge the sorted chunks and drop the duplicate codes
+        fingerprints = array('Q')
+        for fingerprint in heapq.merge(*sorted_chunks):
+            if not fingerprints or fingerprints[-1] != fingerprint:
+                fingerprints.append(fingerprint)
+
+        del sorted_chunks
+
+        bloom_filter = BloomFilter(capacity=len(fingerprints))
+        bloom_filter.add_all(key_hashes=fingerprints)
+
+        self.fingerprints = fingerprints
+        self.bloom_filter = bloom_filter
+        self.redeemed = bytearray((len(fingerprints) + 7) // 8)
+
+    def find(self, fingerprint: int) -> Any:
+        """
+        Find the position of a code.
+
+        Args:
+            fingerprint: fingerprint of the code
+
+        Returns:
+            position of the code if it belongs to the campaign, else None
+        """
+
+        if not self.bloom_filter.might_contain(key_hash=fingerprint):
+            return None
+
+        position = bisect_left(self.fingerprints, fingerprint)
+
+        if position < len(self.fingerprints) and self.fingerprints[position] == fingerprint:
+            return position
+
+        return None
+
+    def is_redeemed(self, position: int) -> bool:
+        """
+        Checks if a code has been redeemed.
+
+        Args:
+            position: position of the code
+
+        Returns:
+            True, if redeemed, else False
+        """
+
+        byte_id, bit = position >> 3, 1 << (position & 7)
+
+        with self.stripes[byte_id % self.stripe_count]:
+            return bool(self.redeemed[byte_id] & bit)
+
+    def redeem(self, position: int) -> bool:
+        """
+        Mark a code as redeemed, if it has not been redeemed yet.
+
+        Args:
+            position: position of the code
+
+        Returns:
+            True if the code has been redeemed now, False if it was already redeemed
+        """
+
+        byte_id, bit = position >> 3, 1 << (position & 7)
+
+        # codes sharing a byte of the bitmap share a lock, setting a bit rewrites the whole byte
+        with self.stripes[byte_id % self.stripe_count]:
+            if self.redeemed[byte_id] & bit:
+                return False
+
+            self.redeemed[byte_id] |= bit
+
+        return True
+
+    def release(self, position: int) -> None:
+        """
+        Mark a redeemed code as available again.
+
+        Args:
+            position: position of the code
+
+        Returns:
+            None
+        """
+
+        byte_id, bit = position >> 3, 1 << (position & 7)
+
+        with self.stripes[byte_id % self.stripe_count]:
+            self.redeemed[byte_id] &= ~bit & 0xFF
+
+    def get_discount(self, total_cost: float) -> float:
+        """
+        Calculate the discount of a coupon on the bill total.
+
+        Args:
+            total_cost: bill total the coupon is applied on
+
+        Returns:
+            discount of the coupon
+        """
+
+        return round(self.discount_strategy.get_discount(original_cost=total_cost,
+                                                         max_discount=self.discount_strategy.discount), 2)
+
+
+class CouponEngine:
+    """
+    This class stores the coupon campaigns and redeems the coupon codes presented at checkout. A code is first
+    validated while the bill is priced, and only redeemed once the bill is generated, so quotes don't consume it.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialization method for coupon engine class.
+        """
+
+        # all the stored campaigns
+        self.campaigns = []
+
+    def process_coupon_data(self, data: str) -> None:
+        """
+        Processes coupon data and check for basic validations. Each line is
+        '<campaign name>, <codes file>, <discount>%', the codes file containing one code per line.
+
+        Args:
+            data: the data to be processed
+
+        Returns:
+            None
+        """
+
+        for line_data in data.split('\n'):
+            # ignore empty lines
+            if not line_data:
+                continue
+
+            try:
+                campaign_name, codes_file, discount_str = [val.strip() for val in line_data.split(',')]
+                campaign_name, discount_str = campaign_name.lower(), discount_str.lower()
+
+                if not CouponCampaign.validate_args(campaign_name, codes_file, discount_str):
+                    print(f"Coupon campaign {line_data} is invalid. Ignoring the current input line.")
+                    continue
+
+                campaign = CouponCampaign(name=campaign_name, discount_str=discount_str)
+                campaign.load_codes(codes=iter_file_lines(file=codes_file))
+
+                self.add_campaign(campaign=campaign)
+
+            except Exception as e:
+                print(f"Line data {line_data} is invalid. Ignoring this line. Exception: {e}\nTraceback: "
+                      f"{format_exc()}")
+
+    def add_campaign(self, campaign: CouponCampaign) -> None:
+        """
+        Store the campaign.
+
+        Args:
+            campaign: campaign to be stored
+
+        Returns:
+            None
+        """
+
+        self.campaigns.append(campaign)
+
+    def has_campaigns(self) -> bool:
+        """
+        Check whether any campaign is stored.
+
+        Returns:
+            True if at least one campaign is stored, else False
+        """
+
+        return bool(self.campaigns)
+
+    def validate(self, code: str, total_cost: float) -> Any:
+        """
+        Apply a coupon code on a bill total without redeeming it.
+
+        Args:
+            code: coupon code presented at checkout
+            total_cost: bill total the coupon is applied on
+
+        Returns:
+            applied coupon if the code is valid and not redeemed yet, else None
+        """
+
+        code = (code.strip()).lower()
+        fingerprint = code_fingerprint(code=code)
+
+        for campaign in self.campaigns:
+            position = campaign.find(fingerprint=fingerprint)
+
+            if position is None:
+                continue
+
+            if campaign.is_redeemed(position=position):
+                print(f"Coupon code {code} has already been redeemed. Ignoring this coupon.")
+                return None
+
+            return {
+                'campaign': campaign,
+                'code': code,
+                'position': position,
+                'discount': campaign.get_discount(total_cost=total_cost)
+            }
+
+        print(f"Coupon code {code} is invalid. Ignoring this coupon.")
+
+        return None
+
+    @staticmethod
+    def redeem(applied_coupon: dict) -> bool:
+        """
+        Redeem the code of an applied coupon once its bill is generated.
+
+        Args:
+            applied_coupon: applied coupon returned by validate()
+
+        Returns:
+            True if the code has been redeemed now, False if another bill redeemed it since it was validated
+        """
+
+        if applied_coupon['campaign'].redeem(position=applied_coupon['position']):
+            return True
+
+        print(f"Coupon code {applied_coupon['code']} has already been redeemed. Ignoring this coupon.")
+
+        return False
+
+    @staticmethod
+    def release(applied_coupon: dict) -> None:
+        """
+        Make the code of an applied coupon available again, E.g: when its bill is cancelled.
+
+        Args:
+            applied_coupon: applied coupon
+
+        Returns:
+            None
+        """
+
+        applied_coupon['campaign'].release(position=applied_coupon['position'])
@@ -0,0 +1,245 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the inventory class. Stock levels are guarded by striped locks so that bills for
+# different items can reserve stock at the same time
+
+import threading
+
+from typing import Any
+from traceback import format_exc
+
+from src.constants import units_mapping
+from src.utilities import extract_required_data
+
+
+class Inventory:
+    """
+    This class keeps per item stock levels in standard units. Items without a stock level are not tracked and can
+    always be billed.
+    """
+
+    def __init__(self, stripe_count: int = 64) -> None:
+        """
+        Initialization method for inventory class.
+
+        Args:
+            stripe_count: number of locks the items are spread across
+        """
+
+        self.stripe_count = stripe_count
+        self.stripes = [threading.Lock() for _ in range(stripe_count)]
+
+        # item name mapped to the stock left in standard units
+        self.stock = {}
+
+    def process_stock_data(self, data: str) -> None:
+        """
+        Processes stock data. Each line contains the item name and its stock, E.g: 'Amul Milk, 20lt'.
+
+        Args:
+            data: the data to be processed
+
+        Returns:
+            None
+        """
+
+        for line_data in data.split('\n'):
+            # ignore empty lines
+            if not line_data:
+                continue
+
+            try:
+                item_name, stock_data = [(val.strip()).lower() for val in line_data.split(',')]
+
+                stock_qnty = float(
+                        extract_required_data(data_str=stock_data, req_type=r'[+-]?([0-9]+([.][0-9]*)?|[.][0-9]+)')[0])
+                stock_unit = extract_required_data(data_str=stock_data, req_type=r'[a-zA-Z]+')
+
+                # if unit not a standard one, convert the quantity accordingly
+                if stock_unit in units_mapping:
+                    stock_qnty *= units_mapping[stock_unit]['std_equivalent_val']
+
+                self.set_stock(item_name=item_name, quantity=stock_qnty)
+
+            except Exception as e:
+                print(f"Line data {line_data} is invalid. Ignoring this line. Exception: {e}\nTraceback: "
+                      f"{format_exc()}")
+
+    def set_stock(self, item_name: str, quantity: float) -> None:
+        """
+        Set the stock level of an item.
+
+        Args:
+            item_name: name of the item
+            quantity: stock in standard units
+
+        Returns:
+            None
+        """
+
+        with self._stripe(item_name=item_name):
+            self.stock[item_name] = quantity
+
+    def add_stock(self, item_name: str, quantity: float) -> None:
+        """
+        Add stock for an item which is already tracked, else start tracking it.
+
+        Args:
+            item_name: name of the item
+            quantity: stock to be added in standard units
+
+        Returns:
+            None
+        """
+
+        with self._stripe(item_name=item_name):
+            self.stock[item_name] = self.stock.get(item_name, 0.0) + quantity
+
+    def remove_stock(self, item_name: str) -> Any:
+        """
+        Stop tracking the stock of an item.
+
+        Args:
+            item_name: name of the item
+
+        Returns:
+            stock in standard units the item had, None if the item was not tracked
+        """
+
+        with self._stripe(item_name=item_name):
+            return self.stock.pop(item_name, None)
+
+    def get_stock(self, item_name: str) -> Any:
+        """
+        Return the stock level of an item.
+
+        Args:
+            item_name: name of the item
+
+        Returns:
+            stock in standard units, None if the item is not tracked
+        """
+
+        return self.stock.get(item_name)
+
+    def reserve(self, requests: list) -> list:
+        """
+        Reserve and decrement the stock for all the lines of a bill atomically. Lines are filled in order, a line is
+        partially filled if the stock left is less than requested.
+
+        Args:
+            requests: list of (item name, quantity) for each line
+
+        Returns:
+            list of the filled quantity for each line
+        """
+
+        return self._fill(requests=requests, decrement=True)
+
+    def available(self, requests: list) -> list:
+        """
+        Find the quantity which could be filled for all the lines of a bill, without reserving the stock. Used to
+        quote a bill.
+
+        Args:
+            requests: list of (item name, quantity) for each line
+
+        Returns:
+            list of the quantity which could be filled for each line
+        """
+
+        return self._fill(requests=requests, decrement=False)
+
+    def _fill(self, requests: list, decrement: bool) -> list:
+        """
+        Fill the lines of a bill in order from the stock left.
+
+        Args:
+            requests: list of (item name, quantity) for each line
+            decrement: if True, the filled quantities are taken out of the stock
+
+        Returns:
+            list of the filled quantity for each line
+        """
+
+        # acquire the locks of all the stripes involved in a fixed order so that concurrent bills can't deadlock
+        stripe_ids = sorted({self._stripe_id(item_name=item_name) for item_name, _ in requests})
+
+        for stripe_id in stripe_ids:
+            self.stripes[stripe_id].acquire()
+
+        try:
+            filled_quantities = []
+
+            # without decrementing, the later lines of an item are filled from what the earlier ones leave
+            stock = self.stock if decrement else {}
+
+            for item_name, quantity in requests:
+                stock_left = stock.get(item_name, self.stock.get(item_name))
+
+                # untracked items are always filled
+                if stock_left is None:
+                    filled_quantities.append(quantity)
+                    continue
+
+                filled_qnty = min(quantity, stock_left)
+                stock[item_name] = stock_left - filled_qnty
+                filled_quantities.append(filled_qnty)
+
+            return filled_quantities
+
+        finally:
+            for stripe_id in reversed(stripe_ids):
+                self.stripes[stripe_id].release()
+
+    def release(self, requests: list) -> None:
+        """
+        Give back the stock reserved for the lines of a bill which could not be completed.
+
+        Args:
+            requests: list of (item name, quantity) for each line
+
+        Returns:
+            None
+        """
+
+        for item_name, quantity in requests:
+            with self._stripe(item_name=item_name):
+                if item_name in self.stock:
+                    self.stock[item_name] += quantity
+
+    def is_tracking(self) -> bool:
+        """
+        Checks if the stock of any item is being tracked.
+
+        Returns:
+            True, if tracking, else False
+        """
+
+        return bool(self.stock)
+
+    def _stripe_id(self, item_name: str) -> int:
+        """
+        Find the stripe an item belongs to.
+
+        Args:
+            item_name: name of the item
+
+        Returns:
+            stripe id
+        """
+
+        return hash(item_name) % self.stripe_count
+
+    def _stripe(self, item_name: str) -> threading.Lock:
+        """
+        Find the lock guarding an item.
+
+        Args:
+            item_name: name of the item
+
+        Returns:
+            lock of the item's stripe
+        """
+
+        return self.stripes[self._stripe_id(item_name=item_name)]
@@ -0,0 +1,123 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the lazy item mapping. Validated item records are indexed by name when the manager data
+# is processed, and the item objects are only built the first time they are looked up
+
+from typing import Any, Iterator
+
+from src.models.item import Item
+from src.models.sku_table import SkuTable, assign_sku
+
+
+class LazyItemMapping:
+    """
+    This class is a name to item object mapping of the in-memory store data which builds its item objects on first
+    use. Records keep a reference to the sub category object they were processed with, so a built item is the same
+    as the one an eager reload would have built.
+    """
+
+    def __init__(self, sku_table: SkuTable, items: Any = None) -> None:
+        """
+        Initialization method for lazy item mapping class.
+
+        Args:
+            sku_table: sku table of the items
+            items: item objects which are already built, mapped by name
+        """
+
+        self.sku_table = sku_table
+
+        # item name mapped to the item's args, for the items processed lazily
+        self.records = {}
+        # item name mapped to the item object, for the items processed eagerly
+        self.items = dict(items or {})
+        # item name mapped to the item object, for the lazily processed items which have been looked up
+        self.materialized = {}
+
+    def put_record(self, name: str, args: tuple) -> None:
+        """
+        Index the validated args of an item, the item object is built on first use.
+
+        Args:
+            name: item name
+            args: args of the item, the sub category object first
+
+        Returns:
+            None
+        """
+
+        self.items.pop(name, None)
+        self.materialized.pop(name, None)
+        self.records[name] = args
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """
+        Fetch the item object for the given name, building it if it has not been used yet.
+
+        Args:
+            name: item name
+            default: value returned if the item is not found
+
+        Returns:
+            item object if found, else default
+        """
+
+        item_obj = self.items.get(name) or self.materialized.get(name)
+
+        if item_obj is not None:
+            return item_obj
+
+        args = self.records.get(name)
+        if args is None:
+            return default
+
+        item_obj = Item(*args)
+        assign_sku(sku_table=self.sku_table, entity_obj=item_obj)
+
+        # if two lookups built the item at the same time, keep the first one
+        return self.materialized.setdefault(name, item_obj)
+
+    def copy(self) -> 'LazyItemMapping':
+        """
+        Build a writable copy of the mapping. Items which have already been built are shared with the copy.
+
+        Returns:
+            copy of the mapping
+        """
+
+        item_mapping = LazyItemMapping(sku_table=self.sku_table, items=self.items)
+        item_mapping.records = dict(self.records)
+        item_mapping.materialized = dict(self.materialized)
+
+        return item_mapping
+
+    def __getitem__(self, name: str) -> Item:
+        item_obj = self.get(name)
+
+        if item_obj is None:
+            raise KeyError(name)
+
+        return item_obj
+
+    def __setitem__(self, name: str, item_obj: Item) -> None:
+        self.records.pop(name, None)
+        self.materialized.pop(name, None)
+        self.items[name] = item_obj
+
+    def __delitem__(self, name: str) -> None:
+        if name not in self:
+            raise KeyError(name)
+
+        self.records.pop(name, None)
+        self.materialized.pop(name, None)
+        self.items.pop(name, None)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.items or name in self.records
+
+    def __iter__(self) -> Iterator:
+        yield from self.records
+        yield from self.items
+
+    def __len__(self) -> int:
+        return len(self.records) + len(self.items)
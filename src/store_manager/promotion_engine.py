@@ -0,0 +1,261 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the promotion engine. Promotions are indexed by the skus of the items and categories
+# they involve so that only the promotions touched by a basket are evaluated
+
+from traceback import format_exc
+
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM, BUNDLE, THRESHOLD
+from src.models.promotion import Promotion, BundlePromotion, SpendThresholdPromotion
+from src.models.sku_table import SkuTable
+
+"""
+Max number of applicable promotions for which the best combination is searched exactly, beyond it the promotions are
+picked greedily by discount
+"""
+EXACT_SEARCH_LIMIT = 20
+
+
+class PromotionEngine:
+    """
+    This class stores the basket level promotions and picks the best non-conflicting ones for a bill.
+    """
+
+    def __init__(self, sku_tables: dict = None) -> None:
+        """
+        Initialization method for promotion engine class.
+
+        Args:
+            sku_tables: sku tables of the store the promotions are applied by, the promotions are matched by sku
+        """
+
+        self.sku_tables = sku_tables or {entity_type: SkuTable() for entity_type in (CATEGORY, SUB_CATEGORY, ITEM)}
+
+        # mapping for promotion types and its corresponding classes
+        self.promotion_types = {
+            BUNDLE: BundlePromotion,
+            THRESHOLD: SpendThresholdPromotion
+        }
+
+        # all the stored promotions, position in the list is the promotion id
+        self.promotions = []
+
+        # this mapping consists of entity types and the entity skus within them mapped to the ids of the promotions
+        # which involve that entity
+        self.promotion_index = {
+            CATEGORY: {},
+            SUB_CATEGORY: {},
+            ITEM: {}
+        }
+
+    def process_promotion_data(self, data: str) -> None:
+        """
+        Processes promotion data and check for basic validations. Each line is either
+        'bundle, <item> | <item> ..., <discount>%' or 'threshold, <entity type>, <entity name>, <min spend>, <discount>%'.
+
+        Args:
+            data: the data to be processed
+
+        Returns:
+            None
+        """
+
+        for line_data in data.split('\n'):
+            # ignore empty lines
+            if not line_data:
+                continue
+
+            try:
+                # first argument is the promotion type, strip and convert all the values into lower case
+                args = [(val.strip()).lower() for val in line_data.split(',')]
+                promotion_type = args[0]
+
+                if promotion_type not in self.promotion_types:
+                    print(f"Promotion type {promotion_type} not found. Ignoring the current input line.")
+                    continue
+
+                if not self.promotion_types[promotion_type].validate_args(*args[1:]):
+                    print(f"Promotion {line_data} is invalid. Ignoring the current input line.")
+                    continue
+
+                self.add_promotion(promotion=self.promotion_types[promotion_type](*args[1:]))
+
+            except Exception as e:
+                print(f"Line data {line_data} is invalid. Ignoring this line. Exception: {e}\nTraceback: "
+                      f"{format_exc()}")
+
+    def add_promotion(self, promotion: Promotion) -> None:
+        """
+        Store the promotion and index it by every entity it involves.
+
+        Args:
+            promotion: promotion to be stored
+
+        Returns:
+            None
+        """
+
+        promotion_id = len(self.promotions)
+        promotion.resolve_skus(sku_tables=self.sku_tables)
+        self.promotions.append(promotion)
+
+        for entity_type, entity_sku in promotion.index_keys():
+            self.promotion_index[entity_type].setdefault(entity_sku, []).append(promotion_id)
+
+    def apply_promotions(self, bill_lines: list) -> list:
+        """
+        Find the promotions touched by the bill lines and pick the best non-conflicting combination. Two promotions
+        conflict if they consume the same bill line. The combination is exact for up to EXACT_SEARCH_LIMIT applicable
+        promotions and greedy beyond.
+
+        Args:
+            bill_lines: priced bill lines
+
+        Returns:
+            list of applied promotions
+        """
+
+        line_groups = self._group_lines(bill_lines=bill_lines)
+
+        # collect only the promotions indexed under the entities present in the bill
+        candidate_ids = set()
+        for entity_type, groups in line_groups.items():
+            index = self.promotion_index[entity_type]
+            for entity_sku in groups:
+                candidate_ids.update(index.get(entity_sku, ()))
+
+        # evaluate the candidates and keep the applicable ones
+        applicable = []
+        for promotion_id in candidate_ids:
+            result = self.promotions[promotion_id].evaluate(bill_lines, line_groups)
+            if result and result[1] > 0:
+                applicable.append((result[1], promotion_id, result[0]))
+
+        # take the promotions with the highest discount first, ties broken by the promotion id
+        applicable.sort(key=lambda val: (-val[0], val[1]))
+
+        if len(applicable) <= EXACT_SEARCH_LIMIT:
+            chosen = self._best_combination(applicable=applicable)
+        else:
+            chosen = self._greedy_combination(applicable=applicable)
+
+        applied_promotions = []
+
+        for discount, promotion_id, line_indices in chosen:
+            applied_promotions.append(
+                    {
+                        'promotion': self.promotions[promotion_id],
+                        'lines': sorted(line_indices),
+                        'discount': round(discount, 2)
+                    }
+            )
+
+        return applied_promotions
+
+    @staticmethod
+    def _best_combination(applicable: list) -> list:
+        """
+        Find the combination of non-conflicting promotions with the highest total discount, by a branch and bound
+        search over the promotions sorted by discount.
+
+        Args:
+            applicable: (discount, promotion id, consumed line indices) of the applicable promotions, sorted by
+                discount in descending order
+
+        Returns:
+            chosen promotions, in the same order
+        """
+
+        # bitmask of the consumed lines of every promotion
+        line_masks = [sum(1 << index for index in set(line_indices)) for _, _, line_indices in applicable]
+
+        # remaining_discounts[i] is the total discount of the promotions from i onwards, an upper bound of what they
+        # can still add
+        remaining_discounts = [0.0] * (len(applicable) + 1)
+        for position in range(len(applicable) - 1, -1, -1):
+            remaining_discounts[position] = remaining_discounts[position + 1] + applicable[position][0]
+
+        best = {'discount': 0.0, 'positions': []}
+
+        def search(start: int, consumed_mask: int, discount: float, positions: list) -> None:
+            if discount > best['discount']:
+                best['discount'], best['positions'] = discount, list(positions)
+
+            for position in range(start, len(applicable)):
+                # even taking all the remaining promotions can not beat the best combination found
+                if discount + remaining_discounts[position] <= best['discount']:
+                    return
+
+                if line_masks[position] & consumed_mask:
+                    continue
+
+                positions.append(position)
+                search(position + 1, consumed_mask | line_masks[position], discount + applicable[position][0],
+                       positions)
+                positions.pop()
+
+        search(0, 0, 0.0, [])
+
+        return [applicable[position] for position in best['positions']]
+
+    @staticmethod
+    def _greedy_combination(applicable: list) -> list:
+        """
+        Greedily take the promotions with the highest discount first, skipping the ones whose lines have already been
+        consumed by a better promotion.
+
+        Args:
+            applicable: (discount, promotion id, consumed line indices) of the applicable promotions, sorted by
+                discount in descending order
+
+        Returns:
+            chosen promotions, in the same order
+        """
+
+        consumed_lines = set()
+        chosen = []
+
+        for discount, promotion_id, line_indices in applicable:
+            if consumed_lines.intersection(line_indices):
+                continue
+
+            consumed_lines.update(line_indices)
+            chosen.append((discount, promotion_id, line_indices))
+
+        return chosen
+
+    @staticmethod
+    def _group_lines(bill_lines: list) -> dict:
+        """
+        Group the indices of the bill lines by the item, sub category and category they belong to.
+
+        Args:
+            bill_lines: priced bill lines
+
+        Returns:
+            mapping of entity type to entity sku and the indices of the bill lines under it
+        """
+
+        line_groups = {
+            CATEGORY: {},
+            SUB_CATEGORY: {},
+            ITEM: {}
+        }
+
+        for index, line in enumerate(bill_lines):
+            item_obj = line['item']
+            line_groups[ITEM].setdefault(item_obj.sku, []).append(index)
+            line_groups[SUB_CATEGORY].setdefault(item_obj.sub_category.sku, []).append(index)
+            line_groups[CATEGORY].setdefault(item_obj.sub_category.category.sku, []).append(index)
+
+        return line_groups
+
+    def has_promotions(self) -> bool:
+        """
+        Checks if any promotion has been stored.
+
+        Returns:
+            True, if found, else False
+        """
+
+        return bool(self.promotions)
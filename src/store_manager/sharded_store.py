@@ -0,0 +1,917 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the sharded store manager. The catalog is partitioned by category across worker
+# processes, each holding only the sub categories and items of its own categories. A router process splits every
+# basket by owning shard, prices the parts on all the shards at the same time and merges them into one bill
+
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+
+from contextlib import redirect_stdout
+from multiprocessing.connection import Client, Connection, Listener
+from traceback import format_exc
+from typing import Any, Iterator
+
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM
+from src.exceptions.exceptions import CustomerInputProcessingError, BillGenerationError, ShardStartError, \
+    UnsupportedOperationError
+from src.models.category import Category
+from src.models.item import Item
+from src.models.sku_table import assign_sku
+from src.models.sub_category import SubCategory
+from src.store_manager.catalog_snapshot import CatalogSnapshot, ProcessedBasket
+from src.store_manager.lazy_catalog import LazyItemMapping
+from src.store_manager.store_manager_runner import StoreManager
+from src.utilities import iter_split
+
+
+def run_shard(address: str, authkey: bytes) -> None:
+    """
+    Run a shard worker. The worker listens on its Unix socket and serves the router's requests until it is closed.
+    Everything printed while serving a request is sent back to the router with the response.
+
+    Args:
+        address: path of the Unix socket of the shard
+        authkey: key authenticating the router
+
+    Returns:
+        None
+    """
+
+    store = StoreManager()
+
+    with Listener(address=address, family='AF_UNIX', authkey=authkey) as listener, listener.accept() as connection:
+        while True:
+            try:
+                operation, *args = connection.recv()
+
+            except EOFError:
+                break
+
+            if operation == 'close':
+                break
+
+            output = io.StringIO()
+
+            try:
+                with redirect_stdout(output):
+                    result = shard_operations[operation](store, *args)
+
+                connection.send(('ok', result, output.getvalue()))
+
+            except (CustomerInputProcessingError, BillGenerationError) as e:
+                connection.send(('error', type(e).__name__, output.getvalue()))
+
+            except Exception as e:
+                output.write(f"Shard request {operation} failed. Exception: {e}\nTraceback: {format_exc()}")
+                connection.send(('error', BillGenerationError.__name__, output.getvalue()))
+
+
+def iter_shard_item_records(items: Any) -> Iterator:
+    """
+    Iterate over the items held by a shard without building the items which have not been used yet.
+
+    Args:
+        items: name to item object mapping of the shard
+
+    Returns:
+        iterator of (item name, sub category name, price string, discount string)
+    """
+
+    item_objs = items
+
+    if isinstance(items, LazyItemMapping):
+        # records hold the sub category object first, then the item's name, price and discount
+        for name, args in items.records.items():
+            yield name, args[0].name, args[2], args[3]
+
+        item_objs = items.items
+
+    for name, item_obj in item_objs.items():
+        yield name, item_obj.sub_category.name, item_obj.price_str, item_obj.discount_str
+
+
+def export_shard_items(store: StoreManager, sub_category_names: list) -> dict:
+    """
+    Returns the manager data lines of the items under sub categories which are moving to another shard.
+
+    Args:
+        store: store manager of the shard
+        sub_category_names: names of the moving sub categories
+
+    Returns:
+        sub category name mapped to the list of (item name, manager data line) of its items
+    """
+
+    sub_category_names = set(sub_category_names)
+    item_lines = {}
+
+    # the published mapping is read-only, copy() unwraps it so that lazily processed items are read from their records
+    items = store.store_data[ITEM].copy()
+
+    for name, sub_category_name, price_str, discount_str in iter_shard_item_records(items=items):
+        if sub_category_name in sub_category_names:
+            item_lines.setdefault(sub_category_name, []).append(
+                    (name, f'{ITEM}, {sub_category_name}, {name}, {price_str}, {discount_str}'))
+
+    return item_lines
+
+
+def detach_shard_entities(store: StoreManager, sub_category_names: list, item_names: list) -> dict:
+    """
+    Remove the sub categories and items which moved to another shard, along with the items under the moved sub
+    categories. The removal is published as a new version of the shard's catalog.
+
+    Args:
+        store: store manager of the shard
+        sub_category_names: names of the moved sub categories
+        item_names: names of the moved items
+
+    Returns:
+        stock in standard units of the removed items which were tracked, by item name
+    """
+
+    sub_category_names = set(sub_category_names)
+    item_names = set(item_names)
+    removed_items = []
+
+    with store.reload_lock:
+        store_data = store.catalog.stage()
+
+        try:
+            # remove the moved items and the items under the moved sub categories
+            items = CatalogSnapshot.writable(store_data=store_data, entity_type=ITEM)
+
+            for name, sub_category_name, _, _ in list(iter_shard_item_records(items=items)):
+                if name in item_names or sub_category_name in sub_category_names:
+                    del items[name]
+                    removed_items.append(name)
+
+            sub_categories = CatalogSnapshot.writable(store_data=store_data, entity_type=SUB_CATEGORY)
+
+            for name in sub_category_names:
+                sub_categories.pop(name, None)
+
+        except BaseException:
+            store.catalog.discard(store_data=store_data)
+            raise
+
+        store._publish_catalog(store_data=store_data)
+
+    # the stock of the removed items moves to their new shard
+    stock_levels = {name: store.inventory.remove_stock(item_name=name) for name in removed_items}
+
+    return {name: quantity for name, quantity in stock_levels.items() if quantity is not None}
+
+
+def load_shard(store: StoreManager, data: str, lazy: bool, detached_sub_categories: list = (),
+               detached_items: list = ()) -> dict:
+    """
+    Process the manager data lines of the shard's categories. The entities which moved to another shard are removed
+    first.
+
+    Args:
+        store: store manager of the shard
+        data: manager data lines of the shard
+        lazy: if True, items are built on first use
+        detached_sub_categories: names of the sub categories which moved to another shard
+        detached_items: names of the items which moved to another shard
+
+    Returns:
+        stock in standard units of the removed items which were tracked, by item name
+    """
+
+    stock_levels = {}
+
+    if detached_sub_categories or detached_items:
+        stock_levels = detach_shard_entities(store=store, sub_category_names=detached_sub_categories,
+                                             item_names=detached_items)
+
+    if data:
+        store.process_manager_data(data=data, lazy=lazy)
+
+    return stock_levels
+
+
+def load_shard_stock(store: StoreManager, data: str) -> None:
+    """
+    Process the stock data lines of the shard's items.
+
+    Args:
+        store: store manager of the shard
+        data: stock data lines of the shard
+
+    Returns:
+        None
+    """
+
+    store.process_stock_data(data=data)
+
+
+def set_shard_stock(store: StoreManager, stock_levels: dict) -> None:
+    """
+    Set the stock of the items which moved to the shard.
+
+    Args:
+        store: store manager of the shard
+        stock_levels: stock in standard units, by item name
+
+    Returns:
+        None
+    """
+
+    for item_name, quantity in stock_levels.items():
+        store.inventory.set_stock(item_name=item_name, quantity=quantity)
+
+
+def price_shard_lines(store: StoreManager, parts: list, reserve_stock: bool = False) -> list:
+    """
+    Process and price the part of a basket owned by the shard. Stock is filled the same way as for a whole basket.
+
+    Args:
+        store: store manager of the shard
+        parts: list of (position in the basket, item data)
+        reserve_stock: if True, the filled quantities are reserved
+
+    Returns:
+        list of priced line records, each with its position in the basket
+    """
+
+    catalog = store.catalog
+    item_data_map = catalog.store_data[ITEM]
+
+    try:
+        processed_data = []
+
+        for position, item_data in parts:
+            processed_item = store._process_single_item(item_data=item_data, item_data_map=item_data_map)
+
+            if processed_item:
+                processed_data.append((position, processed_item))
+
+    except Exception as e:
+        print(f"Failed to generate bill as customer input cannot be processed.Exception: {e}\nTraceback: "
+              f"{format_exc()}")
+        raise CustomerInputProcessingError
+
+    bill = store.calculate_bill(processed_data=ProcessedBasket(lines=[data for _, data in processed_data],
+                                                               catalog=catalog), reserve_stock=reserve_stock)
+
+    # out of stock lines are dropped from the bill, match the bill lines back to their positions in order
+    remaining_data = iter(processed_data)
+    line_records = []
+
+    for line in bill['lines']:
+        position = next(position for position, data in remaining_data if data['item'] is line['item'])
+        item_obj = line['item']
+        sub_category_obj = item_obj.sub_category
+        category_obj = sub_category_obj.category
+
+        line_records.append(
+                {
+                    'position': position,
+                    'entities': (category_obj.name, category_obj.discount_str, sub_category_obj.name,
+                                 sub_category_obj.discount_str, item_obj.name, item_obj.price_str,
+                                 item_obj.discount_str),
+                    'quantity': line['quantity'],
+                    'unit': line['unit'],
+                    'original_cost': line['original_cost'],
+                    'new_cost': line['new_cost']
+                }
+        )
+
+    return line_records
+
+
+def release_shard_stock(store: StoreManager, requests: list) -> None:
+    """
+    Give back the stock reserved for the lines of a bill which could not be completed.
+
+    Args:
+        store: store manager of the shard
+        requests: list of (item name, quantity)
+
+    Returns:
+        None
+    """
+
+    store.inventory.release(requests=requests)
+
+
+def count_shard_items(store: StoreManager) -> int:
+    """
+    Returns the number of items held by the shard.
+
+    Args:
+        store: store manager of the shard
+
+    Returns:
+        number of items
+    """
+
+    return len(store.store_data[ITEM])
+
+
+# mapping for shard request names and the functions serving them
+shard_operations = {
+    'load': load_shard,
+    'export': export_shard_items,
+    'stock': load_shard_stock,
+    'restock': set_shard_stock,
+    'price': price_shard_lines,
+    'release': release_shard_stock,
+    'count': count_shard_items
+}
+
+
+class ShardedStoreManager(StoreManager):
+    """
+    This class is the router of a sharded store. It keeps only the directory of which shard owns every sub category and
+    item, the basket level promotions and coupons, and the entities of the items it has billed. Bills are built and
+    fed to the listeners exactly like the bills of a single store manager.
+    """
+
+    def __init__(self, shard_count: int = 4) -> None:
+        """
+        Initialization method for sharded store manager class. One worker process is started for every shard.
+
+        Args:
+            shard_count: number of shards the categories are partitioned across
+        """
+
+        super().__init__()
+
+        self.shard_count = shard_count
+
+        # sub category and item names mapped to the id of the shard owning them
+        self.sub_category_shards = {}
+        self.item_shards = {}
+
+        # number of reloads processed by the shards, -1 until the first one
+        self.catalog_version = -1
+
+        # (entity type, entity name) mapped to the entity args and object, for the entities billed so far
+        self.entity_cache = {}
+
+        # every shard serves one request at a time
+        self.shard_locks = [threading.Lock() for _ in range(shard_count)]
+
+        # every worker listens on its own Unix socket, the router connects to all of them once they are started
+        self.socket_dir = tempfile.mkdtemp(prefix='store-shards-')
+        authkey = os.urandom(16)
+        context = multiprocessing.get_context('spawn')
+
+        addresses = [os.path.join(self.socket_dir, f'shard-{shard_id}.sock') for shard_id in range(shard_count)]
+        self.processes = [context.Process(target=run_shard, args=(address, authkey), daemon=True)
+                          for address in addresses]
+
+        for process in self.processes:
+            process.start()
+
+        self.connections = []
+
+        for address, process in zip(addresses, self.processes):
+            self.connections.append(self._connect(address=address, authkey=authkey, process=process))
+
+    def _connect(self, address: str, authkey: bytes, process: Any) -> Connection:
+        """
+        Connect to a shard worker, waiting for it to listen on its socket.
+
+        Args:
+            address: path of the Unix socket of the shard
+            authkey: key authenticating the router
+            process: process of the shard worker
+
+        Returns:
+            connection to the shard
+        """
+
+        while True:
+            try:
+                return Client(address=address, family='AF_UNIX', authkey=authkey)
+
+            except (FileNotFoundError, ConnectionRefusedError):
+                # the worker is still starting, unless it has stopped
+                if not process.is_alive():
+                    print(f"Shard worker for {address} stopped with exit code {process.exitcode}")
+                    self.close()
+                    raise ShardStartError
+
+                time.sleep(0.01)
+
+    def __enter__(self) -> 'ShardedStoreManager':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the shard workers and remove their sockets.
+
+        Returns:
+            None
+        """
+
+        for connection in self.connections:
+            try:
+                connection.send(('close',))
+                connection.close()
+
+            except OSError:
+                pass
+
+        for process in self.processes:
+            process.join(timeout=5)
+
+            if process.is_alive():
+                process.terminate()
+
+        self.connections = []
+        shutil.rmtree(self.socket_dir, ignore_errors=True)
+
+    def category_shard(self, category_name: str) -> int:
+        """
+        Returns the id of the shard owning a category.
+
+        Args:
+            category_name: category's name
+
+        Returns:
+            shard id
+        """
+
+        return zlib.crc32(category_name.encode()) % self.shard_count
+
+    def process_manager_data(self, data: str, lazy: bool = False) -> None:
+        """
+        Partition the manager data by category and process every partition on its shard. The shards process their
+        partitions at the same time.
+
+        Args:
+            data: the data to be processed
+            lazy: if True, the shards build their items on first use
+
+        Returns:
+            None
+        """
+
+        with self.reload_lock:
+            shard_lines = [[] for _ in range(self.shard_count)]
+
+            # sub category and item names mapped to the shards they were held by before being redefined on another one
+            previous_sub_category_shards = {}
+            previous_item_shards = {}
+
+            for line_data in data.split('\n'):
+                # ignore empty lines
+                if not line_data:
+                    continue
+
+                args = [(val.strip()).lower() for val in line_data.split(',')]
+                entity_type = args[0]
+
+                # lines without a name are rejected by the first shard the same way as by a single store
+                shard_id = 0
+
+                if entity_type == CATEGORY and len(args) > 1:
+                    shard_id = self.category_shard(category_name=args[1])
+
+                elif entity_type == SUB_CATEGORY and len(args) > 2:
+                    shard_id = self.category_shard(category_name=args[1])
+
+                    # an invalid redefinition is ignored by the shard, the sub category stays where it is
+                    if self.entities[SUB_CATEGORY].validate_args(*args[1:]):
+                        self._move_entity(entity_shards=self.sub_category_shards, name=args[2], shard_id=shard_id,
+                                          previous_shards=previous_sub_category_shards)
+
+                elif entity_type == ITEM and len(args) > 2:
+                    if args[1] not in self.sub_category_shards:
+                        print(f"Parent entity {args[1]} not found in {SUB_CATEGORY}. Ignoring the current input line.")
+                        continue
+
+                    shard_id = self.sub_category_shards[args[1]]
+                    self._move_entity(entity_shards=self.item_shards, name=args[2], shard_id=shard_id,
+                                      previous_shards=previous_item_shards)
+
+                shard_lines[shard_id].append(line_data)
+
+            self._send_requests(requests=[(shard_id, ('load', '\n'.join(lines), lazy))
+                                          for shard_id, lines in enumerate(shard_lines) if lines])
+
+            # the shards the entities moved from still hold them, move them over along with the items under them
+            self._detach_moved_entities(previous_sub_category_shards=previous_sub_category_shards,
+                                        previous_item_shards=previous_item_shards, lazy=lazy)
+
+            self.catalog_version += 1
+
+    @staticmethod
+    def _move_entity(entity_shards: dict, name: str, shard_id: int, previous_shards: dict) -> None:
+        """
+        Map an entity to the shard it is defined on, remembering the shard it was held by if it moved.
+
+        Args:
+            entity_shards: entity names mapped to the id of the shard owning them
+            name: entity's name
+            shard_id: id of the shard the entity is defined on
+            previous_shards: entity names mapped to the ids of the shards they moved from
+
+        Returns:
+            None
+        """
+
+        previous_shard_id = entity_shards.get(name)
+
+        if previous_shard_id is not None and previous_shard_id != shard_id:
+            previous_shards.setdefault(name, set()).add(previous_shard_id)
+
+        entity_shards[name] = shard_id
+
+    def _detach_moved_entities(self, previous_sub_category_shards: dict, previous_item_shards: dict,
+                               lazy: bool) -> None:
+        """
+        Remove the sub categories and items which moved to another shard from the shards they moved from. The items
+        under a moved sub category are loaded on its new shard, unless they have been redefined since.
+
+        Args:
+            previous_sub_category_shards: sub category names mapped to the ids of the shards they moved from
+            previous_item_shards: item names mapped to the ids of the shards they moved from
+            lazy: if True, the shards build their items on first use
+
+        Returns:
+            None
+        """
+
+        detached_sub_categories = {}
+        detached_items = {}
+
+        # a sub category moving back to a shard it was held by is not detached from it
+        for name, shard_ids in previous_sub_category_shards.items():
+            for shard_id in shard_ids - {self.sub_category_shards[name]}:
+                detached_sub_categories.setdefault(shard_id, []).append(name)
+
+        if not detached_sub_categories and not previous_item_shards:
+            return
+
+        # fetch the items under the moved sub categories from the shards they moved from
+        shard_ids = sorted(detached_sub_categories)
+        responses = self._send_requests(requests=[(shard_id, ('export', detached_sub_categories[shard_id]))
+                                                  for shard_id in shard_ids])
+        moved_item_lines = {}
+
+        for shard_id, (status, item_lines) in zip(shard_ids, responses):
+            if status != 'ok':
+                continue
+
+            for sub_category_name, lines in item_lines.items():
+                new_shard_id = self.sub_category_shards[sub_category_name]
+
+                for item_name, line_data in lines:
+                    # the item has been redefined under another sub category since, its stale copy is dropped
+                    if self.item_shards.get(item_name) != shard_id:
+                        continue
+
+                    moved_item_lines.setdefault(new_shard_id, []).append(line_data)
+                    self.item_shards[item_name] = new_shard_id
+
+        for name, shard_ids in previous_item_shards.items():
+            for shard_id in shard_ids - {self.item_shards[name]}:
+                detached_items.setdefault(shard_id, []).append(name)
+
+        requests = []
+
+        for shard_id in sorted(set(detached_sub_categories) | set(detached_items) | set(moved_item_lines)):
+            requests.append((shard_id, ('load', '\n'.join(moved_item_lines.get(shard_id, [])), lazy,
+                                        detached_sub_categories.get(shard_id, []), detached_items.get(shard_id, []))))
+
+        responses = self._send_requests(requests=requests)
+
+        # the stock of the moved items follows them to their new shard
+        shard_stock_levels = {}
+
+        for status, stock_levels in responses:
+            if status != 'ok':
+                continue
+
+            for item_name, quantity in stock_levels.items():
+                if item_name in self.item_shards:
+                    shard_stock_levels.setdefault(self.item_shards[item_name], {})[item_name] = quantity
+
+        if shard_stock_levels:
+            self._send_requests(requests=[(shard_id, ('restock', stock_levels))
+                                          for shard_id, stock_levels in sorted(shard_stock_levels.items())])
+
+    def process_stock_data(self, data: str) -> None:
+        """
+        Send every stock data line to the shard owning its item.
+
+        Args:
+            data: the data to be processed
+
+        Returns:
+            None
+        """
+
+        shard_lines = [[] for _ in range(self.shard_count)]
+
+        for line_data in data.split('\n'):
+            # ignore empty lines
+            if not line_data:
+                continue
+
+            item_name = ((line_data.split(',')[0]).strip()).lower()
+
+            if item_name not in self.item_shards:
+                print(f'Sorry, the item {item_name} was not found')
+                continue
+
+            shard_lines[self.item_shards[item_name]].append(line_data)
+
+        self._send_requests(requests=[(shard_id, ('stock', '\n'.join(lines)))
+                                      for shard_id, lines in enumerate(shard_lines) if lines])
+
+    def process_customer_input(self, customer_data: Any) -> list:
+        """
+        Split the input data provided by the customer by the shard owning every item.
+
+        Args:
+            customer_data: customer data to be processed, or an iterator over its comma separated items
+
+        Returns:
+            list of (shard id, item data) in the basket's order
+        """
+
+        try:
+            basket_parts = []
+
+            items_data = iter_split(data_str=customer_data, delimiter=',') if isinstance(customer_data, str) \
+                else customer_data
+
+            for item_data in items_data:
+                item_data = (item_data.strip()).lower()
+
+                # arguments must contain item name and quantity
+                item_args = item_data.split(' ')
+                if len(item_args) < 2:
+                    print('Invalid number of item arguments')
+                    continue
+
+                item_name = ' '.join(item_args[:-1])
+
+                if item_name not in self.item_shards:
+                    print(f'Sorry, the item {item_name} was not found')
+                    continue
+
+                basket_parts.append((self.item_shards[item_name], item_data))
+
+        except Exception as e:
+            print(f"Failed to generate bill as customer input cannot be processed.Exception: {e}\nTraceback: "
+                  f"{format_exc()}")
+            raise CustomerInputProcessingError
+
+        return basket_parts
+
+    def calculate_bill(self, processed_data: list, customer_id: Any = None, coupon_code: str = None,
+                       reserve_stock: bool = False) -> dict:
+        """
+        Price the parts of the basket on their shards at the same time and merge them into one bill, then apply the
+        promotions and the coupon.
+
+        Args:
+            processed_data: list of (shard id, item data) returned by process_customer_input
+            customer_id: id of the customer the bill is generated for, if known
+            coupon_code: coupon code presented by the customer, if any
+            reserve_stock: if True, the filled quantities are reserved on the shards and kept in the bill's
+                reserved_stock
+
+        Returns:
+            bill containing the priced lines, applied promotions, applied coupon and the totals
+        """
+
+        catalog_version = self.catalog_version
+
+        shard_parts = {}
+        for position, (shard_id, item_data) in enumerate(processed_data):
+            shard_parts.setdefault(shard_id, []).append((position, item_data))
+
+        requests = [(shard_id, ('price', parts, reserve_stock)) for shard_id, parts in sorted(shard_parts.items())]
+        responses = self._send_requests(requests=requests)
+
+        errors = [result for status, result in responses if status == 'error']
+
+        if errors:
+            # give back the stock reserved by the shards which could price their part
+            if reserve_stock:
+                self._release_stock(reserved_stock=[(record['entities'][4], record['quantity'])
+                                                    for status, result in responses if status == 'ok'
+                                                    for record in result])
+
+            if CustomerInputProcessingError.__name__ in errors:
+                raise CustomerInputProcessingError
+
+            raise BillGenerationError
+
+        line_records = sorted((record for _, result in responses for record in result),
+                              key=lambda record: record['position'])
+        reserved_stock = [(record['entities'][4], record['quantity']) for record in line_records] if reserve_stock \
+            else []
+
+        # stores the priced lines
+        bill_lines = []
+        # stores total original cost without discount
+        total_original_cost = 0.0
+        # stores total original cost with discount
+        total_new_cost = 0.0
+
+        try:
+            for record in line_records:
+                total_original_cost += record['original_cost']
+                total_new_cost += record['new_cost']
+
+                bill_lines.append(
+                        {
+                            'item': self._get_item(entities=record['entities']),
+                            'quantity': record['quantity'],
+                            'unit': record['unit'],
+                            'original_cost': record['original_cost'],
+                            'new_cost': record['new_cost']
+                        }
+                )
+
+            bill = self._finish_bill(bill_lines=bill_lines, total_original_cost=total_original_cost,
+                                     total_new_cost=total_new_cost, catalog_version=catalog_version,
+                                     customer_id=customer_id, coupon_code=coupon_code)
+
+        except BaseException:
+            # give back the stock reserved for the bill which could not be completed
+            self._release_stock(reserved_stock=reserved_stock)
+            raise
+
+        bill['reserved_stock'] = reserved_stock
+
+        return bill
+
+    def _release_stock(self, reserved_stock: list) -> None:
+        """
+        Give back the stock reserved for a bill which could not be completed, on the shards owning the items.
+
+        Args:
+            reserved_stock: list of (item name, quantity) reserved
+
+        Returns:
+            None
+        """
+
+        shard_requests = {}
+        for item_name, quantity in reserved_stock:
+            shard_requests.setdefault(self.item_shards[item_name], []).append((item_name, quantity))
+
+        if shard_requests:
+            self._send_requests(requests=[(shard_id, ('release', requests))
+                                          for shard_id, requests in sorted(shard_requests.items())])
+
+    def open_cart_session(self) -> Any:
+        """
+        Cart sessions price every scan against the local catalog, which the router doesn't hold, so they are
+        rejected.
+
+        Returns:
+            None
+        """
+
+        print("Cart sessions are not supported by the sharded store, bill the whole basket with generate_bill() "
+              "instead")
+        raise UnsupportedOperationError
+
+    def dry_run_manager_data(self, file: str, worker_count: int = None) -> dict:
+        """
+        The dry run diffs against the local catalog, which the router doesn't hold, so it is rejected.
+
+        Args:
+            file: candidate manager input file
+            worker_count: number of validation processes
+
+        Returns:
+            None
+        """
+
+        print("Dry runs are not supported by the sharded store, run the candidate manager input against a single "
+              "store manager instead")
+        raise UnsupportedOperationError
+
+    def shard_item_counts(self) -> list:
+        """
+        Returns the number of items held by every shard.
+
+        Returns:
+            list of item counts, by shard id
+        """
+
+        return [result for _, result in self._send_requests(requests=[(shard_id, ('count',))
+                                                                      for shard_id in range(self.shard_count)])]
+
+    def _send_requests(self, requests: list) -> list:
+        """
+        Send requests to the shards and wait for all the responses, so the shards serve them at the same time. What
+        the shards printed is printed in shard order.
+
+        Args:
+            requests: list of (shard id, request), at most one request per shard
+
+        Returns:
+            list of (status, result) for each request
+        """
+
+        # acquire the locks of all the shards involved in a fixed order so that concurrent bills can't deadlock
+        shard_ids = sorted(shard_id for shard_id, _ in requests)
+
+        for shard_id in shard_ids:
+            self.shard_locks[shard_id].acquire()
+
+        try:
+            for shard_id, request in requests:
+                self.connections[shard_id].send(request)
+
+            responses = [self._receive(connection=self.connections[shard_id]) for shard_id, _ in requests]
+
+        finally:
+            for shard_id in shard_ids:
+                self.shard_locks[shard_id].release()
+
+        for _, _, output in responses:
+            if output:
+                print(output, end='')
+
+        return [(status, result) for status, result, _ in responses]
+
+    @staticmethod
+    def _receive(connection: Connection) -> tuple:
+        """
+        Wait for the response of a shard.
+
+        Args:
+            connection: connection to the shard
+
+        Returns:
+            status, result, output printed by the shard
+        """
+
+        try:
+            return connection.recv()
+
+        except EOFError:
+            return 'error', BillGenerationError.__name__, 'Shard worker stopped unexpectedly\n'
+
+    def _get_item(self, entities: tuple) -> Item:
+        """
+        Return the item object for the entities of a priced line, building the item and its parents the first time
+        they are billed or after they changed.
+
+        Args:
+            entities: category name and discount, sub category name and discount, item name, price and discount
+
+        Returns:
+            item object
+        """
+
+        category_args, sub_category_args, item_args = entities[:2], entities[2:4], entities[4:]
+
+        category_obj = self._get_entity(entity_type=CATEGORY, args=category_args,
+                                        build=lambda: Category(*category_args))
+        sub_category_obj = self._get_entity(entity_type=SUB_CATEGORY, args=(category_obj, *sub_category_args),
+                                            build=lambda: SubCategory(category_obj, *sub_category_args))
+
+        return self._get_entity(entity_type=ITEM, args=(sub_category_obj, *item_args),
+                                build=lambda: Item(sub_category_obj, *item_args))
+
+    def _get_entity(self, entity_type: str, args: tuple, build: Any) -> Any:
+        """
+        Return the cached entity object for the args, building and caching it if the args changed.
+
+        Args:
+            entity_type: entity type
+            args: entity args, the parent object first if the entity has a parent
+            build: callable building the entity object
+
+        Returns:
+            entity object
+        """
+
+        entity_name = args[1] if self.parent_type_map[entity_type] else args[0]
+        cached = self.entity_cache.get((entity_type, entity_name))
+
+        # parents are compared by identity, so a rebuilt parent rebuilds its children
+        if cached and cached[0] == args:
+            return cached[1]
+
+        entity_obj = build()
+        assign_sku(sku_table=self.sku_tables[entity_type], entity_obj=entity_obj)
+        self.entity_cache[(entity_type, entity_name)] = (args, entity_obj)
+
+        return entity_obj
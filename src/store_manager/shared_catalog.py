@@ -0,0 +1,490 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the shared memory catalog. The parsed catalog is laid out once in a shared memory
+# region as fixed width records, a string arena and a hash index per entity type. Worker processes attach to it
+# read-only and look entities up in place, only the entities they actually touch are materialized
+
+import struct
+import sys
+import zlib
+
+from multiprocessing import shared_memory, resource_tracker
+from typing import Any, Iterator
+
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM
+from src.models.category import Category
+from src.models.sub_category import SubCategory
+from src.models.item import Item
+from src.store_manager.store_manager_runner import StoreManager
+
+"""
+Region header: magic, catalog version, then the record count and index capacity of each entity type, then the size of
+the string arena. Entity types are laid out in ENTITY_TYPES order
+"""
+MAGIC = b'SMCATv02'
+ENTITY_TYPES = (CATEGORY, SUB_CATEGORY, ITEM)
+HEADER = struct.Struct('<8sqIIIIIII')
+
+"""
+Entity record: parent sku, name offset, discount offset, price offset, name length, discount length, price length.
+Records are stored in sku order, a record with a zero name length is a free slot
+"""
+RECORD = struct.Struct('<iIIIHHH')
+
+"""
+Hash index slot: sku, -1 for an empty slot
+"""
+SLOT = struct.Struct('<i')
+EMPTY_SLOT = -1
+
+
+class SharedCatalog:
+    """
+    This class lays out the catalog of a store in a shared memory region, or attaches to one created by another
+    process.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        """
+        Initialization method for shared catalog class. Use create() or attach() instead.
+
+        Args:
+            shm: shared memory region holding the catalog
+            owner: True for the process which created the region
+        """
+
+        self.shm = shm
+        self.owner = owner
+        self.buffer = shm.buf if owner else shm.buf.toreadonly()
+
+        magic, self.catalog_version, *counts = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory {shm.name} doesn't hold a catalog")
+
+        self.arena_size = counts[-1]
+
+        # offsets of the records and of the hash index of each entity type
+        self.record_counts = {}
+        self.record_offsets = {}
+        self.index_capacities = {}
+        self.index_offsets = {}
+
+        offset = HEADER.size
+        for position, entity_type in enumerate(ENTITY_TYPES):
+            self.record_counts[entity_type] = counts[2 * position]
+            self.index_capacities[entity_type] = counts[2 * position + 1]
+
+            self.record_offsets[entity_type] = offset
+            offset += self.record_counts[entity_type] * RECORD.size
+
+            self.index_offsets[entity_type] = offset
+            offset += self.index_capacities[entity_type] * SLOT.size
+
+        self.arena_offset = offset
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @classmethod
+    def create(cls, store: StoreManager, name: str = None) -> 'SharedCatalog':
+        """
+        Lay out the current catalog of the store in a new shared memory region. Records are stored at the entity skus,
+        so skus are the same in the store and in the workers, and the region keeps the catalog version.
+
+        Args:
+            store: store manager whose catalog is to be shared
+            name: name of the shared memory region, a random one if not given
+
+        Returns:
+            shared catalog owning the region
+        """
+
+        catalog_version = store.catalog.version
+        store_data = store.store_data
+        arena = bytearray()
+
+        def add_string(value: str) -> tuple:
+            encoded = value.encode()
+            arena.extend(encoded)
+            return len(arena) - len(encoded), len(encoded)
+
+        records = {}
+        index_capacities = {}
+
+        for entity_type in ENTITY_TYPES:
+            # look all the entities up first, lazily processed items only get their sku when they are built
+            entity_objs = [store_data[entity_type][entity_name] for entity_name in store_data[entity_type]]
+
+            record_count = len(store.sku_tables[entity_type])
+            entity_records = [None] * record_count
+
+            for entity_obj in entity_objs:
+                parent_obj = entity_obj.get_parent()
+
+                name_offset, name_length = add_string(value=entity_obj.name)
+                discount_offset, discount_length = add_string(value=entity_obj.discount_str)
+                price_offset, price_length = add_string(value=getattr(entity_obj, 'price_str', ''))
+
+                entity_records[entity_obj.sku] = (
+                    -1 if parent_obj is None else parent_obj.sku, name_offset, discount_offset, price_offset,
+                    name_length, discount_length, price_length
+                )
+
+            records[entity_type] = entity_records
+
+            # keep the load factor of the index at or below a half
+            index_capacities[entity_type] = 1 << max(3, (2 * record_count).bit_length())
+
+        size = HEADER.size + len(arena) + sum(len(records[entity_type]) * RECORD.size +
+                                              index_capacities[entity_type] * SLOT.size
+                                              for entity_type in ENTITY_TYPES)
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        counts = []
+        for entity_type in ENTITY_TYPES:
+            counts.extend((len(records[entity_type]), index_capacities[entity_type]))
+        HEADER.pack_into(shm.buf, 0, MAGIC, catalog_version, *counts, len(arena))
+
+        catalog = cls(shm=shm, owner=True)
+
+        for entity_type in ENTITY_TYPES:
+            record_offset = catalog.record_offsets[entity_type]
+            index_offset = catalog.index_offsets[entity_type]
+            index_capacity = index_capacities[entity_type]
+
+            shm.buf[index_offset:index_offset + index_capacity * SLOT.size] = \
+                SLOT.pack(EMPTY_SLOT) * index_capacity
+
+            for sku, record in enumerate(records[entity_type]):
+                if record is None:
+                    RECORD.pack_into(shm.buf, record_offset + sku * RECORD.size, -1, 0, 0, 0, 0, 0, 0)
+                    continue
+
+                RECORD.pack_into(shm.buf, record_offset + sku * RECORD.size, *record)
+
+                # linear probing from the slot picked by the hash of the name
+                name_bytes = bytes(arena[record[1]:record[1] + record[4]])
+                slot_id = zlib.crc32(name_bytes) & (index_capacity - 1)
+                while SLOT.unpack_from(shm.buf, index_offset + slot_id * SLOT.size)[0] != EMPTY_SLOT:
+                    slot_id = (slot_id + 1) & (index_capacity - 1)
+
+                SLOT.pack_into(shm.buf, index_offset + slot_id * SLOT.size, sku)
+
+        shm.buf[catalog.arena_offset:catalog.arena_offset + len(arena)] = arena
+
+        return catalog
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedCatalog':
+        """
+        Attach read-only to a shared catalog created by another process.
+
+        Args:
+            name: name of the shared memory region
+
+        Returns:
+            shared catalog
+        """
+
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # only the owner must unlink the region, so the region is not registered with the resource tracker of
+            # this process (which would unlink it on exit)
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args: None
+
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+
+        return cls(shm=shm, owner=False)
+
+    def close(self) -> None:
+        """
+        Detach from the region, the owner also removes it.
+
+        Returns:
+            None
+        """
+
+        if not self.owner:
+            self.buffer.release()
+
+        self.shm.close()
+
+        if self.owner:
+            self.shm.unlink()
+
+    def lookup(self, entity_type: str, name: str) -> Any:
+        """
+        Find the sku of an entity through the hash index.
+
+        Args:
+            entity_type: entity type
+            name: entity name
+
+        Returns:
+            sku if found, else None
+        """
+
+        name_bytes = name.encode()
+        index_offset = self.index_offsets[entity_type]
+        index_capacity = self.index_capacities[entity_type]
+        slot_id = zlib.crc32(name_bytes) & (index_capacity - 1)
+
+        while True:
+            sku = SLOT.unpack_from(self.buffer, index_offset + slot_id * SLOT.size)[0]
+
+            if sku == EMPTY_SLOT:
+                return None
+
+            record = RECORD.unpack_from(self.buffer, self.record_offsets[entity_type] + sku * RECORD.size)
+            if record[4] == len(name_bytes) and self._read_bytes(record[1], record[4]) == name_bytes:
+                return sku
+
+            slot_id = (slot_id + 1) & (index_capacity - 1)
+
+    def get_record(self, entity_type: str, sku: int) -> Any:
+        """
+        Read and decode the record of an entity.
+
+        Args:
+            entity_type: entity type
+            sku: entity sku
+
+        Returns:
+            (parent sku, name, discount string, price string) if the sku is in use, else None
+        """
+
+        if not 0 <= sku < self.record_counts[entity_type]:
+            return None
+
+        parent_sku, name_offset, discount_offset, price_offset, name_length, discount_length, price_length = \
+            RECORD.unpack_from(self.buffer, self.record_offsets[entity_type] + sku * RECORD.size)
+
+        if not name_length:
+            return None
+
+        return (parent_sku, self._read_bytes(name_offset, name_length).decode(),
+                self._read_bytes(discount_offset, discount_length).decode(),
+                self._read_bytes(price_offset, price_length).decode())
+
+    def iter_skus(self, entity_type: str) -> Iterator:
+        """
+        Iterate over the skus in use of an entity type.
+
+        Args:
+            entity_type: entity type
+
+        Returns:
+            iterator over the skus
+        """
+
+        record_offset = self.record_offsets[entity_type]
+
+        for sku in range(self.record_counts[entity_type]):
+            if RECORD.unpack_from(self.buffer, record_offset + sku * RECORD.size)[4]:
+                yield sku
+
+    def _read_bytes(self, offset: int, length: int) -> bytes:
+        """
+        Read bytes from the string arena.
+
+        Args:
+            offset: offset within the arena
+            length: number of bytes
+
+        Returns:
+            bytes read
+        """
+
+        start = self.arena_offset + offset
+
+        return bytes(self.buffer[start:start + length])
+
+
+class SharedEntityMapping:
+    """
+    This class exposes a single entity type of the shared catalog with the same lookups as the in-memory name to
+    entity object mapping. Entity objects are materialized on first use and kept for the life of the worker.
+    """
+
+    def __init__(self, catalog_data: 'SharedCatalogData', entity_type: str) -> None:
+        """
+        Initialization method for shared entity mapping class.
+
+        Args:
+            catalog_data: store data the entity type belongs to
+            entity_type: entity type exposed by this mapping
+        """
+
+        self.catalog_data = catalog_data
+        self.entity_type = entity_type
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """
+        Fetch the entity object for the given name.
+
+        Args:
+            name: entity name
+            default: value returned if the entity is not found
+
+        Returns:
+            entity object if found, else default
+        """
+
+        sku = self.catalog_data.catalog.lookup(entity_type=self.entity_type, name=name)
+
+        if sku is None:
+            return default
+
+        return self.catalog_data.get_entity(entity_type=self.entity_type, sku=sku)
+
+    def __getitem__(self, name: str) -> Any:
+        entity_obj = self.get(name)
+
+        if entity_obj is None:
+            raise KeyError(name)
+
+        return entity_obj
+
+    def __contains__(self, name: str) -> bool:
+        return self.catalog_data.catalog.lookup(entity_type=self.entity_type, name=name) is not None
+
+    def __iter__(self) -> Iterator:
+        for sku in self.catalog_data.catalog.iter_skus(entity_type=self.entity_type):
+            yield self.catalog_data.catalog.get_record(entity_type=self.entity_type, sku=sku)[1]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.catalog_data.catalog.iter_skus(entity_type=self.entity_type))
+
+
+class SharedCatalogData:
+    """
+    This class is the read-only store data of a worker attached to a shared catalog.
+    """
+
+    def __init__(self, catalog: SharedCatalog) -> None:
+        """
+        Initialization method for shared catalog data class.
+
+        Args:
+            catalog: attached shared catalog
+        """
+
+        self.catalog = catalog
+
+        # materialized entity objects, keyed by (entity type, sku)
+        self.entities = {}
+
+        self.mappings = {entity_type: SharedEntityMapping(catalog_data=self, entity_type=entity_type)
+                         for entity_type in ENTITY_TYPES}
+
+    def __getitem__(self, entity_type: str) -> SharedEntityMapping:
+        return self.mappings[entity_type]
+
+    def __contains__(self, entity_type: str) -> bool:
+        return entity_type in self.mappings
+
+    def keys(self) -> Any:
+        return self.mappings.keys()
+
+    def freeze(self) -> None:
+        """
+        The shared catalog is always read-only.
+
+        Returns:
+            None
+        """
+
+        pass
+
+    def stage(self) -> None:
+        """
+        The shared catalog can't be reloaded from a worker, create a new shared catalog instead.
+
+        Returns:
+            None
+        """
+
+        raise TypeError("A shared catalog is read-only")
+
+    def get_entity(self, entity_type: str, sku: int) -> Any:
+        """
+        Fetch the entity object of a sku, materializing it and its parents on first use.
+
+        Args:
+            entity_type: entity type
+            sku: entity sku
+
+        Returns:
+            entity object if the sku is in use, else None
+        """
+
+        entity_obj = self.entities.get((entity_type, sku))
+
+        if entity_obj is not None:
+            return entity_obj
+
+        record = self.catalog.get_record(entity_type=entity_type, sku=sku)
+
+        if record is None:
+            return None
+
+        parent_sku, name, discount_str, price_str = record
+
+        if entity_type == CATEGORY:
+            entity_obj = Category(name, discount_str)
+        elif entity_type == SUB_CATEGORY:
+            entity_obj = SubCategory(self.get_entity(entity_type=CATEGORY, sku=parent_sku), name, discount_str)
+        else:
+            entity_obj = Item(self.get_entity(entity_type=SUB_CATEGORY, sku=parent_sku), name, price_str,
+                              discount_str)
+
+        entity_obj.sku = sku
+        self.entities[(entity_type, sku)] = entity_obj
+
+        return entity_obj
+
+
+class SharedStoreManager(StoreManager):
+    """
+    This class is the store manager of a worker process, billing against a shared catalog. Its sku tables stay empty,
+    skus are resolved through the records of the shared catalog instead.
+    """
+
+    def __init__(self, shm_name: str) -> None:
+        """
+        Initialization method for shared store manager class.
+
+        Args:
+            shm_name: name of the shared memory region holding the catalog
+        """
+
+        super().__init__()
+
+        self.shared_catalog = SharedCatalog.attach(name=shm_name)
+
+        # the worker's catalog has the version of the store's catalog it was laid out from, so that encoded baskets
+        # are resolved against it
+        self._publish_catalog(store_data=SharedCatalogData(catalog=self.shared_catalog),
+                              version=self.shared_catalog.catalog_version)
+
+    def get_entity_by_sku(self, entity_type: str, sku: int, store_data: Any) -> Any:
+        """
+        Fetch the entity object of a sku from the shared catalog.
+
+        Args:
+            entity_type: entity type
+            sku: entity sku
+            store_data: store data of the catalog version the sku is resolved against
+
+        Returns:
+            entity object if found, else None
+        """
+
+        return store_data.get_entity(entity_type=entity_type, sku=sku)
@@ -0,0 +1,583 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the SQLite backed store manager. Categories, sub categories and items are kept in a
+# local SQLite file and entity objects are materialized lazily through a bounded in-memory cache. Every published
+# catalog version holds its own read transaction, so it keeps reading the same version of the file while a reload
+# writes the next one
+
+import sqlite3
+import threading
+
+from collections import OrderedDict
+from typing import Any, Iterator
+
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM
+from src.models.entity import Entity
+from src.models.category import Category
+from src.models.sub_category import SubCategory
+from src.models.item import Item
+from src.models.sku_table import assign_sku
+from src.store_manager.store_manager_runner import StoreManager
+
+"""
+Schema of the catalog tables
+"""
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS category (
+    name TEXT PRIMARY KEY,
+    discount_str TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sub_category (
+    name TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    discount_str TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS sub_category_category ON sub_category (category);
+
+CREATE TABLE IF NOT EXISTS item (
+    name TEXT PRIMARY KEY,
+    sub_category TEXT NOT NULL,
+    price_str TEXT NOT NULL,
+    discount_str TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS item_sub_category ON item (sub_category);
+"""
+
+"""
+Insert and select statements for each entity type
+"""
+INSERT_STATEMENTS = {
+    CATEGORY: "INSERT OR REPLACE INTO category (name, discount_str) VALUES (?, ?)",
+    SUB_CATEGORY: "INSERT OR REPLACE INTO sub_category (name, category, discount_str) VALUES (?, ?, ?)",
+    ITEM: "INSERT OR REPLACE INTO item (name, sub_category, price_str, discount_str) VALUES (?, ?, ?, ?)"
+}
+
+SELECT_STATEMENTS = {
+    CATEGORY: "SELECT discount_str FROM category WHERE name = ?",
+    SUB_CATEGORY: "SELECT category, discount_str FROM sub_category WHERE name = ?",
+    ITEM: "SELECT sub_category, price_str, discount_str FROM item WHERE name = ?"
+}
+
+
+class SqliteEntityMapping:
+    """
+    This class exposes a single entity type of the SQLite catalog with the same lookups as the in-memory name to
+    entity object mapping.
+    """
+
+    def __init__(self, catalog: 'SqliteCatalog', entity_type: str) -> None:
+        """
+        Initialization method for sqlite entity mapping class.
+
+        Args:
+            catalog: catalog the entity type belongs to
+            entity_type: entity type exposed by this mapping
+        """
+
+        self.catalog = catalog
+        self.entity_type = entity_type
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """
+        Fetch the entity object for the given name.
+
+        Args:
+            name: entity name
+            default: value returned if the entity is not found
+
+        Returns:
+            entity object if found, else default
+        """
+
+        entity_obj = self.catalog.get_entity(entity_type=self.entity_type, name=name)
+
+        return default if entity_obj is None else entity_obj
+
+    def __getitem__(self, name: str) -> Entity:
+        entity_obj = self.catalog.get_entity(entity_type=self.entity_type, name=name)
+
+        if entity_obj is None:
+            raise KeyError(name)
+
+        return entity_obj
+
+    def __setitem__(self, name: str, entity_obj: Entity) -> None:
+        self.catalog.put_entity(entity_type=self.entity_type, entity_obj=entity_obj)
+
+    def __delitem__(self, name: str) -> None:
+        self.catalog.delete_entity(entity_type=self.entity_type, name=name)
+
+    def __contains__(self, name: str) -> bool:
+        return self.catalog.has_entity(entity_type=self.entity_type, name=name)
+
+    def __iter__(self) -> Iterator:
+        return self.catalog.iter_names(entity_type=self.entity_type)
+
+    def __len__(self) -> int:
+        return self.catalog.count(entity_type=self.entity_type)
+
+
+class SqliteCatalog:
+    """
+    This class keeps the catalog in a SQLite file. It is a drop in replacement of the store data mapping of entity
+    types to name to entity object mappings, including the stage(), freeze() and discard() steps of a catalog
+    snapshot.
+    """
+
+    def __init__(self, db_path: str, cache_size: int = 10000, batch_size: int = 50000,
+                 sku_tables: dict = None) -> None:
+        """
+        Initialization method for sqlite catalog class.
+
+        Args:
+            db_path: path of the SQLite file
+            cache_size: max number of entity objects kept in memory
+            batch_size: number of rows written in one go during bulk loading
+            sku_tables: sku tables of the store, materialized entities get their skus from them
+        """
+
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.sku_tables = sku_tables
+
+        self.connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(CATALOG_SCHEMA)
+
+        # the connection and the cache are shared between billing threads
+        self.lock = threading.RLock()
+
+        # least recently used entity objects, keyed by (entity type, name)
+        self.cache = OrderedDict()
+
+        # rows waiting to be written, only used while bulk loading
+        self.pending_rows = {
+            CATEGORY: {},
+            SUB_CATEGORY: {},
+            ITEM: {}
+        }
+        self.bulk_loading = False
+        self.frozen = False
+
+        self.mappings = {entity_type: SqliteEntityMapping(catalog=self, entity_type=entity_type)
+                         for entity_type in (CATEGORY, SUB_CATEGORY, ITEM)}
+
+    def __getitem__(self, entity_type: str) -> SqliteEntityMapping:
+        return self.mappings[entity_type]
+
+    def __contains__(self, entity_type: str) -> bool:
+        return entity_type in self.mappings
+
+    def keys(self) -> Any:
+        return self.mappings.keys()
+
+    def stage(self) -> 'SqliteCatalog':
+        """
+        Open a new connection on the same file with a write transaction in which the next version is bulk loaded.
+        All the writes are buffered and written in large batches.
+
+        Returns:
+            staged catalog
+        """
+
+        staged = SqliteCatalog(db_path=self.db_path, cache_size=self.cache_size, batch_size=self.batch_size,
+                               sku_tables=self.sku_tables)
+        staged.connection.execute("BEGIN IMMEDIATE")
+        staged.bulk_loading = True
+
+        return staged
+
+    def freeze(self) -> None:
+        """
+        Commit the staged writes and pin a read transaction, so this version keeps reading the same state of the
+        file even after newer versions are committed.
+
+        Returns:
+            None
+        """
+
+        with self.lock:
+            if self.bulk_loading:
+                self._flush_pending_rows()
+                self.connection.execute("COMMIT")
+                self.bulk_loading = False
+
+            # a deferred transaction takes its read snapshot on the first select
+            self.connection.execute("BEGIN")
+            self.connection.execute("SELECT COUNT(*) FROM category").fetchone()
+            self.frozen = True
+
+    def discard(self) -> None:
+        """
+        Roll back the staged writes and close the connection.
+
+        Returns:
+            None
+        """
+
+        with self.lock:
+            self._clear_pending_rows()
+            self.cache.clear()
+
+            if self.connection.in_transaction:
+                self.connection.execute("ROLLBACK")
+
+        self.close()
+
+    def put_entity(self, entity_type: str, entity_obj: Entity) -> None:
+        """
+        Store the entity object's row and keep the object in the cache.
+
+        Args:
+            entity_type: entity type of the object
+            entity_obj: entity object to be stored
+
+        Returns:
+            None
+        """
+
+        if self.frozen:
+            raise TypeError("A published catalog version is read-only")
+
+        row = self._entity_row(entity_type=entity_type, entity_obj=entity_obj)
+
+        with self.lock:
+            # the cached children of a redefined parent still point to its previous object, they are materialized
+            # again from their rows with the new parent on their next lookup
+            if entity_type != ITEM and self.has_entity(entity_type=entity_type, name=entity_obj.name):
+                self._evict_children(entity_type=entity_type, name=entity_obj.name)
+
+            self._cache_entity(entity_type=entity_type, entity_obj=entity_obj)
+
+            if not self.bulk_loading:
+                self.connection.execute(INSERT_STATEMENTS[entity_type], row)
+                return
+
+            self.pending_rows[entity_type][entity_obj.name] = row
+
+            if sum(len(rows) for rows in self.pending_rows.values()) >= self.batch_size:
+                self._flush_pending_rows()
+
+    def delete_entity(self, entity_type: str, name: str) -> None:
+        """
+        Delete the entity's row and drop the object from the cache.
+
+        Args:
+            entity_type: entity type of the object
+            name: entity name
+
+        Returns:
+            None
+        """
+
+        if self.frozen:
+            raise TypeError("A published catalog version is read-only")
+
+        with self.lock:
+            self.cache.pop((entity_type, name), None)
+            self.pending_rows[entity_type].pop(name, None)
+            self.connection.execute(f"DELETE FROM {entity_type} WHERE name = ?", (name,))
+
+    def iter_descendant_items(self, categories: set, sub_categories: set) -> Iterator:
+        """
+        Iterate over the names of the items under the given categories and sub categories.
+
+        Args:
+            categories: category names
+            sub_categories: sub category names
+
+        Returns:
+            iterator over the item names
+        """
+
+        with self.lock:
+            self._flush_pending_rows()
+            names = self.connection.execute(
+                    f"SELECT item.name FROM item JOIN sub_category ON item.sub_category = sub_category.name "
+                    f"WHERE sub_category.name IN ({', '.join('?' * len(sub_categories))}) "
+                    f"OR sub_category.category IN ({', '.join('?' * len(categories))}) ORDER BY item.name",
+                    (*sub_categories, *categories)).fetchall()
+
+        return iter([name for name, in names])
+
+    def get_entity(self, entity_type: str, name: str) -> Any:
+        """
+        Fetch the entity object from the cache, or materialize it from its row.
+
+        Args:
+            entity_type: entity type of the object
+            name: entity name
+
+        Returns:
+            entity object if found, else None
+        """
+
+        with self.lock:
+            entity_obj = self.cache.get((entity_type, name))
+
+            if entity_obj is not None:
+                self.cache.move_to_end((entity_type, name))
+                return entity_obj
+
+            row = self._fetch_row(entity_type=entity_type, name=name)
+
+            if row is None:
+                return None
+
+            entity_obj = self._materialize(entity_type=entity_type, name=name, row=row)
+
+            if self.sku_tables:
+                assign_sku(sku_table=self.sku_tables[entity_type], entity_obj=entity_obj)
+            self._cache_entity(entity_type=entity_type, entity_obj=entity_obj)
+
+            return entity_obj
+
+    def has_entity(self, entity_type: str, name: str) -> bool:
+        """
+        Checks if the entity is present without materializing it.
+
+        Args:
+            entity_type: entity type of the object
+            name: entity name
+
+        Returns:
+            True, if found, else False
+        """
+
+        with self.lock:
+            if (entity_type, name) in self.cache:
+                return True
+
+            return self._fetch_row(entity_type=entity_type, name=name) is not None
+
+    def iter_names(self, entity_type: str) -> Iterator:
+        """
+        Iterate over the names of all the entities of an entity type.
+
+        Args:
+            entity_type: entity type
+
+        Returns:
+            iterator over the entity names
+        """
+
+        with self.lock:
+            self._flush_pending_rows()
+            names = self.connection.execute(f"SELECT name FROM {entity_type} ORDER BY name").fetchall()
+
+        return iter([name for name, in names])
+
+    def count(self, entity_type: str) -> int:
+        """
+        Count the entities of an entity type.
+
+        Args:
+            entity_type: entity type
+
+        Returns:
+            number of stored entities
+        """
+
+        with self.lock:
+            self._flush_pending_rows()
+            return self.connection.execute(f"SELECT COUNT(*) FROM {entity_type}").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Close the SQLite connection.
+
+        Returns:
+            None
+        """
+
+        with self.lock:
+            self.connection.close()
+
+    def release(self) -> None:
+        """
+        End the pinned read transaction and close the connection, called once the published version is no longer
+        referenced. Until then the WAL can not be checkpointed past the pinned version.
+
+        Returns:
+            None
+        """
+
+        with self.lock:
+            self.cache.clear()
+
+            try:
+                if self.connection.in_transaction:
+                    self.connection.execute("ROLLBACK")
+
+            except sqlite3.ProgrammingError:
+                # the connection has already been closed
+                return
+
+        self.close()
+
+    def __del__(self) -> None:
+        # fallback for the catalogs which have never been published
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+    def _fetch_row(self, entity_type: str, name: str) -> Any:
+        """
+        Fetch the row of an entity, looking at the rows waiting to be written first.
+
+        Args:
+            entity_type: entity type of the object
+            name: entity name
+
+        Returns:
+            row values without the name if found, else None
+        """
+
+        pending_row = self.pending_rows[entity_type].get(name)
+
+        if pending_row is not None:
+            return pending_row[1:]
+
+        return self.connection.execute(SELECT_STATEMENTS[entity_type], (name,)).fetchone()
+
+    def _materialize(self, entity_type: str, name: str, row: tuple) -> Entity:
+        """
+        Build the entity object from its row. Parents are fetched through the cache as well.
+
+        Args:
+            entity_type: entity type of the object
+            name: entity name
+            row: row values without the name
+
+        Returns:
+            entity object
+        """
+
+        if entity_type == CATEGORY:
+            return Category(name, *row)
+
+        parent_type = CATEGORY if entity_type == SUB_CATEGORY else SUB_CATEGORY
+        parent_obj = self.get_entity(entity_type=parent_type, name=row[0])
+
+        if entity_type == SUB_CATEGORY:
+            return SubCategory(parent_obj, name, *row[1:])
+
+        return Item(parent_obj, name, *row[1:])
+
+    def _cache_entity(self, entity_type: str, entity_obj: Entity) -> None:
+        """
+        Add the entity object to the cache and evict the least recently used ones if the cache is full.
+
+        Args:
+            entity_type: entity type of the object
+            entity_obj: entity object to be cached
+
+        Returns:
+            None
+        """
+
+        self.cache[(entity_type, entity_obj.name)] = entity_obj
+        self.cache.move_to_end((entity_type, entity_obj.name))
+
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def _evict_children(self, entity_type: str, name: str) -> None:
+        """
+        Drop the cached sub categories and items under a category, or the cached items under a sub category.
+
+        Args:
+            entity_type: entity type of the parent
+            name: parent name
+
+        Returns:
+            None
+        """
+
+        for key, cached_obj in list(self.cache.items()):
+            if key[0] == SUB_CATEGORY:
+                is_child = entity_type == CATEGORY and cached_obj.category.name == name
+
+            elif key[0] == ITEM:
+                parent_obj = cached_obj.sub_category if entity_type == SUB_CATEGORY else \
+                    cached_obj.sub_category.category
+                is_child = parent_obj.name == name
+
+            else:
+                continue
+
+            if is_child:
+                del self.cache[key]
+
+    def _flush_pending_rows(self) -> None:
+        """
+        Write the rows waiting to be written. Parents are written before their children.
+
+        Returns:
+            None
+        """
+
+        for entity_type in (CATEGORY, SUB_CATEGORY, ITEM):
+            if self.pending_rows[entity_type]:
+                self.connection.executemany(INSERT_STATEMENTS[entity_type],
+                                            self.pending_rows[entity_type].values())
+                self.pending_rows[entity_type] = {}
+
+    def _clear_pending_rows(self) -> None:
+        """
+        Drop the rows waiting to be written.
+
+        Returns:
+            None
+        """
+
+        for entity_type in self.pending_rows:
+            self.pending_rows[entity_type] = {}
+
+    @staticmethod
+    def _entity_row(entity_type: str, entity_obj: Entity) -> tuple:
+        """
+        Build the row to be stored for the entity object.
+
+        Args:
+            entity_type: entity type of the object
+            entity_obj: entity object
+
+        Returns:
+            row values
+        """
+
+        if entity_type == CATEGORY:
+            return entity_obj.name, entity_obj.discount_str
+
+        if entity_type == SUB_CATEGORY:
+            return entity_obj.name, entity_obj.category.name, entity_obj.discount_str
+
+        return entity_obj.name, entity_obj.sub_category.name, entity_obj.price_str, entity_obj.discount_str
+
+
+class SqliteStoreManager(StoreManager):
+    """
+    This class is the store manager which keeps its catalog in a SQLite file instead of in memory.
+    """
+
+    def __init__(self, db_path: str, cache_size: int = 10000, batch_size: int = 50000) -> None:
+        """
+        Initialization method for sqlite store manager class.
+
+        Args:
+            db_path: path of the SQLite file
+            cache_size: max number of entity objects kept in memory
+            batch_size: number of rows written in one go during bulk loading
+        """
+
+        super().__init__()
+
+        self.store_data = SqliteCatalog(db_path=db_path, cache_size=cache_size, batch_size=batch_size,
+                                        sku_tables=self.sku_tables)
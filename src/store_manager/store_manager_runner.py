@@ -3,7 +3,11 @@
 #   Purpose: This file contains the Store manager class. The class contains all the required functions to
 # initialize the store and generate a bill for customer
 
-from typing import Any
+import threading
+import uuid
+import weakref
+
+from typing import Any, Callable, Iterator
 from traceback import format_exc
 
 from src.constants import units_mapping
@@ -12,8 +16,13 @@ from src.constants import CATEGORY, SUB_CATEGORY, ITEM
 from src.models.category import Category
 from src.models.sub_category import SubCategory
 from src.models.item import Item
-from src.models.percentage_wise_discount import PercentageWiseDiscountStrategy
-from src.utilities import extract_required_data
+from src.models.sku_table import SkuTable, assign_sku
+from src.store_manager.cart_session import CartSession
+from src.store_manager.catalog_snapshot import CatalogSnapshot, ProcessedBasket
+from src.store_manager.inventory import Inventory
+from src.store_manager.lazy_catalog import LazyItemMapping
+from src.store_manager.promotion_engine import PromotionEngine
+from src.utilities import extract_required_data, iter_file_baskets, iter_file_lines, iter_split
 from src.exceptions.exceptions import CustomerInputProcessingError, BillGenerationError
 
 
@@ -35,14 +44,31 @@ class StoreManager:
             ITEM: Item
         }
 
-        # this mapping consists of entity types and all the new entities added within them. The new entities further
-        # consists of new names mapped to their class's objects
-        self.store_data = {
-            CATEGORY: {},
-            SUB_CATEGORY: {},
-            ITEM: {}
+        # dense integer skus of each entity type, shared by all the catalog versions
+        self.sku_tables = {
+            CATEGORY: SkuTable(),
+            SUB_CATEGORY: SkuTable(),
+            ITEM: SkuTable()
+        }
+
+        # published catalog versions which are still referenced by a basket or a bill
+        self.live_catalogs = weakref.WeakValueDictionary()
+
+        # reloads are serialized, billing never takes this lock
+        self.reload_lock = threading.Lock()
+
+        # names of the categories and sub categories redefined by the reload being processed, the entities under them
+        # are rebuilt before the reload is published
+        self.redefined_parents = {
+            CATEGORY: set(),
+            SUB_CATEGORY: set()
         }
 
+        # current catalog snapshot. Its store data maps entity types to all the new entities added within them. The
+        # new entities further consists of new names mapped to their class's objects
+        self.catalog = None
+        self.store_data = CatalogSnapshot.empty_store_data()
+
         # parent mapping for each entity
         self.parent_type_map = {
             SUB_CATEGORY: CATEGORY,
@@ -50,12 +76,127 @@ class StoreManager:
             CATEGORY: None
         }
 
-    def process_manager_data(self, data: str) -> None:
+        # basket level promotions, indexed by the entities they involve
+        self.promotion_engine = PromotionEngine(sku_tables=self.sku_tables)
+
+        # single use coupon campaigns, the coupon engine is only loaded once a coupon is used
+        self.coupon_engine = None
+
+        # per item stock levels, reserved while generating the bills
+        self.inventory = Inventory()
+
+        # callables fed with every generated bill
+        self.bill_listeners = []
+
+        # callable rendering every generated bill
+        self.bill_renderer = self.print_bill
+
+    @property
+    def store_data(self) -> Any:
+        """
+        Returns the store data of the current catalog snapshot.
+
+        Returns:
+            mapping of entity types to name to entity object mappings
+        """
+
+        return self.catalog.store_data
+
+    @store_data.setter
+    def store_data(self, store_data: Any) -> None:
+        """
+        Publish the given store data as the next catalog version.
+
+        Args:
+            store_data: store data to be published
+
+        Returns:
+            None
+        """
+
+        self._publish_catalog(store_data=store_data)
+
+    def _publish_catalog(self, store_data: Any, version: int = None) -> None:
+        """
+        Freeze the store data and publish it as the next catalog version with a single reference swap.
+
+        Args:
+            store_data: store data to be published
+            version: version of the published catalog, the one following the current version if not given
+
+        Returns:
+            None
+        """
+
+        if version is None:
+            version = self.catalog.version + 1 if self.catalog else 0
+        catalog = CatalogSnapshot(version=version, store_data=store_data)
+
+        self.live_catalogs[version] = catalog
+        self.catalog = catalog
+
+    def live_catalog_versions(self) -> list:
         """
-        Processes manager data (initialize store's data) and check for basic validations.
+        Returns the catalog versions which are still alive, the older ones are released as soon as no basket or bill
+        references them.
+
+        Returns:
+            sorted list of versions
+        """
+
+        return sorted(self.live_catalogs.keys())
+
+    def process_manager_data(self, data: str, lazy: bool = False) -> None:
+        """
+        Processes manager data (initialize store's data) and check for basic validations. The data is applied to a
+        copy of the current catalog which is published once all the lines have been processed, so readers never see
+        a half built catalog.
+
+        Args:
+            data: the data to be processed
+            lazy: if True, item lines are only validated and indexed, and the item objects are built the first time
+                they are looked up. Custom store data backends (E.g: the SQLite catalog) build their entities on
+                first use anyway and ignore it
+
+        Returns:
+            None
+        """
+
+        with self.reload_lock:
+            store_data = self.catalog.stage()
+
+            # index the item lines of the in-memory store data, keeping the items already built
+            if lazy and isinstance(store_data, dict):
+                items = CatalogSnapshot.writable(store_data=store_data, entity_type=ITEM)
+
+                if not isinstance(items, LazyItemMapping):
+                    store_data[ITEM] = LazyItemMapping(sku_table=self.sku_tables[ITEM], items=items)
+
+            try:
+                self._process_manager_lines(data=data, store_data=store_data, lazy=lazy)
+
+                # the pricing kernels of the items under a redefined parent still use the old parent's discount
+                if any(self.redefined_parents.values()):
+                    self._rebuild_descendants(store_data=store_data)
+
+            except BaseException:
+                self.catalog.discard(store_data=store_data)
+                raise
+
+            finally:
+                for names in self.redefined_parents.values():
+                    names.clear()
+
+            self._publish_catalog(store_data=store_data)
+
+    def _process_manager_lines(self, data: str, store_data: Any, lazy: bool = False) -> None:
+        """
+        Processes manager data lines into the given store data.
 
         Args:
             data: the data to be processed
+            store_data: staged store data
+            lazy: if True, item lines are only validated and indexed
 
         Returns:
             None
@@ -82,26 +223,144 @@ class StoreManager:
 
                 # if current customer data is invalid, ignore the data
                 if not self._validate_curr_customer_data(entity_type=entity_type,
-                                                         entity_parent_name=entity_parent_name):
+                                                         entity_parent_name=entity_parent_name,
+                                                         store_data=store_data):
                     continue
 
                 # strip and convert all the other arguments to lower case
                 args = [(val.strip()).lower() for val in args]
 
                 # store the entity data after checking for its corresponding entity specific validations
-                self._store_entity_data(entity_type=entity_type, args=args)
+                self._store_entity_data(entity_type=entity_type, args=args, store_data=store_data, lazy=lazy)
 
             except Exception as e:
                 print(f"Line data {line_data} is invalid. Ignoring this line. Exception: {e}\nTraceback: "
                       f"{format_exc()}")
 
-    def _validate_curr_customer_data(self, entity_type: str, entity_parent_name: str) -> bool:
+    def dry_run_manager_data(self, file: str, worker_count: int = None) -> dict:
+        """
+        Validate a candidate manager input file as the complete catalog of a fresh store, without building any entity,
+        and diff it against the current catalog. The current catalog is left unchanged.
+
+        Args:
+            file: candidate manager input file
+            worker_count: number of validation processes, defaults to the number of CPUs
+
+        Returns:
+            rejected lines and the added, removed, price changes and effective discount changes entries
+        """
+
+        # the dry run pulls in multiprocessing, load it only when it is used
+        from src.store_manager.catalog_dry_run import CatalogDryRun
+
+        return CatalogDryRun(store=self, worker_count=worker_count).run(lines=iter_file_lines(file=file))
+
+    def process_promotion_data(self, data: str) -> None:
+        """
+        Processes promotion data (initialize store's basket level promotions).
+
+        Args:
+            data: the data to be processed
+
+        Returns:
+            None
+        """
+
+        self.promotion_engine.process_promotion_data(data=data)
+
+    def process_coupon_data(self, data: str) -> None:
+        """
+        Processes coupon data (load store's coupon campaigns).
+
+        Args:
+            data: the data to be processed
+
+        Returns:
+            None
+        """
+
+        self._get_coupon_engine().process_coupon_data(data=data)
+
+    def process_stock_data(self, data: str) -> None:
+        """
+        Processes stock data (initialize store's stock levels).
+
+        Args:
+            data: the data to be processed
+
+        Returns:
+            None
+        """
+
+        self.inventory.process_stock_data(data=data)
+
+    def _get_coupon_engine(self) -> Any:
+        """
+        Returns the coupon engine, loading it on first use.
+
+        Returns:
+            coupon engine
+        """
+
+        # the coupon engine pulls in hashlib, load it only when a coupon is used
+        if not self.coupon_engine:
+            from src.store_manager.coupon_engine import CouponEngine
+
+            self.coupon_engine = CouponEngine()
+
+        return self.coupon_engine
+
+    def add_bill_listener(self, listener: Callable) -> None:
+        """
+        Register a callable which is called with every generated bill.
+
+        Args:
+            listener: callable taking the bill
+
+        Returns:
+            None
+        """
+
+        self.bill_listeners.append(listener)
+
+    def open_cart_session(self) -> CartSession:
+        """
+        Start a cart session, priced against the current catalog version, for a cart built one scan at a time.
+
+        Returns:
+            cart session
+        """
+
+        return CartSession(store=self)
+
+    def get_entity_by_sku(self, entity_type: str, sku: int, store_data: Any) -> Any:
+        """
+        Fetch the entity object of a sku.
+
+        Args:
+            entity_type: entity type
+            sku: entity sku
+            store_data: store data of the catalog version the sku is resolved against
+
+        Returns:
+            entity object if found, else None
+        """
+
+        sku_table = self.sku_tables[entity_type]
+
+        if not 0 <= sku < len(sku_table):
+            return None
+
+        return store_data[entity_type].get(sku_table.get_name(sku))
+
+    def _validate_curr_customer_data(self, entity_type: str, entity_parent_name: str, store_data: Any) -> bool:
         """
         Checks the validations for the current customer data.
 
         Args:
             entity_type: entity type of the data
             entity_parent_name: entity's parent name
+            store_data: staged store data
 
         Returns:
             True is valid, else False
@@ -114,20 +373,23 @@ class StoreManager:
 
         # check if parent entity name has been added
         if not self._validate_entity_parent(entity_parent_name=entity_parent_name,
-                                            entity_parent_type=self.parent_type_map[entity_type]):
+                                            entity_parent_type=self.parent_type_map[entity_type],
+                                            store_data=store_data):
             print(f"Parent entity {entity_parent_name} not found in {self.parent_type_map[entity_type]}. "
                   f"Ignoring the current input line.")
             return False
 
         return True
 
-    def _store_entity_data(self, entity_type: str, args: Any) -> Any:
+    def _store_entity_data(self, entity_type: str, args: Any, store_data: Any, lazy: bool = False) -> Any:
         """
         Check for entity specific validations and store the newly created entiyy object.
 
         Args:
             entity_type: Entity type
             args: arguments to be stored for the current entity
+            store_data: staged store data
+            lazy: if True, items are only indexed, to be created on first use
 
         Returns:
             None
@@ -140,19 +402,29 @@ class StoreManager:
         if self.parent_type_map[entity_type]:
             parent_entity_name = args[0]
             # store the parent object for current entity name instead of the parent name
-            args[0] = self.store_data[self.parent_type_map[entity_type]][parent_entity_name]
+            args[0] = store_data[self.parent_type_map[entity_type]][parent_entity_name]
+
+        # index the item's args instead of creating the item object
+        if lazy and entity_type == ITEM:
+            items = CatalogSnapshot.writable(store_data=store_data, entity_type=ITEM)
+
+            if isinstance(items, LazyItemMapping):
+                items.put_record(name=args[1], args=tuple(args))
+                return None
 
         # create the entity object and store it in its corresponding entity type
         entity_obj = self.entities[entity_type](*args)
-        self._store_entity_mapping(entity_type=entity_type, entity_obj=entity_obj)
+        self._store_entity_mapping(entity_type=entity_type, entity_obj=entity_obj, store_data=store_data)
 
-    def _validate_entity_parent(self, entity_parent_name: str, entity_parent_type: str) -> bool:
+    @staticmethod
+    def _validate_entity_parent(entity_parent_name: str, entity_parent_type: str, store_data: Any) -> bool:
         """
         Checks if parent entity name is present in its corresponding entity type.
 
         Args:
             entity_parent_name: entity name to be checked
             entity_parent_type: entity type where we need to check the name
+            store_data: staged store data
 
         Returns:
             True, if found, else False
@@ -163,41 +435,118 @@ class StoreManager:
             return True
 
         # check if parent is found
-        return entity_parent_name in self.store_data[entity_parent_type]
+        return entity_parent_name in store_data[entity_parent_type]
 
-    def _store_entity_mapping(self, entity_type: str, entity_obj: Entity) -> None:
+    def _store_entity_mapping(self, entity_type: str, entity_obj: Entity, store_data: Any) -> None:
         """
         Store the entity mapping in its corresponding entity type.
 
         Args:
             entity_type: entity type where we need to add the mapping
             entity_obj: entity object which is to be added
+            store_data: staged store data
 
         Returns:
             None
         """
 
-        self.store_data[entity_type][entity_obj.name] = entity_obj
+        if entity_type in self.redefined_parents and entity_obj.name in store_data[entity_type]:
+            self.redefined_parents[entity_type].add(entity_obj.name)
+
+        assign_sku(sku_table=self.sku_tables[entity_type], entity_obj=entity_obj)
+        CatalogSnapshot.writable(store_data=store_data, entity_type=entity_type)[entity_obj.name] = entity_obj
+
+    def _rebuild_descendants(self, store_data: Any) -> None:
+        """
+        Rebuild the sub categories and items which still point to a parent redefined by the reload, so that their
+        discounts and the items' pricing kernels use the new parent. The entities are rebuilt instead of updated,
+        since the older catalog versions still share them. Items whose discount can not be combined with the new
+        parent's discount are removed.
+
+        Args:
+            store_data: staged store data
 
-    def process_customer_input(self, customer_data: str) -> list:
+        Returns:
+            None
+        """
+
+        # custom store data backends (E.g: the SQLite catalog) evict the cached children of a redefined parent, and
+        # rebuild them from their rows with the new parent on their next lookup. Only the items which can not be
+        # priced under the new parent need to be removed
+        if not isinstance(store_data, dict):
+            for name in store_data.iter_descendant_items(categories=self.redefined_parents[CATEGORY],
+                                                         sub_categories=self.redefined_parents[SUB_CATEGORY]):
+                try:
+                    # the item is materialized with its pricing kernel under the new parent
+                    store_data[ITEM][name]
+
+                except Exception as e:
+                    print(f"Item {name} can not be priced under its redefined parents. Removing the item. Exception: "
+                          f"{e}\nTraceback: {format_exc()}")
+                    del store_data[ITEM][name]
+
+            return
+
+        categories, sub_categories = store_data[CATEGORY], store_data[SUB_CATEGORY]
+
+        for name, sub_category in list(sub_categories.items()):
+            category = categories[sub_category.category.name]
+
+            if sub_category.category is not category:
+                self._store_entity_mapping(entity_type=SUB_CATEGORY, store_data=store_data,
+                                           entity_obj=SubCategory(category, name, sub_category.discount_str))
+
+        # the sub categories have been copied on the first rebuilt one
+        sub_categories = store_data[SUB_CATEGORY]
+        items = CatalogSnapshot.writable(store_data=store_data, entity_type=ITEM)
+        built_items = items
+
+        # lazily processed items are only relinked, they are built with the new parent on first use
+        if isinstance(items, LazyItemMapping):
+            for name, args in list(items.records.items()):
+                if args[0] is not sub_categories[args[0].name]:
+                    items.put_record(name=name, args=(sub_categories[args[0].name],) + args[1:])
+
+            built_items = items.items
+
+        for name, item_obj in list(built_items.items()):
+            sub_category = sub_categories[item_obj.sub_category.name]
+
+            if item_obj.sub_category is sub_category:
+                continue
+
+            try:
+                self._store_entity_mapping(entity_type=ITEM, store_data=store_data,
+                                           entity_obj=Item(sub_category, name, item_obj.price_str,
+                                                           item_obj.discount_str))
+
+            except Exception as e:
+                print(f"Item {name} can not be priced under the redefined {SUB_CATEGORY} {sub_category.name}. "
+                      f"Removing the item. Exception: {e}\nTraceback: {format_exc()}")
+                del items[name]
+
+    def process_customer_input(self, customer_data: Any) -> list:
         """
         Process and validate the input data for items provided by the customer.
 
         Args:
-            customer_data: customer data to be processed
+            customer_data: customer data to be processed, or an iterator over its comma separated items
 
         Returns:
             list of items for which bill is to be generated
         """
 
+        # every item of the basket is resolved against the same catalog version
+        catalog = self.catalog
+
         try:
-            # split the items by a comma
-            all_items_data = customer_data.split(',')
-            # strip extra spaces and convert the data to lower case
-            all_items_data = [(val.strip()).lower() for val in all_items_data]
+            # split the items by a comma, strip extra spaces and convert the data to lower case one item at a time
+            items_data = iter_split(data_str=customer_data, delimiter=',') if isinstance(customer_data, str) \
+                else customer_data
+            all_items_data = ((val.strip()).lower() for val in items_data)
 
             # process the data for all the input items and stores the ones which are valid
-            processed_data = self._process_item_data(all_items_data=all_items_data)
+            processed_data = self._process_item_data(all_items_data=all_items_data, store_data=catalog.store_data)
 
         except Exception as e:
             print(f"Failed to generate bill as customer input cannot be processed.Exception: {e}\nTraceback: "
@@ -205,14 +554,15 @@ class StoreManager:
             raise CustomerInputProcessingError
 
         # list of valid items for which bill is to be generated
-        return processed_data
+        return ProcessedBasket(lines=processed_data, catalog=catalog)
 
-    def _process_item_data(self, all_items_data: list) -> list:
+    def _process_item_data(self, all_items_data: Any, store_data: Any = None) -> list:
         """
         Process the data for all the input items and store the ones which are valid
 
         Args:
-            all_items_data: list of all the input items
+            all_items_data: list or iterator of all the input items
+            store_data: store data the items are looked up in, defaults to the current catalog's store data
 
         Returns:
             list of valid items for which bill is to be generated
@@ -221,59 +571,76 @@ class StoreManager:
         # list to store the valid data for which bill needs to be generated
         processed_data = []
 
+        item_data_map = (store_data if store_data is not None else self.store_data)[ITEM]
+
         for item_data in all_items_data:
-            # arguments must contain item name and quantity
-            item_data = item_data.split(' ')
-            if len(item_data) < 2:
-                print('Invalid number of item arguments')
-                continue
+            processed_item = self._process_single_item(item_data=item_data, item_data_map=item_data_map)
 
-            # if len of arguments is greater than 2, take the last argument as quantity and rest as item name
-            item_name = item_data[0]
-            item_qnty_data = item_data[-1]
+            if processed_item:
+                processed_data.append(processed_item)
 
-            if len(item_data) > 2:
-                item_name = ' '.join(item_data[:-1])
+        # return the processed data
+        return processed_data
 
-            # try to fetch the item's object from its corresponding entity type mapping
-            item_obj = self.store_data[ITEM].get(item_name)
+    def _process_single_item(self, item_data: str, item_data_map: Any) -> Any:
+        """
+        Process the data for a single input item.
 
-            # ignore the input if item not found
-            if not item_obj:
-                print(f'Sorry, the item {item_name} was not found')
-                continue
+        Args:
+            item_data: input item, stripped and in lower case
+            item_data_map: mapping of item names to item objects
 
-            # check if quantity contains a digit
-            item_qnty_digit = float(
-                    extract_required_data(data_str=item_qnty_data, req_type=r'[+-]?([0-9]+([.][0-9]*)?|[.][0-9]+)')[0])
+        Returns:
+            item data for which bill is to be generated if valid, else None
+        """
 
-            # if no digit found, ignore the current item
-            if not item_qnty_digit:
-                print(f'Please specify the quantity in number for the item {item_name}')
-                continue
+        # arguments must contain item name and quantity
+        item_data = item_data.split(' ')
+        if len(item_data) < 2:
+            print('Invalid number of item arguments')
+            return None
 
-            # find the unit
-            item_qnty_unit = self._find_item_unit(item_qnty_data=item_qnty_data, item_name=item_name, item_obj=item_obj)
+        # if len of arguments is greater than 2, take the last argument as quantity and rest as item name
+        item_name = item_data[0]
+        item_qnty_data = item_data[-1]
 
-            if not item_qnty_unit:
-                continue
+        if len(item_data) > 2:
+            item_name = ' '.join(item_data[:-1])
 
-            # if unit not a standard one, convert it and modify the item_quantity accordingly
-            if item_qnty_unit in units_mapping:
-                item_qnty_digit *= units_mapping[item_qnty_unit]['std_equivalent_val']
-                item_qnty_unit = units_mapping[item_qnty_unit]['std_equivalent_unit']
+        # try to fetch the item's object from its corresponding entity type mapping
+        item_obj = item_data_map.get(item_name)
 
-            # store the item data for which bill needs to be generated
-            processed_data.append(
-                    {
-                        'item': item_obj,
-                        'quantity': item_qnty_digit,
-                        'unit': item_qnty_unit
-                    }
-            )
+        # ignore the input if item not found
+        if not item_obj:
+            print(f'Sorry, the item {item_name} was not found')
+            return None
 
-        # return the processed data
-        return processed_data
+        # check if quantity contains a digit
+        item_qnty_digit = float(
+                extract_required_data(data_str=item_qnty_data, req_type=r'[+-]?([0-9]+([.][0-9]*)?|[.][0-9]+)')[0])
+
+        # if no digit found, ignore the current item
+        if not item_qnty_digit:
+            print(f'Please specify the quantity in number for the item {item_name}')
+            return None
+
+        # find the unit
+        item_qnty_unit = self._find_item_unit(item_qnty_data=item_qnty_data, item_name=item_name, item_obj=item_obj)
+
+        if not item_qnty_unit:
+            return None
+
+        # if unit not a standard one, convert it and modify the item_quantity accordingly
+        if item_qnty_unit in units_mapping:
+            item_qnty_digit *= units_mapping[item_qnty_unit]['std_equivalent_val']
+            item_qnty_unit = units_mapping[item_qnty_unit]['std_equivalent_unit']
+
+        # return the item data for which bill needs to be generated
+        return {
+            'item': item_obj,
+            'quantity': item_qnty_digit,
+            'unit': item_qnty_unit
+        }
 
     def _find_item_unit(self, item_qnty_data: str, item_name: str, item_obj: Item) -> Any:
         """
@@ -310,55 +677,308 @@ class StoreManager:
 
         return item_qnty_unit
 
-    @staticmethod
-    def generate_bill(processed_data: dict) -> None:
+    def calculate_bill(self, processed_data: list, customer_id: Any = None, coupon_code: str = None,
+                       reserve_stock: bool = False) -> dict:
         """
-        Calculate the total cost of items after applying discount and generate the bill.
+        Calculate the total cost of items after applying discounts, promotions and coupon. By default the bill is only
+        a quote: the lines are filled from the stock left, but neither the stock nor the coupon is consumed.
 
         Args:
             processed_data: list of valid data for which bill needs to be generated
+            customer_id: id of the customer the bill is generated for, if known
+            coupon_code: coupon code presented by the customer, if any
+            reserve_stock: if True, the filled quantities are reserved and kept in the bill's reserved_stock
 
         Returns:
-            None
+            bill containing the priced lines, applied promotions, applied coupon and the totals
         """
 
+        # catalog version the lines were resolved against
+        catalog = getattr(processed_data, 'catalog', None) or self.catalog
+
+        # stores the priced lines
+        bill_lines = []
         # stores total original cost without discount
         total_original_cost = 0.0
         # stores total original cost with discount
         total_new_cost = 0.0
 
-        print("\n\n=================================================")
-        print("HERE's YOUR BILL, HAVE A NICE DAY!")
-        print("=================================================")
+        # fill the lines from the stock left, the lines are partially filled if the stock is not enough
+        reserved_stock = []
+        if self.inventory.is_tracking():
+            processed_data, reserved_stock = self._fill_stock(processed_data=processed_data,
+                                                              reserve_stock=reserve_stock)
 
-        # process all the items
-        for data in processed_data:
-            try:
-                # calculate the total cost for current item and add it to the overall cost
-                original_cost = round(data['item'].get_price(quantity=data['quantity']), 2)
-                total_original_cost += original_cost
+        try:
+            # process all the items
+            for data in processed_data:
+                try:
+                    # price the current line using the item's precompiled pricing kernel
+                    original_cost, discount, new_cost = data['item'].pricing_kernel(data['quantity'])
+
+                    # update the total original and new cost
+                    total_original_cost += original_cost
+                    total_new_cost += new_cost
+
+                    bill_lines.append(
+                            {
+                                'item': data['item'],
+                                'quantity': data['quantity'],
+                                'unit': data['unit'],
+                                'original_cost': original_cost,
+                                'new_cost': new_cost
+                            }
+                    )
+
+                except Exception as e:
+                    print(f"Data {data} is invalid. Ignoring this item. Exception: {e}\nTraceback: "
+                          f"{format_exc()}")
+                    raise BillGenerationError
+
+            bill = self._finish_bill(bill_lines=bill_lines, total_original_cost=total_original_cost,
+                                     total_new_cost=total_new_cost, catalog_version=catalog.version,
+                                     customer_id=customer_id, coupon_code=coupon_code)
+
+        except BaseException:
+            # give back the stock reserved for the bill which could not be completed
+            self._release_stock(reserved_stock=reserved_stock)
+            raise
+
+        bill['reserved_stock'] = reserved_stock
+
+        return bill
+
+    def _finish_bill(self, bill_lines: list, total_original_cost: float, total_new_cost: float, catalog_version: int,
+                     customer_id: Any = None, coupon_code: str = None) -> dict:
+        """
+        Apply the basket level promotions and the coupon on top of the priced lines and build the bill.
+
+        Args:
+            bill_lines: priced bill lines
+            total_original_cost: total original cost without discount
+            total_new_cost: total cost after the item level discounts
+            catalog_version: version of the catalog the lines were priced against
+            customer_id: id of the customer the bill is generated for, if known
+            coupon_code: coupon code presented by the customer, if any
+
+        Returns:
+            bill containing the priced lines, applied promotions, applied coupon and the totals
+        """
+
+        # apply the basket level promotions on top of the item level discounts
+        applied_promotions = []
+        if self.promotion_engine.has_promotions():
+            applied_promotions = self.promotion_engine.apply_promotions(bill_lines=bill_lines)
+
+        for applied_promotion in applied_promotions:
+            total_new_cost -= applied_promotion['discount']
+
+        # the coupon is applied last, on the total left to be paid. It is only redeemed once the bill is generated
+        applied_coupon = None
+        if coupon_code:
+            applied_coupon = self._get_coupon_engine().validate(code=coupon_code, total_cost=total_new_cost)
+
+        if applied_coupon:
+            total_new_cost -= applied_coupon['discount']
+
+        return {
+            'bill_id': uuid.uuid4().hex,
+            'catalog_version': catalog_version,
+            'customer_id': customer_id,
+            'lines': bill_lines,
+            'promotions': applied_promotions,
+            'coupon': applied_coupon,
+            'total_original_cost': total_original_cost,
+            'total_new_cost': round(total_new_cost, 2) if applied_promotions or applied_coupon else total_new_cost
+        }
+
+    def _fill_stock(self, processed_data: list, reserve_stock: bool) -> tuple:
+        """
+        Fill all the lines from the stock left and drop or reduce the lines which could not be filled.
+
+        Args:
+            processed_data: list of valid data for which bill needs to be generated
+            reserve_stock: if True, the filled quantities are reserved, else the stock is left unchanged
+
+        Returns:
+            lines which could be filled, list of (item name, quantity) reserved
+        """
+
+        requests = [(data['item'].name, data['quantity']) for data in processed_data]
+
+        if reserve_stock:
+            filled_quantities = self.inventory.reserve(requests=requests)
+            reserved_stock = [(item_name, filled_qnty) for (item_name, _), filled_qnty in zip(requests,
+                                                                                                filled_quantities)
+                              if filled_qnty > 0]
+        else:
+            filled_quantities = self.inventory.available(requests=requests)
+            reserved_stock = []
+
+        return self._drop_unfilled_lines(processed_data=processed_data, filled_quantities=filled_quantities), \
+            reserved_stock
 
-                # get total discount
-                if isinstance(data['item'].discount_strategy, PercentageWiseDiscountStrategy):
-                    discount = data['item'].get_discount(original_cost, data['item'].get_max_discount())
+    @staticmethod
+    def _drop_unfilled_lines(processed_data: list, filled_quantities: list) -> list:
+        """
+        Drop the lines which could not be filled and reduce the ones partially filled.
+
+        Args:
+            processed_data: list of valid data for which bill needs to be generated
+            filled_quantities: filled quantity for each line
+
+        Returns:
+            lines which could be filled
+        """
+
+        filled_data = []
+
+        for data, filled_qnty in zip(processed_data, filled_quantities):
+            # ignore the line if nothing is left in stock
+            if filled_qnty <= 0:
+                print(f"Sorry, the item {data['item'].name} is out of stock")
+                continue
+
+            # bill only the quantity left in stock
+            if filled_qnty < data['quantity']:
+                print(f"Only {filled_qnty}{data['unit']} of the item {data['item'].name} is left in stock")
+                data = dict(data, quantity=filled_qnty)
+
+            filled_data.append(data)
+
+        return filled_data
+
+    def _release_stock(self, reserved_stock: list) -> None:
+        """
+        Give back the stock reserved for a bill which could not be completed.
+
+        Args:
+            reserved_stock: list of (item name, quantity) reserved
+
+        Returns:
+            None
+        """
+
+        if reserved_stock:
+            self.inventory.release(requests=reserved_stock)
+
+    def generate_bill(self, processed_data: list, customer_id: Any = None, coupon_code: str = None) -> dict:
+        """
+        Calculate the total cost of items after applying discount and generate the bill. The stock of the bill is
+        reserved and its coupon redeemed here, both are released again if the bill can not be rendered or recorded.
+
+        Args:
+            processed_data: list of valid data for which bill needs to be generated
+            customer_id: id of the customer the bill is generated for, if known
+            coupon_code: coupon code presented by the customer, if any
+
+        Returns:
+            the generated bill
+        """
+
+        bill = self.calculate_bill(processed_data=processed_data, customer_id=customer_id, coupon_code=coupon_code,
+                                   reserve_stock=True)
+        redeemed_coupon = None
+
+        try:
+            if bill['coupon']:
+                # the code may have been redeemed by another bill since it was validated
+                if self.coupon_engine.redeem(applied_coupon=bill['coupon']):
+                    redeemed_coupon = bill['coupon']
                 else:
-                    discount = data['item'].get_discount(data['quantity'], data['item'].price_per_unit)
+                    bill['total_new_cost'] = round(bill['total_new_cost'] + bill['coupon']['discount'], 2)
+                    bill['coupon'] = None
 
-                # add the new cost for current item
-                new_cost = round(original_cost - discount, 2)
+            self.bill_renderer(bill=bill)
 
-                # update the total new cost
-                total_new_cost += new_cost
+            # feed the generated bill to the listeners
+            for listener in self.bill_listeners:
+                listener(bill)
 
-                print(f"{data['item'].name} -> {data['quantity']}{data['unit']} -> Rs {new_cost}")
+        except BaseException:
+            if redeemed_coupon:
+                self.coupon_engine.release(applied_coupon=redeemed_coupon)
 
-            except Exception as e:
-                print(f"Data {data} is invalid. Ignoring this item. Exception: {e}\nTraceback: "
-                      f"{format_exc()}")
-                raise BillGenerationError
+            self._release_stock(reserved_stock=bill['reserved_stock'])
+            raise
+
+        return bill
+
+    @staticmethod
+    def print_bill(bill: dict) -> None:
+        """
+        Print the bill.
+
+        Args:
+            bill: bill to be printed
+
+        Returns:
+            None
+        """
+
+        print("\n\n=================================================")
+        print("HERE's YOUR BILL, HAVE A NICE DAY!")
+        print("=================================================")
+
+        for line in bill['lines']:
+            print(f"{line['item'].name} -> {line['quantity']}{line['unit']} -> Rs {line['new_cost']}")
+
+        for applied_promotion in bill['promotions']:
+            print(f"Promotion: {applied_promotion['promotion'].description} -> -Rs {applied_promotion['discount']}")
+
+        if bill.get('coupon'):
+            print(f"Coupon: {bill['coupon']['code']} ({bill['coupon']['campaign'].name}) -> -Rs "
+                  f"{bill['coupon']['discount']}")
+
+        total_original_cost = bill['total_original_cost']
+        total_new_cost = bill['total_new_cost']
 
         # print the billing details
         print("=================================================")
         print(f"Total Amount: Rs {total_new_cost}")
         print(f"You saved: {total_original_cost} - {total_new_cost} = Rs {total_original_cost-total_new_cost}")
         print("=================================================")
+
+    def stream_bills(self, file: str, chunk_size: int = 1 << 16, coupon_code: str = None,
+                     error_renderer: Callable = None) -> Iterator:
+        """
+        Generate a bill for every line of the customer input file. The file is read in fixed size chunks and every
+        basket is processed item by item, priced and emitted before the next one is read, so the memory used doesn't
+        depend on the size of the file or the length of its lines. A basket without any valid item gets an error
+        instead of a bill.
+
+        Args:
+            file: customer input file, one basket per line
+            chunk_size: number of characters read at a time
+            coupon_code: coupon code presented with the first bill, if any
+            error_renderer: callable rendering the failure of a basket, called with the basket's line number as the
+                basket, as the basket is not kept once read
+
+        Returns:
+            iterator over the generated bills
+        """
+
+        for line_no, basket in iter_file_baskets(file=file, chunk_size=chunk_size):
+            bill = None
+
+            try:
+                processed_data = self.process_customer_input(customer_data=basket)
+
+                # the invalid items have already been reported
+                if processed_data:
+                    bill = self.generate_bill(processed_data=processed_data, coupon_code=coupon_code)
+
+            except (CustomerInputProcessingError, BillGenerationError):
+                # the error has already been reported, move on to the next basket
+                pass
+
+            if bill is None:
+                if error_renderer:
+                    error_renderer(basket=f'line {line_no}')
+
+                continue
+
+            # a coupon code can only be redeemed once, it is presented with the first bill
+            coupon_code = None
+
+            yield bill
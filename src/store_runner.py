@@ -3,40 +3,92 @@
 #   Purpose: This file is used to run all the trivial function required to process the input data and generate a
 # customer bill
 
+import os
+
 from src.utilities import read_file
+from src.journal.bill_journal import BillJournal
 from src.store_manager.store_manager_runner import StoreManager
 from src.exceptions.exceptions import EmptyCustomerInput, EmptyManagerInput
 
 
-def run() -> None:
+def run(journal_file: str = None, stream: bool = False, coupon_code: str = None, shard_count: int = 0) -> None:
     """
     This method is used to run all the functions required to process the manager and customer input and then generate
     a customer bll.
 
+    Args:
+        journal_file: if given, the generated bills are appended to this bill journal
+        stream: if True, every line of the customer input is a separate basket and the bills are generated while the
+            file is being read
+        coupon_code: coupon code presented with the customer input, not used when streaming
+        shard_count: if given, the catalog is partitioned by category across this many worker processes
+
     Returns:
         None
     """
 
-    store = StoreManager()
-
     manager_data = read_file(file='manager_input.txt')
 
     if not manager_data:
         raise EmptyManagerInput
 
-    # process and store the initialization data for all the provided entities
-    store.process_manager_data(data=manager_data)
+    if shard_count:
+        # the sharded store pulls in multiprocessing, load it only when it is used
+        from src.store_manager.sharded_store import ShardedStoreManager
+
+        store = ShardedStoreManager(shard_count=shard_count)
+
+    else:
+        store = StoreManager()
+
+    journal = None
+
+    try:
+        # process and store the initialization data for all the provided entities
+        store.process_manager_data(data=manager_data)
+
+        # promotions are optional, process them only if the promotion input file is present
+        if os.path.exists('promotion_input.txt'):
+            store.process_promotion_data(data=read_file(file='promotion_input.txt'))
+
+        # coupon campaigns are optional, process them only if the coupon input file is present
+        if os.path.exists('coupon_input.txt'):
+            store.process_coupon_data(data=read_file(file='coupon_input.txt'))
+
+        # stock levels are optional, items without a stock level are not tracked
+        if os.path.exists('stock_input.txt'):
+            store.process_stock_data(data=read_file(file='stock_input.txt'))
+
+        journal = BillJournal(path=journal_file) if journal_file else None
+        if journal:
+            store.add_bill_listener(journal.append)
+
+        if stream:
+            # bills are printed as soon as their basket has been read
+            for _ in store.stream_bills(file='customer_input.txt'):
+                pass
+
+            return
+
+        customer_data = read_file(file='customer_input.txt')
+
+        if not customer_data:
+            raise EmptyCustomerInput
 
-    customer_data = read_file(file='customer_input.txt')
+        # validate and store the items which are found in the store so that bill is generated only for them
+        processed_data = store.process_customer_input(customer_data=customer_data)
 
-    if not customer_data:
-        raise EmptyCustomerInput
+        # calculate and generate the final bill
+        store.generate_bill(processed_data=processed_data, coupon_code=coupon_code)
 
-    # validate and store the items which are found in the store so that bill is generated only for them
-    processed_data = store.process_customer_input(customer_data=customer_data)
+    finally:
+        # the journal is closed only once all the bills have been fsynced
+        if journal:
+            journal.close()
 
-    # calculate and generate the final bill
-    store.generate_bill(processed_data=processed_data)
+        # stop the shard workers
+        if shard_count:
+            store.close()
 
 
 if __name__ == '__main__':
@@ -4,7 +4,7 @@
 
 import re
 
-from typing import Any
+from typing import Any, Iterator
 from traceback import format_exc
 
 from src.exceptions.exceptions import ReadFileError
@@ -35,6 +35,187 @@ def read_file(file: str) -> str:
     return data
 
 
+def iter_file_lines(file: str, chunk_size: int = 1 << 16) -> Iterator:
+    """
+    Reads lines from file in fixed size chunks, so that only the current chunk and line are kept in memory.
+
+    Args:
+        file: file from which we need to read the lines
+        chunk_size: number of characters read at a time
+
+    Returns:
+        iterator over the lines of the file, without the line breaks
+    """
+
+    try:
+        # open the file
+        f = open(file)
+
+    except Exception as e:
+        print(f"Failed to read the input file {file}.Exception: {e}\nTraceback: {format_exc()}")
+        raise ReadFileError
+
+    with f:
+        # pieces of the current line read so far, joined once the line is complete so that a long line spanning many
+        # chunks is copied only once
+        pieces = []
+
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+
+            start = 0
+
+            while True:
+                end = chunk.find('\n', start)
+
+                if end == -1:
+                    if start < len(chunk):
+                        pieces.append(chunk[start:])
+                    break
+
+                pieces.append(chunk[start:end])
+                yield ''.join(pieces)
+
+                pieces = []
+                start = end + 1
+
+        if pieces:
+            yield ''.join(pieces)
+
+
+def iter_file_fields(file: str, delimiter: str = ',', chunk_size: int = 1 << 16) -> Iterator:
+    """
+    Reads the delimiter separated fields of every line from file in fixed size chunks, so that only the current chunk
+    and field are kept in memory, however long the lines are.
+
+    Args:
+        file: file from which we need to read the fields
+        delimiter: single character separating the fields of a line
+        chunk_size: number of characters read at a time
+
+    Returns:
+        iterator over (field, True if the field is the last one of its line)
+    """
+
+    try:
+        # open the file
+        f = open(file)
+
+    except Exception as e:
+        print(f"Failed to read the input file {file}.Exception: {e}\nTraceback: {format_exc()}")
+        raise ReadFileError
+
+    separators = re.compile(f'[{re.escape(delimiter)}\n]')
+
+    with f:
+        # pieces of the current field read so far, and whether the current line has started
+        pieces = []
+        line_started = False
+
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+
+            start = 0
+
+            for separator in separators.finditer(chunk):
+                pieces.append(chunk[start:separator.start()])
+                yield ''.join(pieces), separator.group() == '\n'
+
+                pieces = []
+                line_started = separator.group() != '\n'
+                start = separator.end()
+
+            if start < len(chunk):
+                pieces.append(chunk[start:])
+                line_started = True
+
+        # the last line of the file has no line break
+        if line_started:
+            yield ''.join(pieces), True
+
+
+def iter_file_baskets(file: str, delimiter: str = ',', chunk_size: int = 1 << 16) -> Iterator:
+    """
+    Reads the baskets from file, one per line, each basket being an iterator over its delimiter separated items. A
+    basket is read while it is being iterated, so it must be used before the next one is requested. Empty lines are
+    ignored, but counted in the line numbers.
+
+    Args:
+        file: file from which we need to read the baskets
+        delimiter: single character separating the items of a basket
+        chunk_size: number of characters read at a time
+
+    Returns:
+        iterator over (line number, basket)
+    """
+
+    fields = iter_file_fields(file=file, delimiter=delimiter, chunk_size=chunk_size)
+    line_no = 0
+
+    for field, is_last in fields:
+        line_no += 1
+
+        # ignore empty lines
+        if is_last and not field.strip():
+            continue
+
+        basket = _iter_basket_items(first_item=field, is_last=is_last, fields=fields)
+        yield line_no, basket
+
+        # skip the items of the basket which were not used
+        for _ in basket:
+            pass
+
+
+def _iter_basket_items(first_item: str, is_last: bool, fields: Iterator) -> Iterator:
+    """
+    Iterate over the items of a basket, up to the end of its line.
+
+    Args:
+        first_item: first item of the basket, already read
+        is_last: True if the first item is the only one of the basket
+        fields: iterator over the fields of the file
+
+    Returns:
+        iterator over the items of the basket
+    """
+
+    yield first_item
+
+    while not is_last:
+        item, is_last = next(fields)
+        yield item
+
+
+def iter_split(data_str: str, delimiter: str) -> Iterator:
+    """
+    Splits the data string lazily, without building the list of all the parts.
+
+    Args:
+        data_str: string to be split
+        delimiter: delimiter to split on
+
+    Returns:
+        iterator over the parts of the string
+    """
+
+    start = 0
+
+    while True:
+        end = data_str.find(delimiter, start)
+
+        if end == -1:
+            yield data_str[start:]
+            return
+
+        yield data_str[start:end]
+        start = end + len(delimiter)
+
+
 def extract_required_data(data_str: str, req_type: str) -> Any:
     """
     Extract the required data from a data string. Return None if not found.
@@ -0,0 +1,104 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the basket encoding
+
+import io
+import multiprocessing
+
+from contextlib import redirect_stdout
+
+import pytest
+
+from src.exceptions.exceptions import CustomerInputProcessingError
+from src.store_manager.basket_codec import decode_basket, encode_basket
+from src.store_manager.shared_catalog import SharedCatalog, SharedStoreManager
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 0%
+Sub_Category, Dairy, Milk, 0%
+Item, Milk, Amul Milk, 100/lt, 0%
+Item, Milk, Amul Cheese, 200/kg, 0%"""
+
+
+def build_store() -> StoreManager:
+    store = StoreManager()
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA)
+
+    return store
+
+
+def bill_for(store: StoreManager, processed_data: list) -> dict:
+    with redirect_stdout(io.StringIO()):
+        return store.calculate_bill(processed_data=processed_data)
+
+
+def test_round_trip_bills_the_same():
+    store = build_store()
+
+    with redirect_stdout(io.StringIO()):
+        processed_data = store.process_customer_input(customer_data='Amul Milk 500ml, Amul Cheese 2kg')
+
+    decoded = decode_basket(data=encode_basket(processed_data=processed_data), store=store)
+
+    assert [(data['item'].name, data['quantity']) for data in decoded] == [('amul milk', 0.5), ('amul cheese', 2.0)]
+    assert bill_for(store=store, processed_data=decoded)['total_new_cost'] == 450.0
+
+
+def test_basket_of_an_older_version_is_resolved_against_it():
+    store = build_store()
+
+    with redirect_stdout(io.StringIO()):
+        processed_data = store.process_customer_input(customer_data='Amul Milk 2lt')
+        data = encode_basket(processed_data=processed_data)
+
+        # the item is now sold per ml, the encoded quantity is still in lt
+        store.process_manager_data(data='Item, Milk, Amul Milk, 1/ml, 0%')
+
+    assert bill_for(store=store, processed_data=decode_basket(data=data, store=store))['total_new_cost'] == 200.0
+
+
+def test_basket_of_a_released_version_is_rejected():
+    store = build_store()
+
+    with redirect_stdout(io.StringIO()):
+        data = encode_basket(processed_data=store.process_customer_input(customer_data='Amul Milk 2lt'))
+        store.process_manager_data(data='Item, Milk, Amul Milk, 1/ml, 0%')
+
+        with pytest.raises(CustomerInputProcessingError):
+            decode_basket(data=data, store=store)
+
+
+def bill_in_worker(shm_name: str, data: bytes, results: multiprocessing.Queue) -> None:
+    store = SharedStoreManager(shm_name=shm_name)
+
+    try:
+        results.put(bill_for(store=store, processed_data=decode_basket(data=data, store=store))['total_new_cost'])
+
+    finally:
+        store.shared_catalog.close()
+
+
+def test_round_trip_in_a_worker_attached_to_the_shared_catalog():
+    store = build_store()
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data='Category, Dairy, 10%')
+        processed_data = store.process_customer_input(customer_data='Amul Milk 500ml, Amul Cheese 2kg')
+
+    catalog = SharedCatalog.create(store=store)
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+
+    try:
+        worker = context.Process(target=bill_in_worker,
+                                 args=(catalog.name, encode_basket(processed_data=processed_data), results))
+        worker.start()
+        worker_total = results.get(timeout=60)
+        worker.join()
+
+    finally:
+        catalog.close()
+
+    assert worker_total == bill_for(store=store, processed_data=processed_data)['total_new_cost'] == 405.0
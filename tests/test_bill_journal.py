@@ -0,0 +1,50 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the bill journal
+
+import io
+import time
+
+from contextlib import redirect_stdout
+
+from src.journal.bill_journal import BillJournal, BillJournalReader
+
+
+def test_torn_tail_is_truncated_on_open(tmp_path):
+    path = str(tmp_path / 'bills.journal')
+
+    with BillJournal(path=path) as journal:
+        journal.append_record(record={'bill_id': 'a'}, wait=True)
+
+    # a crash in the middle of writing a record
+    with open(path, 'ab') as f:
+        f.write(b'\x13\x00\x00\x00garbage')
+
+    output = io.StringIO()
+    with redirect_stdout(output):
+        journal = BillJournal(path=path)
+
+    journal.append_record(record={'bill_id': 'b'}, wait=True)
+    journal.close()
+
+    reader = BillJournalReader(path=path)
+
+    assert 'Truncating' in output.getvalue()
+    assert list(reader.build_index()) == ['a', 'b']
+    assert [record['bill_id'] for _, record in reader] == ['a', 'b']
+
+
+def test_record_is_written_within_max_latency(tmp_path):
+    journal = BillJournal(path=str(tmp_path / 'bills.journal'), max_latency=0.01)
+
+    try:
+        journal.append_record(record={'bill_id': 'a'})
+        deadline = time.monotonic() + 2
+
+        while journal.durable_count < 1 and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+        assert journal.durable_count == 1
+
+    finally:
+        journal.close()
@@ -0,0 +1,127 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the cart session
+
+import io
+import random
+
+from contextlib import redirect_stdout
+
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 10%
+Sub_Category, Dairy, Milk, 5%
+Sub_Category, Dairy, Cheese, 0%
+Item, Milk, Amul Milk, 40/lt, 15%
+Item, Milk, Mother Dairy Milk, 30/lt, 2lt+1lt
+Item, Cheese, Amul Cheese, 400/kg;2kg=380, 5%"""
+
+ITEM_QUANTITIES = {
+    'Amul Milk': ['1lt', '500ml', '2.5lt'],
+    'Mother Dairy Milk': ['1lt', '2lt', '750ml'],
+    'Amul Cheese': ['250gm', '1kg', '2kg']
+}
+
+
+def build_store() -> StoreManager:
+    store = StoreManager()
+    store.bill_renderer = lambda bill: None
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA)
+        store.process_promotion_data(data='threshold, sub_category, Milk, 100, 5%')
+
+    return store
+
+
+def recompute(store: StoreManager, session) -> dict:
+    with redirect_stdout(io.StringIO()):
+        bill = store.calculate_bill(processed_data=session.get_basket())
+
+    return {
+        'total_original_cost': round(bill['total_original_cost'], 2),
+        'total_new_cost': round(sum(line['new_cost'] for line in bill['lines']), 2)
+    }
+
+
+def test_running_totals_match_a_full_recomputation():
+    store = build_store()
+    session = store.open_cart_session()
+    randomizer = random.Random(3)
+
+    with redirect_stdout(io.StringIO()):
+        for _ in range(200):
+            item_name = randomizer.choice(list(ITEM_QUANTITIES))
+            item_data = f'{item_name} {randomizer.choice(ITEM_QUANTITIES[item_name])}'
+            operation = randomizer.choice([session.add_item, session.add_item, session.remove_item,
+                                           session.set_quantity])
+
+            operation(item_data=randomizer.choice([item_data, item_name]) if operation == session.remove_item
+                      else item_data)
+
+            assert session.get_totals() == recompute(store=store, session=session)
+
+
+def test_checkout_matches_the_bill_of_the_whole_basket(tmp_path):
+    codes_file = tmp_path / 'codes.txt'
+    codes_file.write_text('CART1\nCART2\n')
+
+    store = build_store()
+
+    with redirect_stdout(io.StringIO()):
+        store.process_coupon_data(data=f'kiosk, {codes_file}, 10%')
+
+        session = store.open_cart_session()
+        session.add_item(item_data='Amul Milk 2lt')
+        session.add_item(item_data='Mother Dairy Milk 3lt')
+        session.add_item(item_data='Amul Milk 1lt')
+        session.set_quantity(item_data='Mother Dairy Milk 4lt')
+        session.add_item(item_data='Amul Cheese 1kg')
+        session.remove_item(item_data='Amul Cheese')
+
+        cart_bill = session.checkout(coupon_code='cart1')
+        basket_bill = store.generate_bill(
+            processed_data=store.process_customer_input(customer_data='Amul Milk 3lt, Mother Dairy Milk 4lt'),
+            coupon_code='cart2')
+
+    assert [applied['discount'] for applied in cart_bill['promotions']] == \
+        [applied['discount'] for applied in basket_bill['promotions']] != []
+    assert cart_bill['coupon']['discount'] == basket_bill['coupon']['discount']
+    assert cart_bill['total_new_cost'] == basket_bill['total_new_cost']
+
+
+def test_removing_an_item_not_in_the_cart():
+    store = build_store()
+    session = store.open_cart_session()
+    output = io.StringIO()
+
+    with redirect_stdout(output):
+        session.add_item(item_data='Amul Milk 1lt')
+        totals = session.get_totals()
+
+        assert session.remove_item(item_data='Amul Cheese 1kg') is None
+        assert session.remove_item(item_data='Amul Cheese') is None
+        assert session.remove_item(item_data='Unknown Item 1kg') is None
+
+    assert 'amul cheese is not in the cart' in output.getvalue()
+    assert session.get_totals() == totals
+    assert list(session.lines) == ['amul milk']
+
+
+def test_session_keeps_its_catalog_version_across_a_reload():
+    store = build_store()
+    session = store.open_cart_session()
+
+    with redirect_stdout(io.StringIO()):
+        session.add_item(item_data='Amul Milk 1lt')
+        store.process_manager_data(data='Item, Milk, Amul Milk, 80/lt, 15%')
+        session.add_item(item_data='Amul Milk 1lt')
+        bill = session.checkout()
+
+        new_session = store.open_cart_session()
+        new_session.add_item(item_data='Amul Milk 2lt')
+
+    assert session.get_totals()['total_original_cost'] == 80.0
+    assert bill['total_original_cost'] == 80.0
+    assert bill['catalog_version'] != new_session.catalog.version
+    assert new_session.get_totals()['total_original_cost'] == 160.0
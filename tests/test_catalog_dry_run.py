@@ -0,0 +1,129 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the catalog dry run, which must predict what a real load would do
+
+import io
+
+from contextlib import redirect_stdout
+
+import pytest
+
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM
+from src.store_manager.catalog_dry_run import CatalogDryRun
+from src.store_manager.store_manager_runner import StoreManager
+
+LIVE_DATA = """Category, Dairy, 10%
+Category, Bakery, 5%
+Sub_Category, Dairy, Milk, 5%
+Sub_Category, Dairy, Cheese, 20%
+Sub_Category, Bakery, Bread, 0%
+Item, Milk, Amul Milk, 40/lt, 15%
+Item, Milk, Toned Milk, 30/lt;10000ml=27, 2lt+1lt
+Item, Milk, Cow Milk, 45/lt, 5%
+Item, Milk, Skim Milk, 35/lt, 0%
+Item, Cheese, Amul Cheese, 400/kg, 5%
+Item, Cheese, Feta, 600/kg, 0%
+Item, Bread, Brown Bread, 30/kg, 0%
+Item, Bread, Butter, 500/kg, 1kg+1kg"""
+
+# the same prices written in other units, a changed price, an item wise sub category with a percentage item, a missing
+# parent, and parents redefined after their children: Dairy's discount goes up, Bread turns item wise
+CANDIDATE_DATA = """Category, Dairy, 10%
+Category, Bakery, 5%
+Sub_Category, Dairy, Milk, 5%
+Sub_Category, Dairy, Cheese, 20%
+Sub_Category, Bakery, Bread, 0%
+Sub_Category, Bakery, Cakes, 1kg+1kg
+Item, Milk, Amul Milk, 0.04/ml, 15%
+Item, Milk, Toned Milk, 30/lt;10lt=27, 2lt+1lt
+Item, Milk, Cow Milk, 50/lt, 5%
+Item, Milk, Skim Milk, 0.035/ml, 0%
+Item, Cheese, Amul Cheese, 400/kg, 5%
+Item, Bread, Brown Bread, 30/kg, 0%
+Item, Bread, Butter, 0.5/gm, 1kg+1kg
+Item, Cakes, Plum Cake, 300/kg, 10%
+Item, Pastry, Eclair, 20/kg, 0%
+Item, Cakes, Fruit Cake, 250/kg, 500gm+500gm
+Category, Dairy, 12%
+Sub_Category, Bakery, Bread, 2kg+1kg"""
+
+
+def load_store(data: str, lazy: bool = False) -> StoreManager:
+    store = StoreManager()
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=data, lazy=lazy)
+
+    return store
+
+
+def cost_ratio(store: StoreManager, item_name: str) -> tuple:
+    item_obj = store.store_data[ITEM][item_name]
+
+    with redirect_stdout(io.StringIO()):
+        bill = store.calculate_bill(processed_data=store.process_customer_input(
+                customer_data=f'{item_name} 3{item_obj.unit}'))
+
+    return round(bill['total_new_cost'] / bill['total_original_cost'], 6)
+
+
+def price_fields(store: StoreManager, item_name: str) -> tuple:
+    item_obj = store.store_data[ITEM][item_name]
+
+    return (round(item_obj.price_per_unit, 6), item_obj.unit, [round(value, 6) for value in item_obj.tier_thresholds],
+            [round(value, 6) for value in item_obj.tier_rates])
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_dry_run_matches_a_real_load(tmp_path, lazy):
+    candidate_file = tmp_path / 'candidate.txt'
+    candidate_file.write_text(CANDIDATE_DATA)
+
+    live = load_store(data=LIVE_DATA, lazy=lazy)
+    diff = live.dry_run_manager_data(file=str(candidate_file), worker_count=1)
+    loaded = load_store(data=CANDIDATE_DATA)
+
+    # the live catalog is left unchanged
+    assert set(live.store_data[ITEM]) == {'amul milk', 'toned milk', 'cow milk', 'skim milk', 'amul cheese',
+                                          'feta', 'brown bread', 'butter'}
+
+    # entities kept, added and removed are the ones of the real load
+    for entity_type in (CATEGORY, SUB_CATEGORY, ITEM):
+        added = {entry['name'] for entry in diff['added'] if entry['entity_type'] == entity_type}
+        removed = {entry['name'] for entry in diff['removed'] if entry['entity_type'] == entity_type}
+
+        assert (set(live.store_data[entity_type]) - removed) | added == set(loaded.store_data[entity_type])
+
+    assert diff['accepted'] == sum(len(loaded.store_data[entity_type]) for entity_type in (CATEGORY, SUB_CATEGORY,
+                                                                                           ITEM))
+
+    # the percentage item under an item wise parent, the item without a parent and the item left under a parent
+    # redefined item wise are rejected
+    lines = CANDIDATE_DATA.split('\n')
+    rejected_names = {'plum cake', 'eclair', 'brown bread'}
+
+    assert [entry['line'] for entry in diff['rejected']] == \
+           [line_no for line_no, line_data in enumerate(lines, start=1)
+            if line_data.split(',')[-3].strip().lower() in rejected_names]
+    assert not rejected_names & set(loaded.store_data[ITEM])
+
+    # price changes are normalised across units and tiers, discount changes follow the redefined parents
+    common_items = set(live.store_data[ITEM]) & set(loaded.store_data[ITEM])
+
+    assert {entry['name'] for entry in diff['price_changes']} == \
+           {name for name in common_items if price_fields(store=live, item_name=name) !=
+            price_fields(store=loaded, item_name=name)} == {'cow milk'}
+    assert {entry['name'] for entry in diff['discount_changes']} == \
+           {name for name in common_items if cost_ratio(store=live, item_name=name) !=
+            cost_ratio(store=loaded, item_name=name)} == {'cow milk', 'skim milk'}
+
+
+def test_validation_workers_give_the_same_result():
+    live = load_store(data=LIVE_DATA)
+    lines = CANDIDATE_DATA.split('\n')
+
+    # small chunks so that the lines are spread over the workers and merged back in order
+    in_process = CatalogDryRun(store=live, worker_count=1, chunk_size=3).run(lines=iter(lines))
+    workers = CatalogDryRun(store=live, worker_count=2, chunk_size=3).run(lines=iter(lines))
+
+    assert workers == in_process
@@ -0,0 +1,57 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the catalog snapshots
+
+import io
+import sqlite3
+
+from contextlib import redirect_stdout
+
+import pytest
+
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM
+from src.store_manager.sqlite_store_manager import SqliteStoreManager
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 10%
+Sub_Category, Dairy, Milk, 0%
+Item, Milk, Amul Milk, 100/lt, 0%"""
+
+
+def load(store: StoreManager, data: str) -> None:
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=data)
+
+
+def test_reload_shares_the_unchanged_entity_types():
+    store = StoreManager()
+    load(store=store, data=MANAGER_DATA)
+    old_store_data = store.store_data
+
+    load(store=store, data='Item, Milk, Mother Dairy Milk, 60/lt, 0%')
+
+    assert store.store_data[CATEGORY] is old_store_data[CATEGORY]
+    assert store.store_data[SUB_CATEGORY] is old_store_data[SUB_CATEGORY]
+    assert store.store_data[ITEM] is not old_store_data[ITEM]
+    assert 'mother dairy milk' not in old_store_data[ITEM]
+
+    with pytest.raises(TypeError):
+        store.store_data[ITEM]['amul milk'] = None
+
+
+def test_dropped_sqlite_version_releases_its_read_transaction(tmp_path):
+    store = SqliteStoreManager(db_path=str(tmp_path / 'catalog.db'))
+    load(store=store, data=MANAGER_DATA)
+    old_catalog = store.store_data
+
+    load(store=store, data='Item, Milk, Mother Dairy Milk, 60/lt, 0%')
+
+    # nothing references the previous snapshot anymore
+    with pytest.raises(sqlite3.ProgrammingError):
+        old_catalog.connection.execute('SELECT 1')
+
+    # only the current version pins the WAL, a checkpoint is not blocked by the dropped ones
+    store.store_data.release()
+    connection = sqlite3.connect(str(tmp_path / 'catalog.db'))
+    assert connection.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()[0] == 0
+    connection.close()
@@ -0,0 +1,84 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the resident mode of the command line interface
+
+import io
+import json
+
+from contextlib import redirect_stdout
+from functools import partial
+
+from src.cli import serve
+from src.renderers import json_renderer
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 0%
+Sub_Category, Dairy, Milk, 0%
+Item, Milk, Amul Milk, 100/lt, 0%"""
+
+
+def build_store(tmp_path, output: io.StringIO) -> StoreManager:
+    codes_file = tmp_path / 'codes.txt'
+    codes_file.write_text('SAVE10\nSAVE20\n')
+
+    store = StoreManager()
+    store.bill_renderer = partial(json_renderer.render_bill, stream=output)
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA)
+        store.process_coupon_data(data=f'festive, {codes_file}, 10%')
+
+    # record the coupon code every bill is generated with
+    store.presented_coupon_codes = []
+    generate_bill = store.generate_bill
+
+    def recording_generate_bill(processed_data: list, coupon_code: str = None) -> dict:
+        store.presented_coupon_codes.append(coupon_code)
+        return generate_bill(processed_data=processed_data, coupon_code=coupon_code)
+
+    store.generate_bill = recording_generate_bill
+
+    return store
+
+
+def test_resident_mode_bills_with_the_coupon_and_reports_empty_baskets(tmp_path):
+    output = io.StringIO()
+    store = build_store(tmp_path=tmp_path, output=output)
+
+    with redirect_stdout(io.StringIO()):
+        serve(store=store, renderer=json_renderer,
+              input_stream=io.StringIO('Unknown Item 2lt\nAmul Milk 2lt\nAmul Milk 1lt\n'), output=output,
+              coupon_code='save10')
+
+    error, bill, next_bill = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert error['error']
+    assert bill['coupon']['code'] == 'save10'
+    assert bill['total_new_cost'] == 180.0
+
+    # the coupon code is presented with the first bill only
+    assert store.presented_coupon_codes == ['save10', None]
+    assert next_bill['coupon'] is None
+    assert next_bill['total_new_cost'] == 100.0
+
+
+def test_stream_mode_reports_empty_baskets_and_uses_the_coupon_once(tmp_path):
+    output = io.StringIO()
+    store = build_store(tmp_path=tmp_path, output=output)
+
+    customer_file = tmp_path / 'customer_input.txt'
+    customer_file.write_text('Unknown Item 2lt\n\nAmul Milk 2lt\nAmul Milk 1lt, Unknown Item 1lt\n')
+
+    with redirect_stdout(io.StringIO()):
+        bills = list(store.stream_bills(file=str(customer_file), coupon_code='save10',
+                                        error_renderer=partial(json_renderer.render_error, stream=output)))
+
+    error, bill, next_bill = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert len(bills) == 2
+    assert error == {'basket': 'line 1', 'error': 'Bill could not be generated'}
+    assert bill['coupon']['code'] == 'save10'
+    assert bill['total_new_cost'] == 180.0
+    assert store.presented_coupon_codes == ['save10', None]
+    assert next_bill['coupon'] is None
+    assert next_bill['total_new_cost'] == 100.0
@@ -0,0 +1,72 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the coupon redemption at checkout
+
+import io
+
+from contextlib import redirect_stdout
+
+import pytest
+
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 0%
+Sub_Category, Dairy, Milk, 0%
+Item, Milk, Amul Milk, 100/lt, 0%"""
+
+
+def build_store(tmp_path) -> StoreManager:
+    codes_file = tmp_path / 'codes.txt'
+    codes_file.write_text('SAVE10\n')
+
+    store = StoreManager()
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA)
+        store.process_coupon_data(data=f'festive, {codes_file}, 10%')
+
+    return store
+
+
+def test_pricing_a_bill_does_not_redeem_the_coupon(tmp_path):
+    store = build_store(tmp_path=tmp_path)
+
+    with redirect_stdout(io.StringIO()):
+        processed_data = store.process_customer_input(customer_data='Amul Milk 2lt')
+        quotes = [store.calculate_bill(processed_data=processed_data, coupon_code='save10') for _ in range(2)]
+
+    assert [quote['total_new_cost'] for quote in quotes] == [180.0, 180.0]
+
+
+def test_generating_a_bill_redeems_the_coupon_once(tmp_path):
+    store = build_store(tmp_path=tmp_path)
+
+    with redirect_stdout(io.StringIO()):
+        processed_data = store.process_customer_input(customer_data='Amul Milk 2lt')
+        first_bill = store.generate_bill(processed_data=processed_data, coupon_code='save10')
+        second_bill = store.generate_bill(processed_data=processed_data, coupon_code='save10')
+
+    assert first_bill['coupon']['discount'] == 20.0
+    assert first_bill['total_new_cost'] == 180.0
+    assert second_bill['coupon'] is None
+    assert second_bill['total_new_cost'] == 200.0
+
+
+def test_coupon_is_released_when_the_bill_fails(tmp_path):
+    store = build_store(tmp_path=tmp_path)
+
+    def failing_listener(bill: dict) -> None:
+        raise RuntimeError('listener failed')
+
+    store.bill_listeners.append(failing_listener)
+
+    with redirect_stdout(io.StringIO()):
+        processed_data = store.process_customer_input(customer_data='Amul Milk 2lt')
+
+        with pytest.raises(RuntimeError):
+            store.generate_bill(processed_data=processed_data, coupon_code='save10')
+
+        store.bill_listeners.remove(failing_listener)
+        bill = store.generate_bill(processed_data=processed_data, coupon_code='save10')
+
+    assert bill['coupon']['discount'] == 20.0
@@ -0,0 +1,101 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the stock reservation at checkout
+
+import io
+
+from contextlib import redirect_stdout
+
+import pytest
+
+from src.store_manager.inventory import Inventory
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 0%
+Sub_Category, Dairy, Milk, 0%
+Item, Milk, Amul Milk, 100/lt, 0%
+Item, Milk, Mother Dairy Milk, 50/lt, 0%"""
+
+
+def build_store() -> StoreManager:
+    store = StoreManager()
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA)
+        store.process_stock_data(data='Amul Milk, 10lt')
+
+    return store
+
+
+def test_reserve_fills_the_lines_in_order_and_release_gives_the_stock_back():
+    inventory = Inventory(stripe_count=4)
+    inventory.set_stock(item_name='amul milk', quantity=5.0)
+
+    filled_quantities = inventory.reserve(requests=[('amul milk', 3.0), ('amul milk', 3.0), ('bread', 2.0)])
+
+    assert filled_quantities == [3.0, 2.0, 2.0]
+    assert inventory.get_stock(item_name='amul milk') == 0.0
+
+    inventory.release(requests=[('amul milk', 5.0), ('bread', 2.0)])
+
+    assert inventory.get_stock(item_name='amul milk') == 5.0
+    assert inventory.get_stock(item_name='bread') is None
+
+
+def test_quote_fills_the_lines_without_reserving_the_stock():
+    store = build_store()
+
+    with redirect_stdout(io.StringIO()):
+        processed_data = store.process_customer_input(customer_data='Amul Milk 4lt, Amul Milk 8lt')
+        bill = store.calculate_bill(processed_data=processed_data)
+
+    assert [line['quantity'] for line in bill['lines']] == [4.0, 6.0]
+    assert bill['reserved_stock'] == []
+    assert store.inventory.get_stock(item_name='amul milk') == 10.0
+
+
+def test_generated_bill_reserves_the_stock_and_fills_partially():
+    store = build_store()
+
+    with redirect_stdout(io.StringIO()):
+        processed_data = store.process_customer_input(customer_data='Amul Milk 4lt, Mother Dairy Milk 2lt')
+        store.generate_bill(processed_data=processed_data)
+        bill = store.generate_bill(processed_data=store.process_customer_input(customer_data='Amul Milk 8lt'))
+
+    assert [line['quantity'] for line in bill['lines']] == [6.0]
+    assert bill['total_new_cost'] == 600.0
+    assert store.inventory.get_stock(item_name='amul milk') == 0.0
+
+
+def test_stock_is_released_when_the_bill_fails():
+    store = build_store()
+
+    def failing_renderer(bill: dict) -> None:
+        raise RuntimeError('renderer failed')
+
+    store.bill_renderer = failing_renderer
+
+    with redirect_stdout(io.StringIO()):
+        processed_data = store.process_customer_input(customer_data='Amul Milk 4lt')
+
+        with pytest.raises(RuntimeError):
+            store.generate_bill(processed_data=processed_data)
+
+    assert store.inventory.get_stock(item_name='amul milk') == 10.0
+
+
+def test_stock_is_released_when_the_bill_can_not_be_finished(monkeypatch):
+    store = build_store()
+
+    def failing_finish_bill(**kwargs) -> dict:
+        raise RuntimeError('promotions failed')
+
+    monkeypatch.setattr(store, '_finish_bill', failing_finish_bill)
+
+    with redirect_stdout(io.StringIO()):
+        processed_data = store.process_customer_input(customer_data='Amul Milk 4lt')
+
+        with pytest.raises(RuntimeError):
+            store.generate_bill(processed_data=processed_data)
+
+    assert store.inventory.get_stock(item_name='amul milk') == 10.0
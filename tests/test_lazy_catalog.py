@@ -0,0 +1,45 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the lazily built items
+
+import io
+
+from contextlib import redirect_stdout
+
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 10%
+Category, Bakery, 5%
+Sub_Category, Dairy, Milk, 5%
+Sub_Category, Dairy, Cheese, 20%
+Sub_Category, Bakery, Bread, 0%
+Item, Milk, Amul Milk, 40/lt, 15%
+Item, Milk, Mother Dairy Milk, 30/lt, 2lt+1lt
+Item, Cheese, Amul Cheese, 400/kg;2kg=380, 5%
+Item, Bread, Brown Bread, 30/kg, 0%
+Item, Bread, Butter, 500/kg, 1kg+1kg"""
+
+BASKETS = [
+    'Amul Milk 2lt, Mother Dairy Milk 5lt, Amul Cheese 3kg',
+    'Brown Bread 1.5kg, Butter 3kg',
+    'Amul Cheese 500gm, Butter 1kg, Mother Dairy Milk 1lt'
+]
+
+
+def bill_baskets(lazy: bool) -> list:
+    store = StoreManager()
+    bills = []
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA, lazy=lazy)
+
+        for basket in BASKETS:
+            bill = store.calculate_bill(processed_data=store.process_customer_input(customer_data=basket))
+            bills.append(([(line['item'].name, line['quantity'], line['original_cost'], line['new_cost'])
+                           for line in bill['lines']], bill['total_original_cost'], bill['total_new_cost']))
+
+    return bills
+
+
+def test_lazy_items_bill_like_eager_items():
+    assert bill_baskets(lazy=True) == bill_baskets(lazy=False)
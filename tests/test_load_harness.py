@@ -0,0 +1,55 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the checkout load harness
+
+import io
+import itertools
+import time
+
+from contextlib import redirect_stdout
+from typing import Any
+
+from src.benchmarks.load_harness import LoadHarness
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 0%
+Sub_Category, Dairy, Milk, 0%
+Item, Milk, Amul Milk, 100/lt, 0%"""
+
+
+class SlowStoreManager(StoreManager):
+    """
+    This class is a store manager taking at least 10ms to price a bill.
+    """
+
+    def calculate_bill(self, processed_data: list, customer_id: Any = None, coupon_code: str = None) -> dict:
+        time.sleep(0.01)
+        return super().calculate_bill(processed_data=processed_data)
+
+
+def run_harness(store: StoreManager, target_rate: float) -> tuple:
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA)
+
+    harness = LoadHarness(store=store, baskets=itertools.repeat('Amul Milk 1lt'), client_count=1,
+                          target_rate=target_rate, duration=0.5, interval=0.25)
+    results = harness.run()
+
+    return results, harness.summarize(results=results)
+
+
+def test_overloaded_store_achieves_less_than_offered():
+    results, summary = run_harness(store=SlowStoreManager(), target_rate=400)
+
+    assert summary['below_offered']
+    assert summary['achieved'] < 110
+    assert results[0]['below_offered']
+    # the backlog is drained after the load stops being offered
+    assert results[-1]['offered'] == 0
+
+
+def test_store_keeping_up_achieves_the_offered_throughput():
+    results, summary = run_harness(store=StoreManager(), target_rate=40)
+
+    assert not summary['below_offered']
+    assert sum(result['completed'] for result in results) == 20
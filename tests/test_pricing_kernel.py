@@ -0,0 +1,83 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the pricing kernels
+
+import io
+
+from contextlib import redirect_stdout
+
+from src.constants import ITEM
+from src.store_manager.catalog_dry_run import CatalogDryRun
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 10%
+Sub_Category, Dairy, Milk, 0%
+Item, Milk, Amul Milk, 100/lt, 0%"""
+
+
+def load(store: StoreManager, data: str, lazy: bool = False) -> str:
+    output = io.StringIO()
+
+    with redirect_stdout(output):
+        store.process_manager_data(data=data, lazy=lazy)
+
+    return output.getvalue()
+
+
+def price(store: StoreManager, customer_data: str) -> float:
+    with redirect_stdout(io.StringIO()):
+        return store.calculate_bill(processed_data=store.process_customer_input(customer_data=customer_data))[
+            'total_new_cost']
+
+
+def test_redefined_category_reprices_the_items_under_it():
+    store = StoreManager()
+    load(store=store, data=MANAGER_DATA)
+    old_catalog = store.catalog
+
+    load(store=store, data='Category, Dairy, 30%')
+
+    assert price(store=store, customer_data='Amul Milk 1lt') == 70.0
+
+    # the previous version keeps pricing with the old discount
+    assert old_catalog.store_data[ITEM]['amul milk'].pricing_kernel(1.0) == (100.0, 10.0, 90.0)
+
+
+def test_redefined_sub_category_reprices_lazily_processed_items():
+    store = StoreManager()
+    load(store=store, data=MANAGER_DATA, lazy=True)
+
+    load(store=store, data='Sub_Category, Dairy, Milk, 25%', lazy=True)
+
+    assert price(store=store, customer_data='Amul Milk 1lt') == 75.0
+
+
+def test_percentage_item_under_item_wise_parent_is_rejected_at_load_time():
+    store = StoreManager()
+
+    output = load(store=store, data="Category, Dairy, 10%\n"
+                                    "Sub_Category, Dairy, Milk, 1lt+1lt\n"
+                                    "Item, Milk, Amul Milk, 100/lt, 5%")
+
+    assert 'amul milk' not in store.store_data[ITEM]
+    assert 'is invalid' in output
+
+
+def test_item_is_removed_when_its_parent_becomes_item_wise():
+    store = StoreManager()
+    load(store=store, data=MANAGER_DATA)
+
+    output = load(store=store, data='Sub_Category, Dairy, Milk, 1lt+1lt')
+
+    assert 'amul milk' not in store.store_data[ITEM]
+    assert 'Removing the item' in output
+
+
+def test_dry_run_relinks_items_under_redefined_parents():
+    store = StoreManager()
+    load(store=store, data=MANAGER_DATA)
+
+    diff = CatalogDryRun(store=store, worker_count=1).run(lines=iter(MANAGER_DATA.split('\n') +
+                                                                     ['Category, Dairy, 30%']))
+
+    assert diff['discount_changes'] == [{'name': 'amul milk', 'old_discount': '10%', 'new_discount': '30%'}]
@@ -0,0 +1,76 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the promotion engine
+
+import io
+
+from contextlib import redirect_stdout
+
+from src.constants import ITEM
+from src.store_manager import promotion_engine
+from src.store_manager.promotion_engine import PromotionEngine
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 0%
+Sub_Category, Dairy, Milk, 0%
+Sub_Category, Dairy, Cheese, 0%
+Item, Milk, Amul Milk, 100/lt, 0%
+Item, Cheese, Amul Cheese, 100/kg, 0%"""
+
+
+def build_store(promotion_data: str) -> StoreManager:
+    store = StoreManager()
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA)
+        store.process_promotion_data(data=promotion_data)
+
+    return store
+
+
+def bill_for(store: StoreManager, customer_data: str) -> dict:
+    with redirect_stdout(io.StringIO()):
+        return store.calculate_bill(processed_data=store.process_customer_input(customer_data=customer_data))
+
+
+def test_overlapping_promotions_pick_the_best_combination():
+    # the category promotion is the best single promotion, but the two sub category ones together save more
+    store = build_store(promotion_data="threshold, category, Dairy, 0, 10%\n"
+                                       "threshold, sub_category, Milk, 0, 15%\n"
+                                       "threshold, sub_category, Cheese, 0, 15%")
+
+    bill = bill_for(store=store, customer_data='Amul Milk 1lt, Amul Cheese 1kg')
+
+    assert sorted(applied['discount'] for applied in bill['promotions']) == [15.0, 15.0]
+    assert bill['total_new_cost'] == 170.0
+
+
+def test_greedy_fallback_beyond_the_search_limit(monkeypatch):
+    monkeypatch.setattr(promotion_engine, 'EXACT_SEARCH_LIMIT', 1)
+    store = build_store(promotion_data="threshold, category, Dairy, 0, 10%\n"
+                                       "threshold, sub_category, Milk, 0, 15%\n"
+                                       "threshold, sub_category, Cheese, 0, 15%")
+
+    bill = bill_for(store=store, customer_data='Amul Milk 1lt, Amul Cheese 1kg')
+
+    assert [applied['discount'] for applied in bill['promotions']] == [20.0]
+
+
+def test_best_combination_keeps_the_discount_order():
+    applicable = [(20.0, 0, [0, 1]), (15.0, 1, [0]), (15.0, 2, [1]), (5.0, 3, [2])]
+
+    assert PromotionEngine._best_combination(applicable=applicable) == applicable[1:]
+    assert PromotionEngine._greedy_combination(applicable=applicable) == [applicable[0], applicable[3]]
+
+
+def test_promotions_match_items_added_after_them():
+    store = StoreManager()
+
+    with redirect_stdout(io.StringIO()):
+        store.process_promotion_data(data="bundle, amul milk | amul cheese, 10%")
+        store.process_manager_data(data=MANAGER_DATA, lazy=True)
+
+    bill = bill_for(store=store, customer_data='Amul Milk 1lt, Amul Cheese 1kg')
+
+    assert [applied['discount'] for applied in bill['promotions']] == [20.0]
+    assert store.sku_tables[ITEM].get_sku('amul milk') == bill['lines'][0]['item'].sku
@@ -0,0 +1,54 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the sales aggregator
+
+import io
+
+from contextlib import redirect_stdout
+
+import pytest
+
+from src.analytics.sales_aggregator import SalesAggregator
+from src.constants import CATEGORY, SUB_CATEGORY, ITEM
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 0%
+Sub_Category, Dairy, Milk, 0%
+Sub_Category, Dairy, Cheese, 0%
+Item, Milk, Amul Milk, 100/lt, 0%
+Item, Cheese, Amul Cheese, 200/kg, 0%"""
+
+
+def build_aggregator() -> SalesAggregator:
+    store = StoreManager()
+    aggregator = SalesAggregator(sku_tables=store.sku_tables)
+    store.add_bill_listener(aggregator.add_bill)
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA)
+        store.generate_bill(processed_data=store.process_customer_input(customer_data='Amul Milk 2lt, Amul Cheese 1kg'))
+        store.generate_bill(processed_data=store.process_customer_input(customer_data='Amul Milk 500ml'))
+
+    return aggregator
+
+
+def test_category_quantities_are_kept_per_unit():
+    aggregator = build_aggregator()
+
+    category_totals = aggregator.get_totals(entity_type=CATEGORY, entity_name='dairy')
+
+    assert category_totals['quantity'] == {'lt': 2.5, 'kg': 1.0}
+    assert category_totals['gross'] == 450.0
+    assert aggregator.get_totals(entity_type=ITEM, entity_name='amul milk')['quantity'] == {'lt': 2.5}
+    assert aggregator.get_overall_totals()['quantity'] == {'lt': 2.5, 'kg': 1.0}
+
+
+def test_ranking_by_quantity_needs_a_unit_above_items():
+    aggregator = build_aggregator()
+
+    assert aggregator.top_sellers(count=1, by='quantity') == [('amul milk', 2.5)]
+    assert aggregator.top_sellers(count=2, entity_type=SUB_CATEGORY, by='quantity', unit='kg') == [('cheese', 1.0),
+                                                                                                   ('milk', 0.0)]
+
+    with pytest.raises(ValueError):
+        aggregator.top_sellers(count=1, entity_type=CATEGORY, by='quantity')
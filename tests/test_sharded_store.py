@@ -0,0 +1,118 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the sharded store manager
+
+import io
+import os
+
+from contextlib import redirect_stdout
+
+import pytest
+
+from src.exceptions.exceptions import UnsupportedOperationError
+from src.store_manager.sharded_store import ShardedStoreManager
+from src.store_manager.store_manager_runner import StoreManager
+
+# with two shards, Dairy is held by shard 1 and Bakery by shard 0
+MANAGER_DATA = """Category, Dairy, 5%
+Sub_Category, Dairy, Milk, 10%
+Sub_Category, Dairy, Cheese, 0%
+Item, Milk, Amul Milk, 100/lt, 0%
+Item, Milk, Toned Milk, 60/lt, 5%
+Item, Cheese, Amul Cheese, 500/kg, 2%
+Category, Bakery, 0%
+Sub_Category, Bakery, Bread, 15%
+Item, Bread, Brown Bread, 40/kg, 0%
+Item, Bread, White Bread, 35/kg, 0%"""
+
+PROMOTION_DATA = """bundle, amul milk | brown bread, 10%
+threshold, category, dairy, 500, 5%"""
+
+BASKETS = ['Amul Milk 2lt, Brown Bread 2kg',
+           'Brown Bread 1kg, Amul Cheese 1kg, White Bread 3kg, Toned Milk 500ml',
+           'Amul Cheese 2kg, Unknown Item 1kg',
+           'White Bread 2kg, Brown Bread 2kg']
+
+
+def bill_summary(store: StoreManager, customer_data: str) -> tuple:
+    with redirect_stdout(io.StringIO()):
+        bill = store.generate_bill(processed_data=store.process_customer_input(customer_data=customer_data))
+
+    return (bill['total_original_cost'], bill['total_new_cost'],
+            [(line['item'].name, line['quantity'], line['new_cost']) for line in bill['lines']],
+            [promotion['discount'] for promotion in bill['promotions']])
+
+
+def build_stores(lazy: bool = False) -> tuple:
+    single = StoreManager()
+    sharded = ShardedStoreManager(shard_count=2)
+
+    with redirect_stdout(io.StringIO()):
+        for store in (single, sharded):
+            store.process_manager_data(data=MANAGER_DATA, lazy=lazy)
+            store.process_promotion_data(data=PROMOTION_DATA)
+
+    return single, sharded
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_sharded_bills_match_a_single_store(lazy):
+    single, sharded = build_stores(lazy=lazy)
+
+    with sharded:
+        assert sharded.category_shard(category_name='dairy') != sharded.category_shard(category_name='bakery')
+
+        for customer_data in BASKETS:
+            assert bill_summary(store=sharded, customer_data=customer_data) == \
+                   bill_summary(store=single, customer_data=customer_data)
+
+
+def test_basket_spanning_shards_keeps_the_basket_order():
+    single, sharded = build_stores()
+
+    with sharded:
+        customer_data = 'Brown Bread 1kg, Amul Milk 1lt, White Bread 1kg, Amul Cheese 1kg'
+        _, _, lines, _ = bill_summary(store=sharded, customer_data=customer_data)
+
+        assert [name for name, _, _ in lines] == ['brown bread', 'amul milk', 'white bread', 'amul cheese']
+        assert bill_summary(store=sharded, customer_data=customer_data) == \
+               bill_summary(store=single, customer_data=customer_data)
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_moved_entities_are_removed_from_their_old_shard(lazy):
+    single, sharded = build_stores(lazy=lazy)
+
+    with sharded:
+        with redirect_stdout(io.StringIO()):
+            for store in (single, sharded):
+                store.process_stock_data(data='amul milk, 2lt\ntoned milk, 1lt')
+                # Milk moves to the Bakery shard with its items, Amul Cheese moves under Bread
+                store.process_manager_data(data='Sub_Category, Bakery, Milk, 20%\n'
+                                                'Item, Bread, Amul Cheese, 450/kg, 0%', lazy=lazy)
+
+        assert sum(sharded.shard_item_counts()) == len(single.store_data['item'])
+
+        for customer_data in BASKETS + ['Amul Milk 3lt, Toned Milk 2lt']:
+            assert bill_summary(store=sharded, customer_data=customer_data) == \
+                   bill_summary(store=single, customer_data=customer_data)
+
+
+def test_shards_shut_down_cleanly():
+    store = ShardedStoreManager(shard_count=2)
+
+    with store:
+        assert all(process.is_alive() for process in store.processes)
+
+    assert not any(process.is_alive() for process in store.processes)
+    assert all(process.exitcode == 0 for process in store.processes)
+    assert not os.path.exists(store.socket_dir)
+
+
+def test_local_catalog_features_are_rejected():
+    with ShardedStoreManager(shard_count=1) as store, redirect_stdout(io.StringIO()):
+        with pytest.raises(UnsupportedOperationError):
+            store.open_cart_session()
+
+        with pytest.raises(UnsupportedOperationError):
+            store.dry_run_manager_data(file='manager_input.txt')
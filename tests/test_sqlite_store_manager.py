@@ -0,0 +1,66 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the SQLite backed store manager against the in-memory store manager
+
+import io
+
+from contextlib import redirect_stdout
+
+import pytest
+
+from src.store_manager.sqlite_store_manager import SqliteStoreManager
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 10%
+Category, Bakery, 5%
+Sub_Category, Dairy, Milk, 5%
+Sub_Category, Dairy, Cheese, 20%
+Sub_Category, Bakery, Bread, 0%
+Item, Milk, Amul Milk, 40/lt, 15%
+Item, Milk, Mother Dairy Milk, 30/lt, 2lt+1lt
+Item, Cheese, Amul Cheese, 400/kg;2kg=380, 5%
+Item, Bread, Brown Bread, 30/kg, 0%
+Item, Bread, Butter, 500/kg, 1kg+1kg"""
+
+BASKETS = [
+    'Amul Milk 2lt, Mother Dairy Milk 5lt, Amul Cheese 3kg',
+    'Brown Bread 1.5kg, Butter 3kg',
+    'Amul Cheese 500gm, Butter 1kg, Mother Dairy Milk 1lt'
+]
+
+
+def bill_totals(store: StoreManager, loads: list) -> list:
+    with redirect_stdout(io.StringIO()):
+        for data in loads:
+            store.process_manager_data(data=data)
+
+        return [store.calculate_bill(processed_data=store.process_customer_input(customer_data=basket))[
+                    'total_new_cost'] for basket in BASKETS]
+
+
+@pytest.mark.parametrize('loads', [
+    [MANAGER_DATA],
+    # a parent redefined within the same load
+    [MANAGER_DATA + '\nCategory, Dairy, 30%\nSub_Category, Bakery, Bread, 10%'],
+    # a parent redefined by a later load
+    [MANAGER_DATA, 'Category, Dairy, 30%\nSub_Category, Bakery, Bread, 10%'],
+    # a percentage wise item under a sub category redefined as item wise is removed
+    [MANAGER_DATA + '\nSub_Category, Dairy, Cheese, 1kg+1kg']
+])
+def test_sqlite_store_bills_like_the_in_memory_store(tmp_path, loads):
+    sqlite_store = SqliteStoreManager(db_path=str(tmp_path / 'catalog.db'))
+
+    assert bill_totals(store=sqlite_store, loads=loads) == bill_totals(store=StoreManager(), loads=loads)
+
+
+def test_redefined_parent_is_used_by_cached_children(tmp_path):
+    # the cache is larger than the catalog, so every entity stays cached while the load goes on
+    sqlite_store = SqliteStoreManager(db_path=str(tmp_path / 'catalog.db'), cache_size=100)
+
+    with redirect_stdout(io.StringIO()):
+        sqlite_store.process_manager_data(data='Category, Dairy, 10%\nSub_Category, Dairy, Milk, 0%\n'
+                                               'Item, Milk, Amul Milk, 100/lt, 0%\nCategory, Dairy, 30%')
+        bill = sqlite_store.calculate_bill(processed_data=sqlite_store.process_customer_input(
+            customer_data='Amul Milk 1lt'))
+
+    assert bill['total_new_cost'] == 70.0
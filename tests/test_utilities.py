@@ -0,0 +1,68 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the streaming file readers
+
+import io
+
+from contextlib import redirect_stdout
+
+import pytest
+
+from src.store_manager.store_manager_runner import StoreManager
+from src.utilities import iter_file_baskets, iter_file_fields, iter_file_lines
+
+MANAGER_DATA = """Category, Dairy, 0%
+Sub_Category, Dairy, Milk, 0%
+Item, Milk, Amul Milk, 100/lt, 10%
+Item, Milk, Mother Dairy Milk, 50/lt, 0%"""
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 1 << 16])
+def test_lines_spanning_chunk_boundaries(tmp_path, chunk_size):
+    path = tmp_path / 'lines.txt'
+    path.write_text('first line\n\na much longer second line\nlast')
+
+    assert list(iter_file_lines(file=str(path), chunk_size=chunk_size)) == [
+        'first line', '', 'a much longer second line', 'last']
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 5, 1 << 16])
+def test_crlf_line_breaks(tmp_path, chunk_size):
+    path = tmp_path / 'lines.txt'
+    path.write_bytes(b'a, b\r\nc\r\n')
+
+    assert list(iter_file_lines(file=str(path), chunk_size=chunk_size)) == ['a, b', 'c']
+    assert list(iter_file_fields(file=str(path), chunk_size=chunk_size)) == [('a', False), (' b', True), ('c', True)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 4, 1 << 16])
+def test_fields_spanning_chunk_boundaries(tmp_path, chunk_size):
+    path = tmp_path / 'baskets.txt'
+    path.write_text('apple 1kg,banana 2kg\n\nmilk 1lt,\nbread 1kg')
+
+    assert list(iter_file_fields(file=str(path), chunk_size=chunk_size)) == [
+        ('apple 1kg', False), ('banana 2kg', True), ('', True), ('milk 1lt', False), ('', True), ('bread 1kg', True)]
+
+    # empty lines are ignored, and a basket not used by the caller is skipped
+    baskets = iter_file_baskets(file=str(path), chunk_size=chunk_size)
+    assert next(next(baskets)[1]) == 'apple 1kg'
+    assert [(line_no, list(basket)) for line_no, basket in baskets] == [(3, ['milk 1lt', '']), (4, ['bread 1kg'])]
+
+
+def test_streamed_bills_match_the_bills_of_whole_lines(tmp_path):
+    baskets = ['Amul Milk 2lt, Mother Dairy Milk 500ml, Amul Milk 1lt', 'Mother Dairy Milk 3lt']
+    path = tmp_path / 'customer_input.txt'
+    path.write_text('\n'.join(baskets) + '\n')
+
+    store = StoreManager()
+    store.bill_renderer = lambda bill: None
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA)
+
+        streamed_bills = list(store.stream_bills(file=str(path), chunk_size=4))
+        bills = [store.calculate_bill(processed_data=store.process_customer_input(customer_data=basket))
+                 for basket in baskets]
+
+    assert [(bill['total_original_cost'], bill['total_new_cost']) for bill in streamed_bills] == \
+        [(bill['total_original_cost'], bill['total_new_cost']) for bill in bills]
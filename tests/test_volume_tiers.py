@@ -0,0 +1,34 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the volume tiered item prices
+
+import io
+
+from contextlib import redirect_stdout
+
+import pytest
+
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Grocery, 0%
+Sub_Category, Grocery, Staples, 0%
+Item, Staples, Rice, 40/kg;10kg=36;100kg=32, 0%"""
+
+
+@pytest.mark.parametrize('customer_data, total_new_cost', [
+    ('Rice 9kg', 360.0),
+    # a quantity equal to a threshold is still priced at the rate below it
+    ('Rice 10kg', 400.0),
+    ('Rice 10000gm', 400.0),
+    ('Rice 10.5kg', 378.0),
+    ('Rice 100kg', 3600.0),
+    ('Rice 101kg', 3232.0)
+])
+def test_whole_quantity_is_priced_at_its_tier_rate(customer_data, total_new_cost):
+    store = StoreManager()
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA)
+        bill = store.calculate_bill(processed_data=store.process_customer_input(customer_data=customer_data))
+
+    assert bill['total_new_cost'] == pytest.approx(total_new_cost)
@@ -0,0 +1,46 @@
+#   Primary Author: Rahul Singh <rahulrsk07@gmail.com>
+#
+#   Purpose: This file contains the tests of the what-if repricing simulation
+
+import io
+
+from contextlib import redirect_stdout
+
+from src.analytics.what_if import BasketSet, WhatIfSimulator, parse_scenarios
+from src.store_manager.store_manager_runner import StoreManager
+
+MANAGER_DATA = """Category, Dairy, 0%
+Sub_Category, Dairy, Milk, 0%
+Item, Milk, Amul Milk, 100/lt, 0%"""
+
+
+def build_simulator() -> WhatIfSimulator:
+    store = StoreManager()
+
+    with redirect_stdout(io.StringIO()):
+        store.process_manager_data(data=MANAGER_DATA)
+        baskets = [store.process_customer_input(customer_data='Amul Milk 2lt')]
+
+    return WhatIfSimulator(store=store, basket_set=BasketSet.from_processed_baskets(baskets=baskets))
+
+
+def test_malformed_scenario_lines_are_skipped():
+    output = io.StringIO()
+
+    with redirect_stdout(output):
+        scenarios = parse_scenarios(data="promo, item, amul milk, abc\n"
+                                         "promo, aisle, x, 5%\n"
+                                         "promo, category, dairy, 10%")
+
+    assert scenarios == [('promo', [('category', 'dairy', '10%')])]
+    assert 'Traceback' in output.getvalue()
+
+
+def test_malformed_changes_do_not_stop_the_simulation():
+    simulator = build_simulator()
+
+    with redirect_stdout(io.StringIO()):
+        results = simulator.simulate(scenarios=[('bad', [('item', 'amul milk', 'abc'), ('aisle', 'x', '5%')]),
+                                                ('good', [('category', 'dairy', '10%')])])
+
+    assert [result['total_new_cost'] for result in results] == [200.0, 180.0]